@@ -0,0 +1,169 @@
+# bench_pipeline.py for timing and memory-profiling the src pipeline on synthetic logs
+#
+# Usage (from the project root):
+#   python benchmarks/bench_pipeline.py --rows 1000000 10000000 --output bench_results.csv
+#
+# For every scale, a deterministic synthetic log is written once (and reused on later runs), then the
+# data_loader, data_cleaning, features and eda paths are timed one function at a time.
+
+import argparse
+from contextlib import redirect_stdout
+import gc
+import io
+import os
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib import pyplot as plt
+import pandas as pd
+
+# Define project root dynamically and add it to sys.path, as the notebooks do
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src import *
+from src.synthetic import write_music_log_csv
+
+
+# Function to run one benchmark step and collect its timings
+def measure(results, scale, stage, func, rows, trace_memory=True):
+    """
+    Runs a benchmark step, silencing its notebook output, and appends its timings to 'results'.
+
+    Parameters:
+    results (list): List collecting one dict per step.
+    scale (int): Number of rows of the synthetic log.
+    stage (str): Name of the step (module.function).
+    func (callable): Step to run, without arguments.
+    rows (int): Number of input rows processed by the step.
+    trace_memory (bool): If True, records the peak Python/NumPy allocation with tracemalloc.
+
+    Returns:
+    object: The value returned by 'func'.
+    """
+
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    with redirect_stdout(io.StringIO()):
+        result = func()
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+    peak_mb = None
+    if trace_memory:
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+
+    plt.close('all')
+    results.append({'scale': scale, 'stage': stage, 'rows': rows, 'wall_s': wall, 'cpu_s': cpu,
+                    'peak_mb': peak_mb, 'rows_per_s': rows / wall if wall > 0 else None})
+    print(f"  {stage:<45} {wall:9.3f} s  {'' if peak_mb is None else f'{peak_mb:10.1f} MB'}", flush=True)
+
+    return result
+
+# Function to benchmark every pipeline stage on one synthetic log
+def run_scale(n_rows, work_dir, seed=0, trace_memory=True):
+    """
+    Benchmarks the data_loader, data_cleaning, features and eda paths on a synthetic log of 'n_rows' rows.
+
+    Parameters:
+    n_rows (int): Number of rows of the synthetic log.
+    work_dir (Path): Directory where synthetic logs are cached.
+    seed (int): Seed of the synthetic log.
+    trace_memory (bool): If True, records peak memory per step.
+
+    Returns:
+    list: One dict of timings per step.
+    """
+
+    results = []
+    filename = f"music_synthetic_{n_rows}_{seed}.csv"
+
+    if not (work_dir / filename).exists():
+        print(f"> Generating {filename} ...", flush=True)
+        write_music_log_csv(work_dir / filename, n_rows, seed=seed)
+
+    print(f"> Scale: {n_rows:,} rows", flush=True)
+
+    def step(stage, func, rows=n_rows):
+        return measure(results, n_rows, stage, func, rows, trace_memory)
+
+    # data_loader
+    df = step('data_loader.load_dataset_from_csv',
+              lambda: load_dataset_from_csv(work_dir, filename, keep_default_na=False))
+
+    # data_cleaning
+    df = step('data_cleaning.normalize_columns_headers_format', lambda: normalize_columns_headers_format(df))
+    df = step('data_cleaning.normalize_string_format',
+              lambda: normalize_string_format(df, exclude=['userid', 'time']))
+    df = step('pandas.drop_duplicates', lambda: df.drop_duplicates().reset_index(drop=True))
+    n_clean = len(df)
+    df = step('data_cleaning.replace_missing_values',
+              lambda: replace_missing_values(df, exclude=['userid', 'city', 'time', 'day']), n_clean)
+    df = step('data_cleaning.standardize_gender_values',
+              lambda: standardize_gender_values(df, include=['gender']), n_clean)
+    df = df.fillna('unknown')
+    df = step('data_cleaning.normalize_datetime(cache=True)',
+              lambda: normalize_datetime(df, include=['time'], frmt='%H:%M:%S', cache=True), n_clean)
+    for column in ['genre', 'city', 'day']:
+        df[column] = df[column].astype('category')
+    df['hour'] = pd.Categorical([t.hour for t in df['time']])
+
+    # features
+    activity = step('features.pivot_table(city, day, hour)', lambda: pd.pivot_table(
+        df, index=['city', 'day', 'hour'], values=['userid', 'track'],
+        aggfunc={'userid': pd.Series.nunique, 'track': [pd.Series.nunique, 'count']}, observed=False), n_clean)
+    activity = activity.reset_index()
+    activity.columns = ['city', 'day', 'hour', 'total_tracks', 'tracks', 'users']
+    step('features.build_listening_sessions', lambda: build_listening_sessions(df), n_clean)
+    step('features.build_preference_matrix(artist)', lambda: build_preference_matrix(df, item_col='artist'), n_clean)
+    step('streaming.TopKCounter(artist, city)',
+         lambda: TopKCounter('artist', k=15, keys=['city']).consume(
+             df.iloc[start:start + 1_000_000] for start in range(0, n_clean, 1_000_000)), n_clean)
+
+    # eda
+    step('eda.outlier_limit_bounds', lambda: outlier_limit_bounds(activity, 'total_tracks'), len(activity))
+    step('eda.evaluate_central_trend', lambda: evaluate_central_trend(activity, 'total_tracks'), len(activity))
+    step('eda.evaluate_correlation',
+         lambda: evaluate_correlation(activity[['total_tracks', 'tracks', 'users']]), len(activity))
+    step('eda.plot_horizontal_bar(genre)', lambda: plot_horizontal_bar(df['genre']), n_clean)
+
+    return results
+
+# Main entry point of the benchmark suite
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the src pipeline on synthetic music logs.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000],
+                        help="Scales (number of rows) to benchmark, e.g. 1000000 10000000 100000000.")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic logs.")
+    parser.add_argument('--work-dir', type=Path, default=project_root / 'data' / 'interim' / 'benchmarks',
+                        help="Directory where synthetic logs are cached.")
+    parser.add_argument('--no-memory', action='store_true', help="Skip tracemalloc (faster, no peak memory).")
+    parser.add_argument('--output', type=Path, default=None, help="Optional CSV file for the results.")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.work_dir, exist_ok=True)
+
+    results = []
+    for n_rows in args.rows:
+        results += run_scale(n_rows, args.work_dir, seed=args.seed, trace_memory=not args.no_memory)
+
+    df_results = pd.DataFrame(results)
+    if args.output is not None:
+        df_results.to_csv(args.output, index=False)
+
+    print()
+    print(df_results.pivot_table(index='stage', columns='scale', values='wall_s', sort=False).round(3).to_string())
+
+    return df_results
+
+
+if __name__ == '__main__':
+    main()
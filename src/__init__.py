@@ -1,67 +1,171 @@
 # __init__.py is a special file Python looks for when treating a folder as a package.
 # Smart __init__.py used for importing easily from the package.
+# Public names are resolved lazily (module-level __getattr__), so a job that only needs the loaders
+# or the cleaning functions does not pay for importing the plotting stack.
 
-try:
-    
-    from .data_loader import (load_dataset_from_zip, 
-                              load_dataset_from_csv, 
-                              load_dataset_from_excel, 
-                              load_dataset_from_list, 
-                              load_dataset_from_dict)
-    
-    from .data_cleaning import (check_existing_missing_values,
-                                replace_missing_values,
-                                normalize_string_format,
-                                normalize_columns_headers_format,
-                                detect_implicit_duplicates,
-                                normalize_datetime,
-                                find_fail_conversion_to_numeric,
-                                convert_object_to_numeric,
-                                convert_integer_to_boolean,
-                                standardize_gender_values)
-    
-    from .eda import (outlier_limit_bounds,
-                      evaluate_central_trend,
-                      evaluate_correlation,
-                      missing_values_heatmap,
-                      plot_boxplots,
-                      plot_histogram,
-                      plot_hue_histogram,
-                      plot_dual_histogram,
-                      plot_frequency_density,
-                      plot_grouped_barplot,
-                      plot_horizontal_bar,
-                      plot_grouped_bars,
-                      plot_grouped_bars_indx,
-                      plot_pairplot,
-                      plot_scatter_matrix)
-    
-    from .utils import(format_notebook)
-                      
-
-except ImportError as e:
-    raise ImportError("One or more modules could not be found."
-                      "Ensure required scripts exist in the same directory as '__init__.py'.") from e
-
-__all__ = ['load_dataset_from_zip', 
-           'load_dataset_from_csv', 
-           'load_dataset_from_excel', 
-           'load_dataset_from_list', 
+import importlib
+
+
+# Submodule defining each public name
+_LAZY_EXPORTS = {
+    'data_loader': ('load_dataset_from_zip',
+                    'load_dataset_from_csv',
+                    'load_dataset_from_excel',
+                    'load_dataset_from_list',
+                    'load_dataset_from_dict',
+                    'load_dataset_from_shards',
+                    'RecordBatchBuilder'),
+
+    'data_cleaning': ('check_existing_missing_values',
+                      'replace_missing_values',
+                      'normalize_string_format',
+                      'normalize_columns_headers_format',
+                      'detect_implicit_duplicates',
+                      'build_canonical_mapping',
+                      'save_canonical_mapping',
+                      'load_canonical_mapping',
+                      'apply_canonical_mapping',
+                      'normalize_datetime',
+                      'clear_datetime_cache',
+                      'find_fail_conversion_to_numeric',
+                      'convert_object_to_numeric',
+                      'convert_integer_to_boolean',
+                      'standardize_gender_values',
+                      'optimize_dtypes'),
+
+    'features': ('compute_music_activity',
+                 'build_listening_sessions',
+                 'summarize_user_sessions',
+                 'build_activity_time_series',
+                 'rolling_activity',
+                 'activity_peaks',
+                 'build_preference_matrix',
+                 'normalize_preference_matrix',
+                 'split_preference_matrix_by_city',
+                 'save_preference_matrix',
+                 'load_preference_matrix',
+                 'UserBitmap'),
+
+    'streaming': ('TopKCounter',
+                  'StreamingDeduplicator',
+                  'drop_duplicates_streaming',
+                  'hash_rows',
+                  'StratifiedReservoirSampler'),
+
+    'indexing': ('ActivityIndex',
+                 'AudienceIndex'),
+
+    'contingency': ('ContingencyTable',),
+
+    'activity_store': ('save_activity_tables',
+                       'load_activity_table',
+                       'list_activity_tables',
+                       'describe_activity_store'),
+
+    'pipeline': ('PipelineStage',
+                 'Pipeline',
+                 'build_music_pipeline'),
+
+    'eda': ('configure_eda_cache',
+            'clear_eda_cache',
+            'eda_cache_info',
+            'outlier_limit_bounds',
+            'evaluate_central_trend',
+            'summarize_distribution',
+            'evaluate_correlation',
+            'missing_values_heatmap',
+            'plot_boxplots',
+            'plot_histogram',
+            'plot_hue_histogram',
+            'plot_dual_histogram',
+            'plot_frequency_density',
+            'plot_grouped_barplot',
+            'plot_horizontal_bar',
+            'plot_grouped_bars',
+            'plot_grouped_bars_indx',
+            'plot_pairplot',
+            'plot_scatter_matrix'),
+
+    'backends': ('set_backend',
+                 'get_backend',
+                 'use_backend'),
+
+    'utils': ('format_notebook',),
+
+    'profiler': ('profiling',
+                 'is_profiling_enabled',
+                 'reset_profile',
+                 'profile_report',
+                 'export_profile_trace',
+                 'export_profile_flamegraph'),
+}
+
+_NAME_TO_MODULE = {name: module for module, names in _LAZY_EXPORTS.items() for name in names}
+
+__all__ = ['load_dataset_from_zip',
+           'load_dataset_from_csv',
+           'load_dataset_from_excel',
+           'load_dataset_from_list',
            'load_dataset_from_dict',
-           
+           'load_dataset_from_shards',
+           'RecordBatchBuilder',
+
            'check_existing_missing_values',
            'replace_missing_values',
            'normalize_string_format',
            'normalize_columns_headers_format',
            'detect_implicit_duplicates',
+           'build_canonical_mapping',
+           'save_canonical_mapping',
+           'load_canonical_mapping',
+           'apply_canonical_mapping',
            'normalize_datetime',
+           'clear_datetime_cache',
            'find_fail_conversion_to_numeric',
            'convert_object_to_numeric',
            'convert_integer_to_boolean',
            'standardize_gender_values',
-           
+           'optimize_dtypes',
+
+           'compute_music_activity',
+           'build_listening_sessions',
+           'summarize_user_sessions',
+           'build_activity_time_series',
+           'rolling_activity',
+           'activity_peaks',
+           'build_preference_matrix',
+           'normalize_preference_matrix',
+           'split_preference_matrix_by_city',
+           'save_preference_matrix',
+           'load_preference_matrix',
+           'UserBitmap',
+
+           'TopKCounter',
+           'StreamingDeduplicator',
+           'drop_duplicates_streaming',
+           'hash_rows',
+           'StratifiedReservoirSampler',
+
+           'ActivityIndex',
+           'AudienceIndex',
+
+           'ContingencyTable',
+
+           'save_activity_tables',
+           'load_activity_table',
+           'list_activity_tables',
+           'describe_activity_store',
+
+           'PipelineStage',
+           'Pipeline',
+           'build_music_pipeline',
+
+           'configure_eda_cache',
+           'clear_eda_cache',
+           'eda_cache_info',
            'outlier_limit_bounds',
            'evaluate_central_trend',
+           'summarize_distribution',
            'evaluate_correlation',
            'missing_values_heatmap',
            'plot_boxplots',
@@ -75,5 +179,45 @@ __all__ = ['load_dataset_from_zip',
            'plot_grouped_bars_indx',
            'plot_pairplot',
            'plot_scatter_matrix',
-           
-           'format_notebook']
\ No newline at end of file
+
+           'set_backend',
+           'get_backend',
+           'use_backend',
+
+           'format_notebook',
+
+           'profiling',
+           'is_profiling_enabled',
+           'reset_profile',
+           'profile_report',
+           'export_profile_trace',
+           'export_profile_flamegraph']
+
+
+# Resolves a public name on first access, importing only the submodule that defines it
+def __getattr__(name):
+    module_name = _NAME_TO_MODULE.get(name)
+
+    if module_name is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+    try:
+        module = importlib.import_module(f".{module_name}", __name__)
+    except ImportError as e:
+        raise ImportError("One or more modules could not be found."
+                          "Ensure required scripts exist in the same directory as '__init__.py'.") from e
+
+    value = getattr(module, name)
+
+    # Opt-in instrumentation (SRC_PROFILE=1 or 'with profiling():') of every public function of the package
+    if module_name != 'profiler' and callable(value) and not isinstance(value, type):
+        from .profiler import instrument
+        value = instrument(value)
+
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,62 @@
+# __main__.py for running the music activity pipeline from the command line
+#
+# Usage (from the project root):
+#   python -m src --raw data/raw/music_project_en.csv --workers 2
+#   python -m src --status                # show which stages are fresh, without running anything
+#   python -m src --force clean           # rerun 'clean' even if its cached output is fresh
+
+import argparse
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+from .pipeline import build_music_pipeline
+
+project_root = Path(__file__).resolve().parent.parent
+
+
+# Main entry point of the headless pipeline
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m src',
+                                     description="Run the raw -> clean -> features -> eda music activity pipeline, "
+                                                 "skipping the stages whose inputs and parameters did not change.")
+    parser.add_argument('--raw', type=Path, default=project_root / 'data' / 'raw' / 'music_project_en.csv',
+                        help="Raw CSV event log.")
+    parser.add_argument('--sep', default=',', help="Field separator of the raw CSV.")
+    parser.add_argument('--processed-dir', type=Path, default=None,
+                        help="Directory where the processed tables are written (default: data/processed "
+                             "next to the raw directory).")
+    parser.add_argument('--cache-dir', type=Path, default=None,
+                        help="Directory of the cached stage outputs (default: data/interim/pipeline "
+                             "next to the raw directory).")
+    parser.add_argument('--workers', type=int, default=None, help="Stages run at the same time.")
+    parser.add_argument('--canonical-mapping', type=Path, default=None,
+                        help="JSON file from save_canonical_mapping() applied after cleaning.")
+    parser.add_argument('--gap-minutes', type=float, default=30, help="Inactivity gap that splits sessions.")
+    parser.add_argument('--backend', choices=['pandas', 'polars'], default=None,
+                        help="Backend of compute_music_activity.")
+    parser.add_argument('--force', nargs='+', default=[], metavar='STAGE',
+                        help="Stages to rerun even if fresh ('all' for every stage).")
+    parser.add_argument('--status', action='store_true', help="Only report which stages are fresh.")
+    parser.add_argument('--verbose', action='store_true', help="Show the output printed by the stages.")
+    args = parser.parse_args(argv)
+
+    pipeline = build_music_pipeline(args.raw, processed_dir=args.processed_dir, cache_dir=args.cache_dir,
+                                    workers=args.workers, sep=args.sep, canonical_mapping=args.canonical_mapping,
+                                    gap_minutes=args.gap_minutes, backend=args.backend)
+
+    try:
+        report = pipeline.status() if args.status else pipeline.run(force=args.force, verbose=args.verbose)
+    except (FileNotFoundError, ValueError, RuntimeError) as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    with pd.option_context('display.width', 150):
+        print(report.drop(columns='key').to_string(index=False))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,269 @@
+# activity_store.py for storing the processed music activity tables in one indexed SQLite database
+#
+#     save_activity_tables(project_root / "data" / "processed" / "music_activity.sqlite",
+#                          {'music_activity_city': df_music_city, 'music_activity_time_city_day': df_music_time_city_day})
+#     load_activity_table(path, 'music_activity_time_city_day', city='springfield', hour=slice(8, 9))
+
+from contextlib import closing
+import json
+import os
+import re
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# Columns that get an index when present in a table
+ACTIVITY_KEYS = ('city', 'day', 'hour')
+
+# Table holding the pandas dtype (and categories of categorical columns) of every stored column
+_SCHEMA_TABLE = '_activity_schema'
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+# Function to validate a table or column name before using it in SQL
+def _identifier(name):
+    if not _IDENTIFIER.match(str(name)):
+        raise ValueError(f"*** Error *** > '{name}' is not a valid table or column name (letters, digits, '_').")
+
+    return f'"{name}"'
+
+# Function to get the SQLite column type of a pandas column (categoricals use the dtype of their categories)
+def _sqlite_type(series):
+    dtype = series.cat.categories.dtype if isinstance(series.dtype, pd.CategoricalDtype) else series.dtype
+
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+
+    return 'TEXT'
+
+# Function to serialize the categories and order of a categorical column for the schema table
+def _categories_json(dtype):
+    categories = dtype.categories
+    if pd.api.types.is_datetime64_any_dtype(categories) or pd.api.types.is_timedelta64_dtype(categories):
+        categories = categories.astype(str)
+    values = [value.item() if isinstance(value, np.generic) else value for value in categories.tolist()]
+
+    return json.dumps({'categories': values, 'dtype': str(dtype.categories.dtype), 'ordered': bool(dtype.ordered)})
+
+# Function to rebuild the categorical dtype stored in the schema table
+def _categorical_dtype(text):
+    stored = json.loads(text)
+    categories = pd.Index(stored['categories'])
+    try:
+        categories = categories.astype(stored['dtype'])
+    except (TypeError, ValueError):
+        pass
+
+    return pd.CategoricalDtype(categories, ordered=stored['ordered'])
+
+# Function to convert a column to values SQLite can store (None for missing)
+def _sqlite_values(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    if pd.api.types.is_datetime64_any_dtype(series) or pd.api.types.is_timedelta64_dtype(series):
+        series = series.astype(str)
+
+    generic = series.dtype == object
+    values = series.astype(object).where(series.notna(), None).tolist()
+
+    return [value.item() if isinstance(value, np.generic) else value for value in values] if generic else values
+
+# Function to write the processed activity tables to one indexed SQLite database
+def save_activity_tables(path, tables, if_exists='replace'):
+    """
+    Stores several aggregate tables (e.g. the six music_activity_* tables) in one SQLite file with typed
+    columns, an index on every city/day/hour column and a composite index on all of them, so later reads
+    can fetch a filtered slice with an indexed query. Column dtypes are recorded and restored by
+    load_activity_table(); categorical columns are stored with the SQL type of their categories (so an
+    integer 'hour' category can be filtered with hour=slice(8, 9)) and keep their categories and order.
+
+    Parameters:
+    path (Path or str): SQLite database file (created if needed).
+    tables (dict): {table name: DataFrame}. Names and columns must be letters, digits or '_'.
+    if_exists (str): 'replace' to overwrite existing tables, 'append' to add rows, 'fail' to raise.
+
+    Returns:
+    Path or str: The database path.
+
+    Raises:
+    ValueError: If a table exists and if_exists='fail', or a name is not a valid identifier.
+    """
+
+    if if_exists not in ('replace', 'append', 'fail'):
+        raise ValueError(f"*** Error *** > Invalid if_exists '{if_exists}'. Use 'replace', 'append' or 'fail'.")
+
+    directory = os.path.dirname(os.fspath(path))
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # closing() closes the file; the inner 'with connection' only commits (or rolls back) the transaction
+    with closing(sqlite3.connect(path)) as connection, connection:
+        connection.execute(f"CREATE TABLE IF NOT EXISTS {_SCHEMA_TABLE} "
+                           "(table_name TEXT, column_name TEXT, position INTEGER, dtype TEXT, categories TEXT, "
+                           "PRIMARY KEY (table_name, column_name))")
+
+        for name, df in tables.items():
+            table = _identifier(name)
+            columns = [_identifier(column) for column in df.columns]
+            exists = connection.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)).fetchone()
+
+            if exists and if_exists == 'fail':
+                raise ValueError(f"*** Error *** > Table '{name}' already exists in {path}.")
+            if exists and if_exists == 'replace':
+                connection.execute(f"DROP TABLE {table}")
+                connection.execute(f"DELETE FROM {_SCHEMA_TABLE} WHERE table_name=?", (name,))
+                exists = None
+
+            if not exists:
+                definitions = ', '.join(f"{column} {_sqlite_type(df[raw])}" for column, raw in zip(columns, df.columns))
+                connection.execute(f"CREATE TABLE {table} ({definitions})")
+                connection.executemany(f"INSERT INTO {_SCHEMA_TABLE} "
+                                       "(table_name, column_name, position, dtype, categories) VALUES (?, ?, ?, ?, ?)",
+                                       [(name, str(column), position, str(df[column].dtype),
+                                         _categories_json(df[column].dtype)
+                                         if isinstance(df[column].dtype, pd.CategoricalDtype) else None)
+                                        for position, column in enumerate(df.columns)])
+            else:
+                # Appended rows may bring new categories: extend the stored ones, keeping their order
+                stored = dict(connection.execute(f"SELECT column_name, categories FROM {_SCHEMA_TABLE} "
+                                                 "WHERE table_name=? AND categories IS NOT NULL", (name,)).fetchall())
+                for column, text in stored.items():
+                    if column not in df.columns or not isinstance(df[column].dtype, pd.CategoricalDtype):
+                        continue
+                    dtype = _categorical_dtype(text)
+                    new = df[column].cat.categories.difference(dtype.categories, sort=False)
+                    if len(new):
+                        merged = pd.CategoricalDtype(dtype.categories.append(new), ordered=dtype.ordered)
+                        connection.execute(f"UPDATE {_SCHEMA_TABLE} SET categories=? "
+                                           "WHERE table_name=? AND column_name=?",
+                                           (_categories_json(merged), name, column))
+
+            rows = zip(*[_sqlite_values(df[column]) for column in df.columns])
+            connection.executemany(f"INSERT INTO {table} ({', '.join(columns)}) "
+                                   f"VALUES ({', '.join('?' * len(columns))})", rows)
+
+            # Indexes are built after the bulk insert (IF NOT EXISTS keeps them across appends)
+            keys = [key for key in ACTIVITY_KEYS if key in df.columns]
+            for key in keys:
+                connection.execute(f"CREATE INDEX IF NOT EXISTS {_identifier(f'{name}_{key}_idx')} "
+                                   f"ON {table} ({_identifier(key)})")
+            if len(keys) > 1:
+                connection.execute(f"CREATE INDEX IF NOT EXISTS {_identifier(f'{name}_keys_idx')} ON {table} "
+                                   f"({', '.join(_identifier(key) for key in keys)})")
+
+    return path
+
+# Function to list the tables stored with save_activity_tables()
+def list_activity_tables(path):
+    """
+    Lists the activity tables stored in a database written by save_activity_tables().
+
+    Parameters:
+    path (Path or str): SQLite database file.
+
+    Returns:
+    list: Table names.
+
+    Raises:
+    FileNotFoundError: If the file does not exist.
+    """
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"*** Error ***\nFile not found: {path}\nCurrent working directory: {os.getcwd()}")
+
+    with closing(sqlite3.connect(path)) as connection:
+        rows = connection.execute(f"SELECT DISTINCT table_name FROM {_SCHEMA_TABLE} ORDER BY table_name").fetchall()
+
+    return [row[0] for row in rows]
+
+# Function to load an activity table, or an indexed slice of it, from the SQLite store
+# load_activity_table(path, 'music_activity_time_city_day', city='springfield', day=['monday', 'friday'], hour=slice(8, 9))
+def load_activity_table(path, name, columns=None, **filters):
+    """
+    Reads a table written by save_activity_tables(), optionally filtered with an indexed WHERE clause,
+    and restores the stored column dtypes (categorical columns get back their categories and order).
+
+    Parameters:
+    path (Path or str): SQLite database file.
+    name (str): Table name.
+    columns (list, optional): Columns to read. If None, all of them.
+    **filters: column=value conditions, combined with AND. A value can be a scalar (equality), a list/tuple/set
+               (IN) or an inclusive slice (BETWEEN, open ends allowed), e.g. hour=slice(8, 9).
+
+    Returns:
+    DataFrame: The matching rows.
+
+    Raises:
+    FileNotFoundError: If the file does not exist.
+    KeyError: If the table is not stored in the database.
+    """
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"*** Error ***\nFile not found: {path}\nCurrent working directory: {os.getcwd()}")
+
+    conditions, params = [], []
+    for column, value in filters.items():
+        column = _identifier(column)
+        if isinstance(value, slice):
+            if value.start is not None:
+                conditions.append(f"{column} >= ?")
+                params.append(value.start)
+            if value.stop is not None:
+                conditions.append(f"{column} <= ?")
+                params.append(value.stop)
+        elif isinstance(value, (list, tuple, set, np.ndarray, pd.Index)):
+            value = list(value)
+            conditions.append(f"{column} IN ({', '.join('?' * len(value))})" if value else "0")
+            params.extend(value)
+        else:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+
+    params = [param.item() if isinstance(param, np.generic) else param for param in params]
+    selected = '*' if columns is None else ', '.join(_identifier(column) for column in columns)
+    query = f"SELECT {selected} FROM {_identifier(name)}" + (f" WHERE {' AND '.join(conditions)}" if conditions else '')
+
+    with closing(sqlite3.connect(path)) as connection:
+        schema = connection.execute(f"SELECT column_name, dtype, categories FROM {_SCHEMA_TABLE} "
+                                    "WHERE table_name=? ORDER BY position", (name,)).fetchall()
+        if not schema:
+            raise KeyError(f"*** Error *** > Table '{name}' is not stored in {path}.")
+        df = pd.read_sql_query(query, connection, params=params)
+
+    for column, dtype, categories in schema:
+        if column not in df.columns:
+            continue
+        try:
+            df[column] = df[column].astype(_categorical_dtype(categories) if categories else dtype)
+        except (TypeError, ValueError):
+            pass
+
+    return df
+
+# Function to describe the stored tables and their dtypes
+def describe_activity_store(path):
+    """
+    Returns the stored column dtypes of every table of an activity database.
+
+    Parameters:
+    path (Path or str): SQLite database file.
+
+    Returns:
+    DataFrame: 'table_name', 'column_name', 'dtype' and 'rows'.
+    """
+
+    tables = list_activity_tables(path)
+
+    with closing(sqlite3.connect(path)) as connection:
+        schema = pd.read_sql_query(f"SELECT table_name, column_name, dtype FROM {_SCHEMA_TABLE} "
+                                   "ORDER BY table_name, position", connection)
+        rows = {table: connection.execute(f"SELECT COUNT(*) FROM {_identifier(table)}").fetchone()[0]
+                for table in tables}
+
+    schema['rows'] = schema['table_name'].map(rows)
+
+    return schema
@@ -0,0 +1,274 @@
+# backends.py for running cleaning and aggregation on a pluggable execution engine
+#
+# The public functions of data_cleaning and features keep taking and returning pandas DataFrames.
+# With the 'polars' backend the work in between runs as a lazily planned, multithreaded Polars query
+# over Arrow memory, and pandas is only materialized at the boundary.
+#
+#     set_backend('polars')            # process-wide (or SRC_BACKEND=polars)
+#     with use_backend('polars'):      # for a block of code
+#         df_music = normalize_string_format(df_music)
+
+from contextlib import contextmanager
+import importlib.util
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from .utils import lazy_import
+
+pl = lazy_import('polars')
+
+BACKENDS = ('pandas', 'polars')
+
+_BACKEND = os.environ.get('SRC_BACKEND', 'pandas').strip().lower() or 'pandas'
+
+
+# Function to validate a backend name and return the backend to use
+def resolve_backend(backend=None):
+    """
+    Returns the backend to use for a call: 'backend' if given, otherwise the current default.
+
+    Parameters:
+    backend (str, optional): 'pandas' or 'polars'.
+
+    Returns:
+    str: The backend name.
+
+    Raises:
+    ValueError: If the backend is unknown.
+    ImportError: If the backend library is not installed.
+    """
+
+    backend = _BACKEND if backend is None else backend.strip().lower()
+
+    if backend not in BACKENDS:
+        raise ValueError(f"*** Error *** > Unknown backend '{backend}'. Use one of {list(BACKENDS)}.")
+
+    if backend != 'pandas' and importlib.util.find_spec(backend) is None:
+        raise ImportError(f"*** Error *** > The '{backend}' backend requires the '{backend}' package to be installed.")
+
+    return backend
+
+# Function to set the default execution backend
+def set_backend(backend):
+    """
+    Sets the default execution backend of the cleaning and aggregation functions.
+
+    Parameters:
+    backend (str): 'pandas' or 'polars'.
+    """
+
+    global _BACKEND
+    _BACKEND = resolve_backend(backend)
+
+# Function to get the default execution backend
+def get_backend():
+    """
+    Returns the name of the default execution backend.
+    """
+
+    return _BACKEND
+
+# Context manager to switch the execution backend for a block of code
+@contextmanager
+def use_backend(backend):
+    """
+    Temporarily sets the default execution backend inside a 'with' block.
+
+    Parameters:
+    backend (str): 'pandas' or 'polars'.
+
+    Yields:
+    None
+    """
+
+    global _BACKEND
+    previous = _BACKEND
+    set_backend(backend)
+
+    try:
+        yield
+    finally:
+        _BACKEND = previous
+
+# Function to convert selected pandas columns to a lazy Polars frame
+def _to_polars(df, columns):
+    """
+    Converts the given pandas columns to a Polars LazyFrame. Categorical columns are passed by value.
+    """
+
+    data = {}
+    for column in columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(series.cat.categories.dtype if not series.isna().any() else 'object')
+        data[column] = series.reset_index(drop=True)
+
+    return pl.from_pandas(pd.DataFrame(data)).lazy()
+
+# Function to write Polars results back into a pandas DataFrame
+def _assign_columns(df, result, columns, missing=None):
+    """
+    Copies the columns of a collected Polars DataFrame back into 'df', replacing nulls by 'missing' if given.
+    Columns that had a pandas string dtype (e.g. 'string[pyarrow]') keep it.
+    """
+
+    string_columns = [column for column in columns if result.schema[column] == pl.String]
+    result = result.to_pandas()
+
+    for column in columns:
+        values = result[column]
+        if column in string_columns and isinstance(df[column].dtype, pd.StringDtype):
+            df[column] = values.astype(df[column].dtype).array
+            continue
+        if missing is not None:
+            values = values.astype(object).where(values.notna(), missing)
+        df[column] = values.to_numpy()
+
+    return df
+
+# Polars implementation of data_cleaning.normalize_string_format
+def polars_normalize_string_format(df, columns):
+    """
+    Lowercases, strips and snake_cases the given string columns with Polars.
+
+    Parameters:
+    df (DataFrame): The input pandas DataFrame.
+    columns (list): String columns to normalize.
+
+    Returns:
+    DataFrame: 'df' with the normalized columns.
+    """
+
+    if not columns:
+        return df
+
+    result = _to_polars(df, columns).with_columns([
+        pl.col(column).cast(pl.String)
+          .str.to_lowercase()
+          .str.strip_chars()
+          .str.replace_all(r'[^\w\s]', ' ')
+          .str.replace_all(r'\s+', '_')
+          .str.replace_all(r'__+', '_')
+        for column in columns
+    ]).collect()
+
+    return _assign_columns(df, result, columns, missing=np.nan)
+
+# Polars implementation of data_cleaning.replace_missing_values
+def polars_replace_missing_values(df, columns, missing_values):
+    """
+    Replaces the given sentinel values by pd.NA in string columns with Polars.
+
+    Parameters:
+    df (DataFrame): The input pandas DataFrame.
+    columns (list): String columns to process.
+    missing_values (list): Values treated as missing.
+
+    Returns:
+    DataFrame: 'df' with sentinel values replaced by pd.NA.
+    """
+
+    if not columns:
+        return df
+
+    result = _to_polars(df, columns).with_columns([
+        pl.when(pl.col(column).cast(pl.String).is_in(missing_values))
+          .then(None)
+          .otherwise(pl.col(column).cast(pl.String))
+          .alias(column)
+        for column in columns
+    ]).collect()
+
+    return _assign_columns(df, result, columns, missing=pd.NA)
+
+# Polars implementation of data_cleaning.normalize_datetime
+def polars_normalize_datetime(df, columns, frmt=None, time_zone='UTC'):
+    """
+    Parses string columns to time-of-day values (for '%H:%M:%S'/'%H:%M' formats) or datetimes localized
+    to 'time_zone' with Polars. Unparseable values become missing.
+
+    Parameters:
+    df (DataFrame): The input pandas DataFrame.
+    columns (list): String columns to parse.
+    frmt (str, optional): Datetime format. If None, Polars infers it.
+    time_zone (str): Timezone used to localize the parsed datetimes (strings with a UTC offset are converted).
+
+    Returns:
+    DataFrame: 'df' with the parsed columns.
+    """
+
+    if not columns:
+        return df
+
+    time_only = frmt in ["%H:%M:%S", "%H:%M"]
+
+    aware = {column: not time_only and _has_utc_offset(df[column], frmt) for column in columns}
+
+    expressions = []
+    for column in columns:
+        expression = pl.col(column).cast(pl.String)
+        if time_only:
+            expression = expression.str.strptime(pl.Time, format=frmt, strict=False)
+        elif aware[column]:
+            # Offsets are resolved to UTC, then converted to 'time_zone' below
+            expression = expression.str.to_datetime(format=frmt, time_unit='ns', time_zone='UTC', strict=False)
+        else:
+            expression = expression.str.strptime(pl.Datetime('ns'), format=frmt, strict=False)
+        expressions.append(expression.alias(column))
+
+    result = _to_polars(df, columns).with_columns(expressions).collect()
+
+    if time_only:
+        return _assign_columns(df, result, columns, missing=pd.NaT)
+
+    result = result.to_pandas()
+    for column in columns:
+        values = result[column].set_axis(df.index)
+        df[column] = values.dt.tz_convert(time_zone) if aware[column] else values.dt.tz_localize(time_zone)
+
+    return df
+
+# Trailing UTC offset of a datetime string ('Z', '+02:00', '-0500')
+_UTC_OFFSET = re.compile(r'(Z|[+-]\d{2}:?\d{2})$')
+
+# Function to check whether a string column holds datetimes with a UTC offset
+def _has_utc_offset(series, frmt=None):
+    """
+    Returns True if the format has a '%z' directive or, without a format, the first value ends with an offset
+    (pandas infers the format from the first value in the same way).
+    """
+
+    if frmt is not None:
+        return '%z' in frmt
+
+    values = series.dropna()
+
+    return not values.empty and _UTC_OFFSET.search(str(values.iloc[0]).strip()) is not None
+
+# Polars implementation of features.compute_music_activity
+def polars_music_activity(df, by, track_col='track', user_col='userid'):
+    """
+    Computes total plays, distinct tracks and distinct users per group with a lazy Polars query.
+
+    Parameters:
+    df (DataFrame): The cleaned event log (pandas).
+    by (list): Grouping columns.
+    track_col (str): Track column.
+    user_col (str): User column.
+
+    Returns:
+    DataFrame: Grouping columns plus 'total_tracks', 'tracks' and 'users', sorted by the grouping columns.
+    """
+
+    result = (_to_polars(df, by + [track_col, user_col])
+              .group_by(by)
+              .agg(pl.col(track_col).count().cast(pl.Int64).alias('total_tracks'),
+                   pl.col(track_col).drop_nulls().n_unique().cast(pl.Int64).alias('tracks'),
+                   pl.col(user_col).drop_nulls().n_unique().cast(pl.Int64).alias('users'))
+              .sort(by)
+              .collect())
+
+    return result.to_pandas()
@@ -0,0 +1,311 @@
+# contingency.py for N-way contingency tables and independence tests over category codes
+
+import numpy as np
+import pandas as pd
+
+from .features import _column_codes
+from .utils import lazy_import
+
+stats = lazy_import('scipy.stats')
+
+
+# Function to drop the levels of a count array whose marginal total is zero
+def _drop_empty_levels(observed):
+    for axis in range(observed.ndim):
+        other_axes = tuple(a for a in range(observed.ndim) if a != axis)
+        keep = observed.sum(axis=other_axes) > 0
+        observed = np.compress(keep, observed, axis=axis)
+
+    return observed
+
+# Function to compute the expected counts and degrees of freedom under mutual independence
+def _independence_expected(observed):
+    """
+    Returns (observed, expected, dof) for the mutual independence of all the axes of 'observed',
+    after dropping empty levels (as scipy.stats.chi2_contingency, but without requiring them to be absent).
+    """
+
+    observed = _drop_empty_levels(np.asarray(observed, dtype=np.float64))
+    n = observed.sum()
+
+    if n == 0:
+        return observed, observed, 0
+
+    expected = np.full(observed.shape, n)
+    for axis in range(observed.ndim):
+        other_axes = tuple(a for a in range(observed.ndim) if a != axis)
+        shape = [1] * observed.ndim
+        shape[axis] = -1
+        expected = expected * (observed.sum(axis=other_axes) / n).reshape(shape)
+
+    dof = observed.size - 1 - sum(size - 1 for size in observed.shape)
+
+    return observed, expected, max(dof, 0)
+
+# Function to compute a chi-square or G statistic from observed and expected counts
+def _statistic(observed, expected, method):
+    if method == 'chi2':
+        return float(((observed - expected) ** 2 / expected).sum())
+
+    positive = observed > 0
+    return float(2 * (observed[positive] * np.log(observed[positive] / expected[positive])).sum())
+
+
+class ContingencyTable:
+    """
+    N-way contingency table (e.g. genre x city x day) built from integer category codes: each chunk's
+    codes are combined into one mixed-radix key and counted with a single np.bincount, so tables over the
+    full log cost one linear pass and can be accumulated chunk by chunk or merged across partitions.
+    Labels unseen in earlier chunks extend the table.
+
+    Parameters:
+    columns (list or tuple): Columns crossed by the table, e.g. ['genre', 'city', 'day'].
+
+    Example:
+    table = ContingencyTable(['genre', 'city', 'day'])
+    for chunk in pd.read_csv(path, chunksize=1_000_000):
+        table.update(chunk)
+    table.test(['genre', 'city'])                  # genre vs city, days pooled
+    table.test(['genre', 'city'], given=['day'])   # genre vs city within each day
+    table.residuals(['genre', 'city'])             # which genres drive the difference
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.rows = 0
+        self.counts = np.zeros((0,) * len(self.columns), dtype=np.int64)
+        self._labels = [[] for _ in self.columns]
+        self._lookup = [{} for _ in self.columns]
+
+    def __repr__(self):
+        return f"ContingencyTable(columns={self.columns}, shape={self.counts.shape}, rows={self.rows})"
+
+    @property
+    def labels(self):
+        """List with the Index of labels of every column."""
+        return [pd.Index(labels, name=column) for labels, column in zip(self._labels, self.columns)]
+
+    def _global_codes(self, level, labels):
+        """Maps chunk labels to table codes, registering new labels."""
+
+        lookup, known = self._lookup[level], self._labels[level]
+        codes = np.empty(len(labels), dtype=np.int64)
+        for i, label in enumerate(labels):
+            code = lookup.get(label)
+            if code is None:
+                code = lookup[label] = len(known)
+                known.append(label)
+            codes[i] = code
+
+        return codes
+
+    def _grow(self):
+        """Pads the count array with zeros for labels registered since the last update."""
+
+        shape = tuple(len(labels) for labels in self._labels)
+        if shape != self.counts.shape:
+            self.counts = np.pad(self.counts, [(0, new - old) for new, old in zip(shape, self.counts.shape)])
+
+    def update(self, chunk):
+        """
+        Counts one chunk of rows. Rows with a missing value in any of the columns are ignored.
+
+        Parameters:
+        chunk (DataFrame): Rows containing every column of the table.
+
+        Returns:
+        ContingencyTable: self, to allow chaining.
+        """
+
+        keys = np.zeros(len(chunk), dtype=np.int64)
+        valid = np.ones(len(chunk), dtype=bool)
+        level_codes = []
+
+        for level, column in enumerate(self.columns):
+            codes, uniques = _column_codes(chunk[column])
+            mapping = self._global_codes(level, uniques)
+            valid &= codes >= 0
+            level_codes.append(np.where(codes >= 0, mapping[np.maximum(codes, 0)] if len(mapping) else 0, 0))
+
+        self._grow()
+        for level, codes in enumerate(level_codes):
+            keys = keys * self.counts.shape[level] + codes
+
+        self.counts += np.bincount(keys[valid], minlength=self.counts.size).reshape(self.counts.shape)
+        self.rows += int(valid.sum())
+
+        return self
+
+    def consume(self, chunks):
+        """
+        Updates the table with every chunk of an iterable (e.g. pd.read_csv(..., chunksize=n)).
+
+        Parameters:
+        chunks (iterable of DataFrame): The chunks to count.
+
+        Returns:
+        ContingencyTable: self.
+        """
+
+        for chunk in chunks:
+            self.update(chunk)
+
+        return self
+
+    def merge(self, other):
+        """
+        Adds the counts of another table over the same columns (e.g. built on another partition).
+
+        Parameters:
+        other (ContingencyTable): Table over the same columns.
+
+        Returns:
+        ContingencyTable: self, holding the combined counts.
+
+        Raises:
+        ValueError: If the tables cross different columns.
+        """
+
+        if other.columns != self.columns:
+            raise ValueError("*** Error *** > Only tables over the same columns can be merged.")
+
+        index = tuple(np.ix_(*[self._global_codes(level, labels) for level, labels in enumerate(other._labels)]))
+        self._grow()
+        np.add.at(self.counts, index, other.counts)
+        self.rows += other.rows
+
+        return self
+
+    def marginal(self, columns=None):
+        """
+        Returns the counts summed over every column not in 'columns', with axes in the order of 'columns'.
+
+        Parameters:
+        columns (list, optional): Columns to keep. If None, all of them.
+
+        Returns:
+        ndarray: The marginal count array.
+
+        Raises:
+        ValueError: If a column is not part of the table.
+        """
+
+        columns = self.columns if columns is None else list(columns)
+        missing = [column for column in columns if column not in self.columns]
+        if missing:
+            raise ValueError(f"*** Error *** > Columns {missing} are not part of the table {self.columns}.")
+
+        axes = [self.columns.index(column) for column in columns]
+        other_axes = tuple(a for a in range(len(self.columns)) if a not in axes)
+        summed = self.counts.sum(axis=other_axes)
+        kept = sorted(axes)
+
+        return np.transpose(summed, [kept.index(axis) for axis in axes])
+
+    def to_frame(self, columns=None):
+        """
+        Returns the (marginal) table with labels: a crosstab DataFrame for two columns, otherwise a Series
+        indexed by every combination of labels.
+
+        Parameters:
+        columns (list, optional): Columns to keep. If None, all of them.
+
+        Returns:
+        DataFrame or Series: Counts.
+        """
+
+        columns = self.columns if columns is None else list(columns)
+        counts = self.marginal(columns)
+        labels = [self.labels[self.columns.index(column)] for column in columns]
+
+        if len(columns) == 2:
+            return pd.DataFrame(counts, index=labels[0], columns=labels[1])
+
+        return pd.Series(counts.ravel(), index=pd.MultiIndex.from_product(labels, names=columns), name='count')
+
+    def test(self, columns=None, given=None, method='chi2'):
+        """
+        Tests the mutual independence of 'columns' with a Pearson chi-square or a G (log-likelihood ratio) test.
+        With 'given', the test is conditional: statistics and degrees of freedom are summed over the strata
+        defined by the 'given' columns (e.g. genre vs city within each day). Empty levels are ignored.
+
+        Parameters:
+        columns (list, optional): Columns tested for independence. If None, all columns not in 'given'.
+        given (list, optional): Columns defining the strata of a conditional test.
+        method (str): 'chi2' (Pearson) or 'g' (G-test).
+
+        Returns:
+        dict: 'statistic', 'dof', 'p_value', 'method' and 'n' (rows counted).
+
+        Raises:
+        ValueError: If 'method' is unknown or a column is not part of the table.
+        """
+
+        if method not in ('chi2', 'g'):
+            raise ValueError(f"*** Error *** > Invalid method '{method}'. Use 'chi2' or 'g'.")
+
+        given = [] if given is None else list(given)
+        columns = [c for c in self.columns if c not in given] if columns is None else list(columns)
+
+        counts = self.marginal(given + columns)
+        strata = counts.reshape((-1,) + counts.shape[len(given):]) if given else counts[None]
+
+        statistic, dof = 0.0, 0
+        for stratum in strata:
+            observed, expected, stratum_dof = _independence_expected(stratum)
+            if stratum_dof > 0:
+                statistic += _statistic(observed, expected, method)
+                dof += stratum_dof
+
+        p_value = float(stats.chi2.sf(statistic, dof)) if dof > 0 else np.nan
+
+        return {'statistic': statistic, 'dof': dof, 'p_value': p_value, 'method': method, 'n': int(counts.sum())}
+
+    def residuals(self, columns=None, kind='adjusted'):
+        """
+        Returns the residuals of the independence model of 'columns': Pearson residuals (o - e) / sqrt(e), or
+        adjusted standardized residuals (approximately standard normal; |r| > 2 marks the cells that drive a
+        significant test) for two-way tables.
+
+        Parameters:
+        columns (list, optional): Columns to keep. If None, all of them.
+        kind (str): 'adjusted' (two columns only) or 'pearson'.
+
+        Returns:
+        DataFrame or Series: Residuals labeled as to_frame(); NaN for empty levels.
+
+        Raises:
+        ValueError: If 'kind' is unknown, or 'adjusted' is requested for other than two columns.
+        """
+
+        columns = self.columns if columns is None else list(columns)
+
+        if kind not in ('adjusted', 'pearson'):
+            raise ValueError(f"*** Error *** > Invalid kind '{kind}'. Use 'adjusted' or 'pearson'.")
+        if kind == 'adjusted' and len(columns) != 2:
+            raise ValueError("*** Error *** > Adjusted residuals are defined for two-way tables; use kind='pearson'.")
+
+        observed = self.marginal(columns).astype(np.float64)
+        n = observed.sum()
+        expected = np.full(observed.shape, n)
+        margins = []
+        for axis in range(observed.ndim):
+            other_axes = tuple(a for a in range(observed.ndim) if a != axis)
+            shape = [1] * observed.ndim
+            shape[axis] = -1
+            margin = (observed.sum(axis=other_axes) / n if n else observed.sum(axis=other_axes)).reshape(shape)
+            margins.append(margin)
+            expected = expected * margin
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            residuals = (observed - expected) / np.sqrt(expected)
+            if kind == 'adjusted':
+                residuals = residuals / np.sqrt((1 - margins[0]) * (1 - margins[1]))
+
+        residuals[expected == 0] = np.nan
+        labels = [self.labels[self.columns.index(column)] for column in columns]
+
+        if len(columns) == 2:
+            return pd.DataFrame(residuals, index=labels[0], columns=labels[1])
+
+        return pd.Series(residuals.ravel(), index=pd.MultiIndex.from_product(labels, names=columns), name='residual')
@@ -1,16 +1,23 @@
 # data_cleaning.py for dataset cleaning
+from datetime import datetime, timezone
 from difflib import SequenceMatcher
-from IPython.display import display, HTML
+import json
 import numpy as np
+import os
 import pandas as pd
 import re
-from tqdm import tqdm
+
+from .backends import (resolve_backend,
+                       polars_normalize_string_format,
+                       polars_replace_missing_values,
+                       polars_normalize_datetime)
+from .utils import display, HTML, is_text_column, is_arrow_string_column
 
 
 # Function to identify non-standard missing values in object-type columns
 def check_existing_missing_values(df):
     """
-    Checks object-type columns in a DataFrame for non-standard missing values.
+    Checks text (object or string dtype) columns in a DataFrame for non-standard missing values.
 
     Parameters:
     df (DataFrame): The dataset to inspect.
@@ -25,7 +32,7 @@ def check_existing_missing_values(df):
     display(HTML(f"<h4>Scanning for Non-Standard Missing Values</h4>"))
 
     for column in df.columns:
-        if df[column].dtype != 'object':
+        if not is_text_column(df[column]):
             continue
 
         matches = df[df[column].isin(missing_values)][column].unique()
@@ -42,14 +49,15 @@ def check_existing_missing_values(df):
     return None
 
 # Function to standardize non-standard missing values to pd.NA
-def replace_missing_values(df, include=None, exclude=None):
+def replace_missing_values(df, include=None, exclude=None, backend=None):
     """
-    Replaces common non-standard missing value entries in object-type columns with pd.NA.
+    Replaces common non-standard missing value entries in text (object or string dtype) columns with pd.NA.
 
     Parameters:
     df (DataFrame): The input dataset.
     include (list, optional): List of columns to include. If None, all columns except those in 'exclude' are considered.
     exclude (list, optional): List of columns to exclude from replacement.
+    backend (str, optional): Execution backend ('pandas' or 'polars'). If None, uses the default set with set_backend().
 
     Returns:
     DataFrame: Updated DataFrame with non-standard missing values replaced by pd.NA.
@@ -65,16 +73,21 @@ def replace_missing_values(df, include=None, exclude=None):
     else:
         available_columns = [col for col in include if col not in exclude]
 
+    if resolve_backend(backend) == 'polars':
+        columns = [col for col in available_columns if is_text_column(df[col])]
+        return polars_replace_missing_values(df, columns, missing_values)
+
     for column in available_columns:
-        if df[column].dtype == 'object' and df[column].isin(missing_values).any():
+        if is_text_column(df[column]) and df[column].isin(missing_values).any():
             df[column] = df[column].replace(missing_values, pd.NA)
 
     return df
 
 # Function to normalize string formatting in object-type columns
-def normalize_string_format(df, include=None, exclude=None):
+def normalize_string_format(df, include=None, exclude=None, backend=None):
     """
-    Standardizes text formatting for object-type (string) columns in a DataFrame.
+    Standardizes text formatting for object-type and string dtype columns in a DataFrame.
+    String dtypes (e.g. 'string[pyarrow]') are kept, so the operations run in Arrow kernels.
 
     Operations performed:
     - Converts text to lowercase
@@ -87,6 +100,7 @@ def normalize_string_format(df, include=None, exclude=None):
     df (DataFrame): The input DataFrame.
     include (list, optional): Specific columns to apply formatting to. If None, applies to all except those in 'exclude'.
     exclude (list, optional): Columns to skip.
+    backend (str, optional): Execution backend ('pandas' or 'polars'). If None, uses the default set with set_backend().
 
     Returns:
     DataFrame: Updated DataFrame with normalized string formats.
@@ -100,12 +114,22 @@ def normalize_string_format(df, include=None, exclude=None):
     else:
         available_columns = [col for col in include if col not in exclude]
 
+    if resolve_backend(backend) == 'polars':
+        columns = [col for col in available_columns if is_text_column(df[col])]
+        return polars_normalize_string_format(df, columns)
+
     for column in available_columns:
-        if df[column].dtype == 'object':
+        if is_text_column(df[column]):
+            # Arrow string kernels use RE2, where \w and \s are ASCII-only, so Unicode classes are spelled out
+            if is_arrow_string_column(df[column]):
+                punctuation, spaces = r'[^\pL\pN_\s\p{Z}]', r'[\s\p{Z}]+'
+            else:
+                punctuation, spaces = r'[^\w\s]', r'\s+'
+
             df[column] = df[column].str.lower()
             df[column] = df[column].str.strip()
-            df[column] = df[column].str.replace(r'[^\w\s]', ' ', regex=True)
-            df[column] = df[column].str.replace(r'\s+', '_', regex=True)
+            df[column] = df[column].str.replace(punctuation, ' ', regex=True)
+            df[column] = df[column].str.replace(spaces, '_', regex=True)
             df[column] = df[column].str.replace(r'__+', '_', regex=True)
 
     return df
@@ -140,6 +164,49 @@ def normalize_columns_headers_format(df):
 
     return df
 
+# Function to compare every pair of distinct string values with the implicit-duplicate rules
+def _implicit_duplicate_matches(values, fuzzy_threshold=0.85, progress=None):
+    """
+    Finds, for each value, the other values that are likely the same entry: their normalized forms
+    (lowercase alphanumerics) contain one another, they share a word token (camelCase or underscore
+    separated parts), or their similarity ratio reaches 'fuzzy_threshold'.
+
+    Parameters:
+    values (list): Distinct string values.
+    fuzzy_threshold (float): Minimum similarity ratio (0 to 1) for fuzzy matching.
+    progress (callable, optional): Wraps the outer loop, e.g. a tqdm progress bar.
+
+    Returns:
+    dict: {value: [matching values]} for the values with at least one match.
+    """
+
+    normalized_values = {v: re.sub(r'\W+', '', v.lower()) for v in values}
+    word_parts = {v: set(re.findall(r'[A-Za-z0-9]+', v.lower())) for v in values}
+    results = {}
+
+    for base in (values if progress is None else progress(values)):
+        base_norm = normalized_values[base]
+        base_parts = word_parts[base]
+        matches = []
+
+        for other in values:
+            if base == other:
+                continue
+            other_norm = normalized_values[other]
+
+            if (
+                base_norm in other_norm or
+                other_norm in base_norm or
+                base_parts & word_parts[other] or
+                SequenceMatcher(None, base_norm, other_norm).ratio() >= fuzzy_threshold
+            ):
+                matches.append(other)
+
+        if matches:
+            results[base] = matches
+
+    return results
+
 # Function to detect potential implicit duplicates using fuzzy matching and normalization
 def detect_implicit_duplicates(df, include=None, exclude=None, fuzzy_threshold=0.85):
     """
@@ -156,19 +223,7 @@ def detect_implicit_duplicates(df, include=None, exclude=None, fuzzy_threshold=0
     Displays lists of entries in each column that are likely to be semantically or visually duplicated.
     """
 
-    def normalize(value):
-        """Converts string to lowercase and removes non-alphanumeric characters."""
-        return re.sub(r'\W+', '', value.lower()) if isinstance(value, str) else ''
-
-    def split_words(value):
-        """Splits a string into alphanumeric tokens, including camelCase or underscore-separated parts."""
-        if not isinstance(value, str):
-            return []
-        return re.findall(r'[A-Za-z0-9]+', value.lower())
-
-    def fuzzy_match(a, b):
-        """Returns True if similarity between two strings exceeds the defined threshold."""
-        return SequenceMatcher(None, a, b).ratio() >= fuzzy_threshold
+    from tqdm import tqdm
 
     display(HTML(f"<h4>Scanning for Implicit Duplicates</h4>"))
 
@@ -184,30 +239,9 @@ def detect_implicit_duplicates(df, include=None, exclude=None, fuzzy_threshold=0
 
         values = df[col].dropna().unique()
         values = [v for v in values if isinstance(v, str)]
-        normalized_values = {v: normalize(v) for v in values}
-        results = {}
-
-        for base in tqdm(values, desc=f"Comparing column '{col}'", unit=" values"):
-            base_norm = normalized_values[base]
-            base_parts = set(split_words(base))
-            matches = []
-
-            for other in values:
-                if base == other:
-                    continue
-                other_norm = normalized_values[other]
-                other_parts = set(split_words(other))
-
-                if (
-                    base_norm in other_norm or 
-                    other_norm in base_norm or 
-                    base_parts & other_parts or 
-                    fuzzy_match(base_norm, other_norm)
-                ):
-                    matches.append(other)
-
-            if matches:
-                results[base] = matches
+        results = _implicit_duplicate_matches(
+            values, fuzzy_threshold,
+            progress=lambda items: tqdm(items, desc=f"Comparing column '{col}'", unit=" values"))
 
         display(HTML(f"<br><b>Results for column:</b> <i>{col}</i>"))
         if results:
@@ -218,8 +252,291 @@ def detect_implicit_duplicates(df, include=None, exclude=None, fuzzy_threshold=0
 
     return None
 
+# Function to group matched values into clusters with a union-find (disjoint-set) structure
+def _union_find_clusters(values, matches):
+    """
+    Merges every (value, match) pair into connected clusters.
+
+    Parameters:
+    values (list): The distinct values.
+    matches (dict): {value: [matching values]} as returned by _implicit_duplicate_matches().
+
+    Returns:
+    list: Clusters (lists of values, in the order of 'values') with more than one member.
+    """
+
+    position = {value: i for i, value in enumerate(values)}
+    parent = list(range(len(values)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for base, found in matches.items():
+        for other in found:
+            a, b = find(position[base]), find(position[other])
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+
+    clusters = {}
+    for value in values:
+        clusters.setdefault(find(position[value]), []).append(value)
+
+    return [cluster for cluster in clusters.values() if len(cluster) > 1]
+
+# Function to build canonicalization dictionaries from implicit-duplicate clusters
+# mapping = build_canonical_mapping(df_music, include=['genre'])
+def build_canonical_mapping(df, include=None, exclude=None, fuzzy_threshold=0.85, representative='most_frequent'):
+    """
+    Runs the implicit-duplicate matching of detect_implicit_duplicates(), merges the matches into
+    clusters with union-find and maps every member of a cluster to one representative.
+    The matching rules are deliberately loose: review (and edit) the mapping before saving it with
+    save_canonical_mapping(); later runs only need apply_canonical_mapping().
+
+    Parameters:
+    df (DataFrame): The input dataset.
+    include (list, optional): Columns to process. If None, all text columns not in 'exclude'.
+    exclude (list, optional): Columns to skip.
+    fuzzy_threshold (float): Minimum similarity ratio (0 to 1) for fuzzy matching.
+    representative (str or callable): 'most_frequent' (ties broken by the shorter, then alphabetical, value),
+                                      'shortest', or a function taking the cluster values and their counts
+                                      (Series) and returning the representative.
+
+    Returns:
+    dict: {column: {variant: canonical value}} (representatives are not listed as variants).
+
+    Raises:
+    ValueError: If 'representative' is not valid.
+    """
+
+    if not callable(representative) and representative not in ('most_frequent', 'shortest'):
+        raise ValueError(f"*** Error *** > Invalid representative '{representative}'. "
+                         "Use 'most_frequent', 'shortest' or a function.")
+
+    if exclude is None:
+        exclude = []
+
+    if include is None:
+        columns = [col for col in df.columns if col not in exclude and is_text_column(df[col])]
+    else:
+        columns = [col for col in include if col in df.columns and col not in exclude]
+
+    mapping = {}
+    for col in columns:
+        counts = df[col].value_counts()
+        values = [v for v in counts.index if isinstance(v, str)]
+        clusters = _union_find_clusters(values, _implicit_duplicate_matches(values, fuzzy_threshold))
+
+        column_mapping = {}
+        for cluster in clusters:
+            if callable(representative):
+                canonical = representative(cluster, counts[cluster])
+            elif representative == 'shortest':
+                canonical = min(cluster, key=lambda v: (len(v), v))
+            else:
+                canonical = min(cluster, key=lambda v: (-counts[v], len(v), v))
+            column_mapping.update({value: canonical for value in cluster if value != canonical})
+
+        mapping[col] = column_mapping
+        display(HTML(f"> Column <i>'{col}'</i>: <b>{len(clusters)}</b> clusters, "
+                     f"<b>{len(column_mapping)}</b> variants mapped to a canonical value."))
+
+    return mapping
+
+# Function to save canonicalization dictionaries to a versioned JSON file
+# save_canonical_mapping(project_root / "data" / "interim" / "canonical_genres.json", mapping)
+def save_canonical_mapping(path, mapping, version=None):
+    """
+    Writes a {column: {variant: canonical}} mapping to a JSON file together with a version number
+    and a creation timestamp.
+
+    Parameters:
+    path (Path or str): Destination JSON file.
+    mapping (dict): Mapping returned by build_canonical_mapping() (possibly edited).
+    version (int, optional): Version to record. If None, the version of the existing file plus one (or 1).
+
+    Returns:
+    int: The version written.
+    """
+
+    if version is None:
+        version = load_canonical_mapping(path)[1] + 1 if os.path.exists(path) else 1
+
+    directory = os.path.dirname(os.fspath(path))
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    content = {'version': int(version),
+               'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+               'columns': {str(col): {str(k): str(v) for k, v in values.items()} for col, values in mapping.items()}}
+
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(content, file, ensure_ascii=False, indent=2, sort_keys=True)
+
+    return int(version)
+
+# Function to load canonicalization dictionaries saved with save_canonical_mapping()
+def load_canonical_mapping(path):
+    """
+    Reads a mapping file written by save_canonical_mapping().
+
+    Parameters:
+    path (Path or str): The JSON file.
+
+    Returns:
+    tuple: ({column: {variant: canonical}}, version).
+
+    Raises:
+    FileNotFoundError: If the file does not exist.
+    """
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"*** Error ***\nFile not found: {path}\nCurrent working directory: {os.getcwd()}")
+
+    with open(path, encoding='utf-8') as file:
+        content = json.load(file)
+
+    return content['columns'], content['version']
+
+# Function to replace variants by their canonical value through the codes of each column
+# df_music = apply_canonical_mapping(df_music, project_root / "data" / "interim" / "canonical_genres.json")
+def apply_canonical_mapping(df, mapping, include=None):
+    """
+    Replaces every variant listed in a canonicalization mapping by its canonical value. Only the distinct
+    values (the categories, or the factorized uniques of other columns) are looked up in the dictionary;
+    rows are remapped through their integer codes, so the cost is one vectorized pass per column.
+
+    Parameters:
+    df (DataFrame): The input dataset.
+    mapping (dict, Path or str): {column: {variant: canonical}}, or a file written by save_canonical_mapping().
+    include (list, optional): Columns of the mapping to apply. If None, every mapped column present in 'df'.
+
+    Returns:
+    DataFrame: DataFrame with the variants replaced. Categorical columns stay categorical, with merged categories.
+    """
+
+    if not isinstance(mapping, dict):
+        mapping = load_canonical_mapping(mapping)[0]
+
+    columns = [col for col in (include if include is not None else mapping) if col in df.columns and col in mapping]
+
+    for column in columns:
+        column_mapping = mapping[column]
+        series = df[column]
+
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            lookup, categories = pd.factorize(pd.Index([column_mapping.get(c, c) for c in series.cat.categories],
+                                                       dtype=object))
+            new_codes = np.where(codes >= 0, lookup[np.maximum(codes, 0)] if len(lookup) else -1, -1)
+            df[column] = pd.Categorical.from_codes(new_codes, categories=categories, ordered=series.cat.ordered)
+            continue
+
+        codes, uniques = pd.factorize(series)
+        mapped = np.asarray([column_mapping.get(u, u) if isinstance(u, str) else u for u in uniques], dtype=object)
+        valid = codes >= 0
+        if valid.any():
+            series = series.copy()
+            series[valid] = mapped[codes[valid]]
+            df[column] = series
+
+    return df
+
+# Memo of already parsed date/time strings shared across calls and chunks: {format: {string: datetime64}}
+_DATETIME_PARSE_MEMO = {}
+_DATETIME_PARSE_MEMO_MAX = 1_000_000
+# Formats whose parsed values carried a UTC offset (memoized as naive UTC)
+_DATETIME_AWARE_FORMATS = set()
+
+# Function to clear the shared memo used by normalize_datetime(cache=True)
+def clear_datetime_cache():
+    """
+    Empties the memo of parsed date/time strings shared by normalize_datetime(cache=True).
+    """
+    _DATETIME_PARSE_MEMO.clear()
+    _DATETIME_AWARE_FORMATS.clear()
+
+# Function to guess a datetime format from a sample of distinct string values
+def _infer_datetime_format(values, sample_size=100):
+    """
+    Guesses the most common datetime format among a sample of string values.
+
+    Parameters:
+    values (array-like): Distinct string values to sample from.
+    sample_size (int): Maximum number of values inspected.
+
+    Returns:
+    str or None: The inferred strftime format, or None if no format could be guessed.
+    """
+
+    try:
+        from pandas.tseries.api import guess_datetime_format
+    except ImportError:
+        from pandas._libs.tslibs.parsing import guess_datetime_format
+
+    sample = list(values[:sample_size])
+    guesses = pd.Series([guess_datetime_format(v) for v in sample], dtype='object').dropna()
+
+    if not guesses.empty:
+        return guesses.mode().iloc[0]
+
+    # pandas does not guess time-only strings, so try the common formats directly
+    for candidate in ['%H:%M:%S', '%H:%M', '%Y-%m-%d', '%d/%m/%Y', '%Y-%m-%d %H:%M:%S']:
+        parsed = pd.to_datetime(pd.Index(sample), format=candidate, errors='coerce')
+        if len(sample) > 0 and parsed.notna().mean() > 0.5:
+            return candidate
+
+    return None
+
+# Function to parse a string column by converting each distinct value only once
+def _parse_unique_datetimes(series, frmt=None):
+    """
+    Parses a string Series to datetime64 by factorizing it, parsing each distinct value once
+    (reusing the shared memo) and broadcasting the results back through the codes.
+
+    Parameters:
+    series (Series): String values to parse.
+    frmt (str, optional): Datetime format. If None, it is inferred from a sample of the distinct values.
+
+    Returns:
+    tuple: (Series, str or None) - the datetime64[ns] Series aligned with the input (UTC-aware when the strings
+           carry an offset; unparseable values become NaT) and the format actually used.
+    """
+
+    codes, uniques = pd.factorize(series)
+    uniques = [str(v) for v in uniques]
+
+    if frmt is None:
+        frmt = _infer_datetime_format(uniques)
+
+    if sum(len(m) for m in _DATETIME_PARSE_MEMO.values()) > _DATETIME_PARSE_MEMO_MAX:
+        clear_datetime_cache()
+
+    memo = _DATETIME_PARSE_MEMO.setdefault(frmt, {})
+    pending = [v for v in uniques if v not in memo]
+
+    if pending:
+        parsed = pd.to_datetime(pd.Index(pending), format=frmt, errors='coerce')
+        if parsed.tz is not None:
+            parsed = parsed.tz_convert('UTC').tz_localize(None)
+            _DATETIME_AWARE_FORMATS.add(frmt)
+        memo.update(zip(pending, parsed.to_numpy(dtype='datetime64[ns]')))
+
+    lookup = np.array([memo[v] for v in uniques], dtype='datetime64[ns]')
+    values = np.full(len(codes), np.datetime64('NaT'), dtype='datetime64[ns]')
+    valid = codes >= 0
+    values[valid] = lookup[codes[valid]]
+
+    parsed = pd.Series(values, index=series.index, name=series.name)
+    if frmt in _DATETIME_AWARE_FORMATS:
+        parsed = parsed.dt.tz_localize('UTC')
+
+    return parsed, frmt
+
 # Function to convert string-based date/time columns to timezone-aware datetime or time objects
-def normalize_datetime(df, include=None, exclude=None, frmt=None, time_zone='UTC'):
+def normalize_datetime(df, include=None, exclude=None, frmt=None, time_zone='UTC', cache=False, backend=None):
     """
     Converts string-based columns in a DataFrame to datetime or time objects,
     with optional format and timezone adjustments.
@@ -230,6 +547,10 @@ def normalize_datetime(df, include=None, exclude=None, frmt=None, time_zone='UTC
     exclude (list, optional): Columns to exclude from conversion.
     frmt (str, optional): Optional datetime format (e.g., '%Y-%m-%d', '%H:%M:%S').
     time_zone (str): Timezone to localize or convert to (default: 'UTC').
+    cache (bool): If True, parses each distinct string only once (inferring the format from a sample
+                  when 'frmt' is None) and reuses a memo shared across calls and chunks.
+                  Recommended for low-cardinality columns such as 'time'. Ignored by the 'polars' backend.
+    backend (str, optional): Execution backend ('pandas' or 'polars'). If None, uses the default set with set_backend().
 
     Returns:
     DataFrame: DataFrame with parsed datetime or time columns.
@@ -243,12 +564,24 @@ def normalize_datetime(df, include=None, exclude=None, frmt=None, time_zone='UTC
     else:
         target_columns = [col for col in include if col not in exclude]
 
+    if resolve_backend(backend) == 'polars':
+        string_columns = [col for col in target_columns
+                          if pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col])]
+        df = polars_normalize_datetime(df, string_columns, frmt=frmt, time_zone=time_zone)
+        target_columns = [col for col in target_columns if col not in string_columns]
+
     for column in target_columns:
+        # Format used for this column (the inferred one when cache=True and frmt is None)
+        column_frmt = frmt
+
         if pd.api.types.is_object_dtype(df[column]) or pd.api.types.is_string_dtype(df[column]):
-            df[column] = pd.to_datetime(df[column], format=frmt, errors='coerce')
+            if cache:
+                df[column], column_frmt = _parse_unique_datetimes(df[column], frmt=frmt)
+            else:
+                df[column] = pd.to_datetime(df[column], format=frmt, errors='coerce')
 
         if pd.api.types.is_datetime64_any_dtype(df[column]):
-            if frmt in ["%H:%M:%S", "%H:%M"]:
+            if column_frmt in ["%H:%M:%S", "%H:%M"]:
                 df[column] = df[column].dt.time
             else:
                 if df[column].dt.tz is None:
@@ -380,7 +713,7 @@ def convert_integer_to_boolean(df, include=None, exclude=None):
 # Function to convert abbreviated gender values (e.g., 'm', 'f') to full terms ('male', 'female')
 def standardize_gender_values(df, include=None, exclude=None):
     """
-    Standardizes gender representations in object-type columns by converting
+    Standardizes gender representations in text (object or string dtype) columns by converting
     abbreviations like 'm' and 'f' to 'male' and 'female'.
 
     Parameters:
@@ -401,11 +734,108 @@ def standardize_gender_values(df, include=None, exclude=None):
         available_columns = [col for col in include if col not in exclude]
 
     for column in available_columns:
-        if df[column].dtype == 'object':
+        if is_text_column(df[column]):
             df[column] = df[column].replace({'f': 'female', 'm': 'male'})
 
     return df
 
+# Lowercased value pairs recognized as boolean-like text columns
+_BOOLEAN_PAIRS = [({'true'}, {'false'}), ({'yes'}, {'no'}), ({'y'}, {'n'}), ({'t'}, {'f'})]
+
+# Function to detect whether sampled text values form a boolean-like pair
+def _boolean_text_mapping(values):
+    """
+    Returns a {value: bool} mapping if the distinct values (case-insensitive) are both halves of one of the
+    pairs true/false, yes/no, y/n or t/f, otherwise None. A single value ('F' grades, a constant 'Y' code)
+    is not enough evidence of a boolean column.
+    """
+
+    lowered = {v: v.strip().lower() for v in values if isinstance(v, str)}
+    if not lowered or len(lowered) != len(values):
+        return None
+
+    for true_values, false_values in _BOOLEAN_PAIRS:
+        found = set(lowered.values())
+        if found <= true_values | false_values and found & true_values and found & false_values:
+            return {v: low in true_values for v, low in lowered.items()}
 
+    return None
+
+# Function to pick compact dtypes for every column and report the memory saved
+# df_music, memory_report = optimize_dtypes(df_music, exclude=['userid'])
+def optimize_dtypes(df, include=None, exclude=None, categorical_ratio=0.5, sample_size=100_000, seed=0):
+    """
+    Converts columns to compact dtypes, deciding from a random sample of rows:
+    - text columns whose sampled distinct/total ratio is at most 'categorical_ratio' become 'category'
+      (kept only if the categorical column is actually smaller),
+    - text columns holding both values of true/false, yes/no, y/n or t/f (any case) become 'boolean'
+      (a column with only one of them is left to the 'category' rule),
+    - integer columns are downcast to the smallest signed type holding their range (nullable types stay nullable),
+    - float columns are downcast to float32 when that is lossless.
+    Categorical, boolean and datetime columns are left unchanged.
+
+    Parameters:
+    df (DataFrame): The input dataset.
+    include (list, optional): Columns to optimize. If None, all columns not in 'exclude'.
+    exclude (list, optional): Columns to skip.
+    categorical_ratio (float): Maximum sampled distinct/total ratio for converting text to 'category'.
+    sample_size (int): Rows sampled to choose the conversions.
+    seed (int): Seed of the row sample.
+
+    Returns:
+    tuple: (DataFrame with the optimized dtypes, DataFrame report with the dtype and memory (MB) of every
+            processed column before and after, plus a 'total' row).
+    """
 
-    
\ No newline at end of file
+    if exclude is None:
+        exclude = []
+
+    if include is None:
+        available_columns = [col for col in df.columns if col not in exclude]
+    else:
+        available_columns = [col for col in include if col in df.columns and col not in exclude]
+
+    n = len(df)
+    positions = np.arange(n) if n <= sample_size else np.sort(np.random.default_rng(seed).choice(n, sample_size, replace=False))
+
+    rows = []
+    for column in available_columns:
+        series = df[column]
+        before = series.memory_usage(index=False, deep=True)
+        dtype_before = series.dtype
+        converted = None
+
+        if is_text_column(series):
+            sample = series.iloc[positions].dropna()
+            distinct = sample.unique()
+            mapping = _boolean_text_mapping(list(distinct)) if len(distinct) <= 2 else None
+
+            if mapping is not None and set(series.dropna().unique()) <= set(mapping):
+                converted = series.map(mapping).astype('boolean')
+            elif len(sample) and len(distinct) / len(sample) <= categorical_ratio:
+                candidate = series.astype('category')
+                if candidate.memory_usage(index=False, deep=True) < before:
+                    converted = candidate
+
+        elif pd.api.types.is_integer_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            converted = pd.to_numeric(series, downcast='integer')
+
+        elif pd.api.types.is_float_dtype(series):
+            candidate = series.astype('Float32' if isinstance(series.dtype, pd.api.extensions.ExtensionDtype) else np.float32)
+            if candidate.astype(series.dtype).equals(series):
+                converted = candidate
+
+        if converted is not None and converted.dtype != dtype_before:
+            df[column] = converted
+
+        rows.append({'column': column,
+                     'dtype_before': str(dtype_before),
+                     'dtype_after': str(df[column].dtype),
+                     'memory_before_mb': before / 2 ** 20,
+                     'memory_after_mb': df[column].memory_usage(index=False, deep=True) / 2 ** 20})
+
+    report = pd.DataFrame(rows, columns=['column', 'dtype_before', 'dtype_after', 'memory_before_mb', 'memory_after_mb'])
+    totals = report[['memory_before_mb', 'memory_after_mb']].sum()
+    report.loc[len(report)] = ['total', '', '', totals['memory_before_mb'], totals['memory_after_mb']]
+
+    return df, report
@@ -1,17 +1,217 @@
 # data_loader.py for opening dataset files
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import glob
+import io
+from itertools import zip_longest
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 import os
+import warnings
 import zipfile
 
+from .data_cleaning import optimize_dtypes
+from .utils import display, HTML
 
-def load_dataset_from_zip(zip_path: str, filename: str, **kwargs) -> pd.DataFrame:
+
+# Function to convert the text columns of a loaded DataFrame to a pandas string dtype
+def _apply_string_dtype(df, string_dtype=None):
+    """
+    Converts text columns (object columns holding only strings, or Arrow string columns) to 'string_dtype'.
+
+    Parameters:
+    df (DataFrame or dict): The loaded dataset, or a {sheet: DataFrame} dict.
+    string_dtype (str, optional): Target dtype, e.g. 'string[pyarrow]'. If None, the DataFrame is returned unchanged.
+
+    Returns:
+    DataFrame or dict: Dataset with its text columns converted.
+    """
+
+    if string_dtype is None:
+        return df
+
+    if isinstance(df, dict):
+        return {name: _apply_string_dtype(sheet, string_dtype) for name, sheet in df.items()}
+
+    for column in df.columns:
+        dtype = df[column].dtype
+        if dtype == 'object':
+            if pd.api.types.infer_dtype(df[column], skipna=True) not in ('string', 'empty'):
+                continue
+        elif dtype == string_dtype or not pd.api.types.is_string_dtype(dtype):
+            continue
+        df[column] = df[column].astype(string_dtype)
+
+    return df
+
+
+# Function to apply the optional post-load stages shared by every loader
+def _finalize_loaded(df, string_dtype=None, optimize=False):
+    """
+    Applies the string dtype conversion and, if requested, optimize_dtypes() to a loaded dataset,
+    displaying the memory saved.
+
+    Parameters:
+    df (DataFrame or dict): The loaded dataset, or a {sheet: DataFrame} dict.
+    string_dtype (str, optional): Dtype for text columns (see _apply_string_dtype()).
+    optimize (bool or dict): If True, runs optimize_dtypes() with its defaults; a dict is passed as its arguments.
+
+    Returns:
+    DataFrame or dict: The processed dataset.
+    """
+
+    df = _apply_string_dtype(df, string_dtype)
+
+    if not optimize:
+        return df
+
+    if isinstance(df, dict):
+        return {name: _finalize_loaded(sheet, optimize=optimize) for name, sheet in df.items()}
+
+    df, report = optimize_dtypes(df, **(optimize if isinstance(optimize, dict) else {}))
+    before, after = report.iloc[-1][['memory_before_mb', 'memory_after_mb']]
+    display(HTML(f"> Memory usage optimized: <b>{before:.1f} MB</b> → <b>{after:.1f} MB</b>"
+                 f"{f' (-{(1 - after / before) * 100:.0f} %)' if before else ''}"))
+
+    return df
+
+
+# Function to build a typed DataFrame from a batch of worksheet rows
+def _rows_to_frame(rows, columns):
+    """
+    Converts a batch of row tuples into a DataFrame, inferring a typed column for each field.
+    Rows shorter than the header (trailing empty cells) are padded with None.
+    """
+
+    values = list(zip_longest(*rows))[:len(columns)]
+    values += [(None,) * len(rows)] * (len(columns) - len(values))
+
+    return pd.DataFrame({column: pd.Series(col, dtype=object).infer_objects()
+                         for column, col in zip(columns, values)})
+
+# Function to read one worksheet with openpyxl's read-only row iterator
+def _read_sheet_streaming(source, sheet_name=0, batch_size=100_000):
+    """
+    Reads one worksheet of an .xlsx file row by row (without building the workbook DOM), turning every
+    'batch_size' rows into typed columns. The first row is used as the header.
+
+    Parameters:
+    source (str or file-like): The .xlsx file.
+    sheet_name (int or str): Sheet position or name.
+    batch_size (int): Rows converted to columns at a time.
+
+    Returns:
+    DataFrame: The sheet.
+    """
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+
+        columns = [f"Unnamed: {i}" if name is None else str(name) for i, name in enumerate(header)]
+        frames, batch = [], []
+        for row in rows:
+            batch.append(row[:len(columns)])
+            if len(batch) == batch_size:
+                frames.append(_rows_to_frame(batch, columns))
+                batch = []
+        if batch or not frames:
+            frames.append(_rows_to_frame(batch, columns))
+    finally:
+        workbook.close()
+
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+# Function to read one or several worksheets in streaming mode, in parallel when there are several
+def _read_excel_streaming(file_path, sheet_name=0, batch_size=100_000, workers=None):
+    """
+    Streams the requested worksheets of an .xlsx file, one process per sheet when several are requested.
+
+    Parameters:
+    file_path (str): The .xlsx file.
+    sheet_name (int, str, list or None): As in pd.read_excel; None reads every sheet.
+    batch_size (int): Rows converted to columns at a time.
+    workers (int, optional): Number of processes used for several sheets. Defaults to the number of CPUs.
+
+    Returns:
+    DataFrame or dict: One DataFrame, or a {sheet: DataFrame} dict for a list of sheets or None.
+    """
+
+    if isinstance(sheet_name, (int, str)):
+        return _read_sheet_streaming(file_path, sheet_name, batch_size)
+
+    if sheet_name is None:
+        from openpyxl import load_workbook
+        workbook = load_workbook(file_path, read_only=True)
+        sheet_name = workbook.sheetnames
+        workbook.close()
+
+    sheets = list(sheet_name)
+    workers = min(workers or os.cpu_count() or 1, max(len(sheets), 1))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        frames = list(executor.map(_read_sheet_streaming, [file_path] * len(sheets), sheets,
+                                   [batch_size] * len(sheets)))
+
+    return dict(zip(sheets, frames))
+
+# Function to build the key identifying which read of a workbook a parquet cache holds
+def _excel_cache_key(full_path, streaming, batch_size, kwargs):
+    """
+    Returns a string describing the workbook read (file, sheet, reader options), stored in the parquet cache.
+    """
+
+    options = sorted((key, repr(value)) for key, value in kwargs.items() if key != 'sheet_name')
+
+    return repr((os.path.abspath(full_path), kwargs.get('sheet_name', 0), bool(streaming),
+                 batch_size if streaming else None, options))
+
+# Function to read a parquet cache of a workbook if it holds the requested read
+def _read_excel_cache(cache_path, full_path, key):
+    """
+    Returns the cached DataFrame, or None if the cache is missing, older than the workbook or was
+    written for another sheet or other read options.
+    """
+
+    import pyarrow.parquet as pq
+
+    if not os.path.exists(cache_path) or os.path.getmtime(cache_path) < os.path.getmtime(full_path):
+        return None
+
+    metadata = pq.read_schema(cache_path).metadata or {}
+    if metadata.get(b'src_excel_cache_key') != key.encode():
+        return None
+
+    return pd.read_parquet(cache_path)
+
+# Function to write a DataFrame to a parquet cache tagged with its read key
+def _write_excel_cache(df, cache_path, key):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'src_excel_cache_key': key.encode()})
+    pq.write_table(table, cache_path)
+
+def load_dataset_from_zip(zip_path: str, filename: str, string_dtype=None, streaming=False, optimize=False, **kwargs) -> pd.DataFrame:
     """
     Loads a CSV or Excel file from within a ZIP archive into a DataFrame.
     
     Args:
         zip_path (str): Path to the ZIP file.
         filename (str): Name of the CSV or Excel file inside the ZIP.
+        string_dtype (str, optional): Dtype for text columns, e.g. 'string[pyarrow]'. If None, they stay object.
+        optimize (bool or dict): If True, compacts the dtypes with optimize_dtypes() (a dict is passed as its arguments)
+                                 and displays the memory saved.
+        streaming (bool): If True, .xlsx members are read with openpyxl's read-only row iterator
+                          (see load_dataset_from_excel). Only 'sheet_name' is used from kwargs.
         kwargs: Additional parameters passed to pd.read_csv or pd.read_excel.
     
     Returns:
@@ -35,20 +235,27 @@ def load_dataset_from_zip(zip_path: str, filename: str, **kwargs) -> pd.DataFram
             ext = os.path.splitext(filename)[1].lower()
             if ext == '.csv':
                 df = pd.read_csv(file, **kwargs)
+            elif ext == '.xlsx' and streaming:
+                df = _read_excel_streaming(io.BytesIO(file.read()), sheet_name=kwargs.get('sheet_name', 0))
             elif ext in ['.xls', '.xlsx']:
                 df = pd.read_excel(file, **kwargs)
             else:
                 raise ValueError(f"Unsupported file extension '{ext}'. Only .csv, .xls and .xlsx are supported.")
-    return df
+    return _finalize_loaded(df, string_dtype, optimize)
 
 # Function to load a dataset from a CSV file, with optional read_csv arguments
-def load_dataset_from_csv(path, filename: str, **kwargs):
+def load_dataset_from_csv(path, filename: str, string_dtype=None, optimize=False, **kwargs):
     """
     Loads a CSV file into a pandas DataFrame from a given path and filename.
 
     Parameters:
     path (Path or str): Directory path where the file is located.
     filename (str): Name of the CSV file.
+    string_dtype (str, optional): Dtype for text columns, e.g. 'string[pyarrow]' (several times smaller than
+                                  object columns). If None, they stay object. Combined with engine='pyarrow' and
+                                  dtype_backend='pyarrow', the file is parsed without creating Python strings.
+    optimize (bool or dict): If True, compacts the dtypes with optimize_dtypes() (a dict is passed as its arguments)
+                             and displays the memory saved.
     **kwargs: Additional keyword arguments to pass to pd.read_csv() (e.g., delimiter, encoding, dtype).
 
     Returns:
@@ -65,24 +272,41 @@ def load_dataset_from_csv(path, filename: str, **kwargs):
 
     df = pd.read_csv(full_path, **kwargs)
 
-    return df
+    return _finalize_loaded(df, string_dtype, optimize)
 
 
 # Function to load a dataset from an Excel file with optional read_excel arguments
-def load_dataset_from_excel(path, filename: str, **kwargs):
+def load_dataset_from_excel(path, filename: str, string_dtype=None, streaming=False, batch_size=100_000,
+                            workers=None, cache_path=None, optimize=False, **kwargs):
     """
     Loads an Excel file into a pandas DataFrame from a specified directory and filename.
 
     Parameters:
     path (Path or str): Directory path where the Excel file is stored.
     filename (str): Name of the Excel file (e.g., 'data.xlsx').
+    string_dtype (str, optional): Dtype for text columns, e.g. 'string[pyarrow]'. If None, they stay object.
+    streaming (bool): If True (.xlsx only), reads the sheets with openpyxl's read-only row iterator instead of
+                      building the whole workbook in memory, converting every 'batch_size' rows into typed columns.
+                      Several sheets are read in parallel processes. Only 'sheet_name' is used from kwargs,
+                      the first row is the header and cells are kept as stored (sentinel strings such as 'N/A'
+                      are not turned into NaN; use replace_missing_values()). Empty cells become None.
+    batch_size (int): Rows converted to columns at a time in streaming mode.
+    workers (int, optional): Processes used to read several sheets in streaming mode. Defaults to the number of CPUs.
+    cache_path (Path or str, optional): Parquet file used as a columnar cache of a single sheet (requires pyarrow).
+                                        It is read instead of the workbook while it is newer than the workbook
+                                        and was written for the same sheet_name, streaming mode and read_excel
+                                        arguments, and (re)written otherwise. Ignored when several sheets are
+                                        requested.
+    optimize (bool or dict): If True, compacts the dtypes with optimize_dtypes() (a dict is passed as its arguments)
+                             and displays the memory saved.
     **kwargs: Additional arguments passed to pd.read_excel() (e.g., sheet_name, dtype, engine).
 
     Returns:
-    DataFrame: Loaded dataset.
+    DataFrame: Loaded dataset (a {sheet: DataFrame} dict when several sheets are requested).
 
     Raises:
     FileNotFoundError: If the file does not exist at the specified location.
+    ValueError: If streaming is requested for a file that is not .xlsx.
     """
 
     full_path = path / filename
@@ -90,36 +314,621 @@ def load_dataset_from_excel(path, filename: str, **kwargs):
     if not os.path.exists(full_path):
         raise FileNotFoundError(f"*** Error ***\nFile not found: {full_path}\nCurrent working directory: {os.getcwd()}")
 
-    df = pd.read_excel(full_path, **kwargs)
+    # Only single-sheet reads are cached; a list of sheets or None returns a {sheet: DataFrame} dict
+    use_cache = cache_path is not None and isinstance(kwargs.get('sheet_name', 0), (int, str))
+    if use_cache:
+        cache_key = _excel_cache_key(full_path, streaming, batch_size, kwargs)
+        cached = _read_excel_cache(cache_path, full_path, cache_key)
+        if cached is not None:
+            return _finalize_loaded(cached, string_dtype, optimize)
 
-    return df
+    if streaming:
+        if os.path.splitext(filename)[1].lower() != '.xlsx':
+            raise ValueError("*** Error *** > Streaming mode only supports .xlsx files.")
+        df = _read_excel_streaming(os.fspath(full_path), sheet_name=kwargs.get('sheet_name', 0),
+                                   batch_size=batch_size, workers=workers)
+    else:
+        df = pd.read_excel(full_path, **kwargs)
+
+    if use_cache and isinstance(df, pd.DataFrame):
+        _write_excel_cache(df, cache_path, cache_key)
+
+    return _finalize_loaded(df, string_dtype, optimize)
+
+# Storage dtype of each column kind of RecordBatchBuilder ('s' columns store dictionary codes)
+_KIND_DTYPES = {'b': np.bool_, 'i': np.int64, 'f': np.float64, 's': np.int32, 'O': object}
+
+# infer_dtype() results mapped to column kinds
+_INFERRED_KINDS = {'boolean': 'b', 'integer': 'i', 'floating': 'f', 'mixed-integer-float': 'f', 'string': 's'}
+
+_INT64_MIN, _INT64_MAX = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+
+
+# Function to check whether a record value is missing
+def _is_missing(value):
+    return value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and value != value)
+
+# Function to classify a record value into a column kind
+def _value_kind(value):
+    if isinstance(value, (bool, np.bool_)):
+        return 'b'
+    if isinstance(value, (int, np.integer)):
+        # Integers beyond int64 are kept as Python objects instead of overflowing
+        return 'i' if _INT64_MIN <= value <= _INT64_MAX else 'O'
+    if isinstance(value, (float, np.floating)):
+        return 'f'
+    if isinstance(value, str):
+        return 's'
+    return 'O'
+
+# Function to get the kind a column moves to when it receives a value of another kind
+def _promoted_kind(current, new):
+    # Booleans are not widened to numbers (True would silently become 1), so bool + int goes to object
+    if {current, new} == {'i', 'f'}:
+        return 'f'
+    return 'O'
+
+# Function to check whether the non-missing integers of a column fit in int64
+def _fits_int64(series):
+    if series.dtype.kind == 'i':
+        return True
+    if series.dtype.kind == 'u':
+        return series.max() <= _INT64_MAX
+    values = series.dropna()
+
+    return values.empty or (_INT64_MIN <= values.min() and values.max() <= _INT64_MAX)
+
+
+class _ColumnBuffer:
+    """
+    Growable typed array (plus missing-value mask) holding one column of a RecordBatchBuilder.
+    String columns are dictionary encoded; the dictionary is kept across batches, so every emitted
+    batch shares the same category codes.
+    """
+
+    def __init__(self, capacity):
+        self.kind = None
+        self.size = 0
+        self.capacity = capacity
+        self.values = None
+        self.mask = None
+        self.lookup = {}
+        self.labels = []
+
+    def _allocate(self, kind):
+        """Allocates the typed storage once the kind of the column is known (earlier rows were missing)."""
+
+        self.kind = kind
+        self.values = np.zeros(self.capacity, dtype=_KIND_DTYPES[kind])
+        self.mask = np.zeros(self.capacity, dtype=bool)
+        self.mask[:self.size] = True
+
+    def _reserve(self, needed):
+        """Doubles the storage until it can hold 'needed' rows."""
+
+        if needed <= self.capacity:
+            return
+
+        capacity = max(needed, 2 * self.capacity)
+        if self.values is not None:
+            values = np.zeros(capacity, dtype=self.values.dtype)
+            values[:self.size] = self.values[:self.size]
+            mask = np.zeros(capacity, dtype=bool)
+            mask[:self.size] = self.mask[:self.size]
+            self.values, self.mask = values, mask
+        self.capacity = capacity
+
+    def _as_objects(self):
+        """Returns the buffered rows as an object array, missing values as None."""
+
+        if self.kind == 's':
+            values = np.asarray(self.labels + [None], dtype=object)[self.values[:self.size]]
+        else:
+            values = self.values[:self.size].astype(object)
+        values[self.mask[:self.size]] = None
+
+        return values
+
+    def _promote(self, kind):
+        """Converts the buffered rows to a wider kind (int -> float, anything -> object)."""
+
+        current = self._as_objects() if kind == 'O' else self.values[:self.size].astype(_KIND_DTYPES[kind])
+        self.kind = kind
+        self.values = np.zeros(self.capacity, dtype=_KIND_DTYPES[kind])
+        self.values[:self.size] = current
+
+    def _accept(self, kind):
+        """Makes the column able to store values of 'kind'."""
+
+        if self.kind is None:
+            self._allocate(kind)
+        elif kind != self.kind and self.kind != 'O' and not (self.kind == 'f' and kind == 'i'):
+            self._promote(_promoted_kind(self.kind, kind))
+
+    def _encode(self, label):
+        """Returns the dictionary code of a string, adding it to the dictionary if new."""
+
+        code = self.lookup.get(label)
+        if code is None:
+            code = self.lookup[label] = len(self.labels)
+            self.labels.append(label)
+
+        return code
+
+    def append_missing(self, n=1):
+        self._reserve(self.size + n)
+        if self.mask is not None:
+            self.mask[self.size:self.size + n] = True
+        self.size += n
+
+    def append(self, value):
+        size = self.size
+        if size == self.capacity:
+            self._reserve(size + 1)
+
+        # Fast path: a string for a dictionary-encoded column (the mask is already False past 'size')
+        if self.kind == 's' and value.__class__ is str:
+            code = self.lookup.get(value)
+            self.values[size] = self._encode(value) if code is None else code
+            self.size = size + 1
+            return
+
+        if _is_missing(value):
+            self.append_missing()
+            return
+
+        self._accept(_value_kind(value))
+        self.values[size] = self._encode(value) if self.kind == 's' else value
+        self.mask[size] = False
+        self.size = size + 1
+
+    def extend(self, values):
+        """Appends one column of a batch at once, with vectorized encoding."""
+
+        series = values if isinstance(values, (pd.Series, np.ndarray)) else pd.Series(values, dtype=object)
+        series = pd.Series(series) if isinstance(series, np.ndarray) else series
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(object)
+        n = len(series)
+        missing = series.isna().to_numpy()
+
+        if missing.all():
+            self.append_missing(n)
+            return
+
+        self._reserve(self.size + n)
+        kind = _INFERRED_KINDS.get(pd.api.types.infer_dtype(series, skipna=True), 'O')
+        if kind == 'i' and not _fits_int64(series):
+            kind = 'O'
+        self._accept(kind)
+
+        if self.kind == 's':
+            codes, uniques = pd.factorize(series)
+            mapping = np.fromiter((self._encode(label) for label in uniques), dtype=np.int32, count=len(uniques))
+            stored = mapping[np.maximum(codes, 0)]
+        elif self.kind == 'O':
+            stored = series.astype(object).to_numpy()
+        else:
+            fill = np.nan if self.kind == 'f' else 0
+            stored = series.astype(object).where(~missing, fill).to_numpy().astype(_KIND_DTYPES[self.kind])
+
+        self.values[self.size:self.size + n] = stored
+        self.mask[self.size:self.size + n] = missing
+        self.size += n
+
+    def emit(self, categorical):
+        """Returns the buffered rows as a pandas-compatible array and empties the buffer (the dictionary is kept)."""
+
+        n, self.size = self.size, 0
+
+        if self.kind is None:
+            return np.full(n, None, dtype=object)
+
+        values, mask = self.values[:n].copy(), self.mask[:n].copy()
+        self.mask[:n] = False
+
+        if self.kind == 's':
+            values[mask] = -1
+            if categorical:
+                return pd.Categorical.from_codes(values, categories=pd.Index(self.labels, dtype=object))
+            return np.asarray(self.labels + [None], dtype=object)[values]
+
+        # Always nullable, so the dtype of a batch does not depend on whether it happens to have missing values
+        if self.kind == 'b':
+            return pd.arrays.BooleanArray(values, mask)
+        if self.kind == 'i':
+            return pd.arrays.IntegerArray(values, mask)
+
+        if not mask.any():
+            return values
+        values[mask] = np.nan if self.kind == 'f' else None
+
+        return values
+
+
+class RecordBatchBuilder:
+    """
+    Incremental columnar builder for records arriving one at a time or in batches (e.g. events pulled
+    from an ingestion queue). Values go straight into pre-sized typed arrays, string fields are
+    dictionary encoded and a DataFrame is emitted every 'batch_rows' rows, so ingestion memory stays
+    close to the columnar size instead of a list of dicts.
+
+    Column types are inferred from the first non-missing value and widened if needed
+    (int -> float, anything else -> object; booleans mixed with numbers and integers beyond int64 become
+    object). Integer and boolean columns are emitted as nullable 'Int64' / 'boolean'. The dtypes of the
+    first emitted batch (or 'schema') are then fixed: later batches are cast to them and records with
+    new columns are rejected. String dictionaries persist across batches, so the categories of a later
+    batch extend those of the earlier ones.
+
+    Parameters:
+    columns (list, optional): Column names. If None, they are taken from the records (dict keys, or
+                              0..n-1 for tuples). Keys first seen in a later dict record add a column.
+    batch_rows (int, optional): Rows per emitted DataFrame. If None, rows accumulate until flush().
+    capacity (int): Initial rows allocated per column; storage doubles when full.
+    categorical (bool or list): Emit string columns as category (True), as text (False), or only those listed.
+    string_dtype (str, optional): Dtype for non-categorical text columns, e.g. 'string[pyarrow]'.
+    schema (dict, optional): Column name -> dtype of every emitted batch (e.g. {'userid': 'category',
+                             'played': 'Int64'}). If None, it is taken from the first emitted batch.
+                             Its keys are the columns when 'columns' is None.
+
+    Example:
+    builder = RecordBatchBuilder(batch_rows=500_000)
+    for df_batch in builder.iter_frames(queue_records):
+        df_batch.to_parquet(...)
+    """
+
+    def __init__(self, columns=None, batch_rows=1_000_000, capacity=65_536, categorical=True, string_dtype=None,
+                 schema=None):
+        self.columns = []
+        self.batch_rows = batch_rows
+        self.capacity = capacity if batch_rows is None else max(1, min(capacity, batch_rows))
+        self.categorical = categorical
+        self.string_dtype = string_dtype
+        self.schema = None
+        self.rows = 0
+        self._size = 0
+        self._buffers = {}
+
+        for column in (list(schema) if columns is None and schema is not None else columns or []):
+            self._add_column(column)
+
+        if schema is not None:
+            missing = [column for column in self.columns if column not in schema]
+            if missing:
+                raise ValueError(f"*** Error *** > Columns {missing} have no dtype in the schema.")
+            self.schema = {column: pd.api.types.pandas_dtype(schema[column]) for column in self.columns}
+
+    def __repr__(self):
+        return (f"RecordBatchBuilder(columns={len(self.columns)}, batch_rows={self.batch_rows}, "
+                f"buffered={self._size}, rows={self.rows})")
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        """Bytes allocated by the column buffers (excluding the string dictionaries)."""
+        return sum(buffer.values.nbytes + buffer.mask.nbytes
+                   for buffer in self._buffers.values() if buffer.values is not None)
+
+    def _add_column(self, column):
+        """Adds a column, padded with missing values for the rows already buffered."""
+
+        if self.schema is not None and column not in self.schema:
+            raise ValueError(f"*** Error *** > Column '{column}' is not in the batch schema "
+                             f"(fixed by the first batch or the 'schema' argument).")
+
+        buffer = _ColumnBuffer(self.capacity)
+        buffer.append_missing(self._size)
+        self._buffers[column] = buffer
+        self.columns.append(column)
+
+    def _is_categorical(self, column):
+        return self.categorical if isinstance(self.categorical, bool) else column in self.categorical
+
+    def _batch_full(self):
+        return self.batch_rows is not None and self._size >= self.batch_rows
+
+    def append(self, record):
+        """
+        Appends one record.
+
+        Parameters:
+        record (dict, tuple or list): Field values by column name, or positional values.
+
+        Returns:
+        DataFrame or None: The emitted batch if this record completed one, otherwise None.
+
+        Raises:
+        ValueError: If a positional record does not have one value per column, or a dict record has a
+                    column that is not in the schema.
+        """
+
+        if isinstance(record, dict):
+            for column in record:
+                if column not in self._buffers:
+                    self._add_column(column)
+            for column, buffer in self._buffers.items():
+                buffer.append(record.get(column))
+        else:
+            if not self._buffers:
+                for column in range(len(record)):
+                    self._add_column(column)
+            if len(record) != len(self._buffers):
+                raise ValueError(f"*** Error *** > Record has {len(record)} values, expected {len(self._buffers)}.")
+            for buffer, value in zip(self._buffers.values(), record):
+                buffer.append(value)
+
+        self._size += 1
+        self.rows += 1
+
+        return self.flush() if self._batch_full() else None
+
+    def extend(self, records):
+        """
+        Appends several records.
+
+        Parameters:
+        records (iterable): Records accepted by append().
+
+        Returns:
+        list: DataFrames emitted while appending (possibly empty).
+        """
+
+        return [frame for frame in map(self.append, records) if frame is not None]
+
+    def append_columns(self, data):
+        """
+        Appends a batch given column-wise, encoding each column with vectorized operations.
+
+        Parameters:
+        data (dict): Column name -> sequence of values; every sequence must have the same length.
+
+        Returns:
+        list: DataFrames emitted while appending (possibly empty).
+
+        Raises:
+        ValueError: If the columns have different lengths or a column is not in the schema.
+        """
+
+        lengths = {len(values) for values in data.values()}
+        if len(lengths) > 1:
+            raise ValueError("*** Error *** > All columns must have the same length.")
+
+        for column in data:
+            if column not in self._buffers:
+                self._add_column(column)
+
+        n, start, frames = (lengths.pop() if lengths else 0), 0, []
+        while start < n:
+            take = n - start if self.batch_rows is None else min(n - start, self.batch_rows - self._size)
+            for column, buffer in self._buffers.items():
+                if column not in data:
+                    buffer.append_missing(take)
+                    continue
+                values = data[column]
+                buffer.extend(values.iloc[start:start + take] if isinstance(values, pd.Series)
+                              else values[start:start + take])
+            self._size += take
+            self.rows += take
+            start += take
+            if self._batch_full():
+                frames.append(self.flush())
+
+        return frames
+
+    def iter_frames(self, records):
+        """
+        Consumes an iterable of records and yields each DataFrame as soon as it is complete,
+        followed by the remaining partial batch.
+
+        Parameters:
+        records (iterable): Records accepted by append().
+
+        Yields:
+        DataFrame: Batches of at most 'batch_rows' rows.
+        """
+
+        for record in records:
+            frame = self.append(record)
+            if frame is not None:
+                yield frame
+
+        if self._size:
+            yield self.flush()
+
+    def _cast_to_schema(self, df):
+        """Casts the columns of a batch to the schema dtypes, refusing lossy conversions."""
+
+        for column, dtype in self.schema.items():
+            if df[column].dtype == dtype:
+                continue
+            try:
+                values = df[column]
+                # Going through Int64 rejects floats with a fractional part instead of truncating them
+                if pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_integer_dtype(values.dtype):
+                    values = values.astype('Int64')
+                df[column] = values.astype(dtype)
+            except (TypeError, ValueError, OverflowError) as e:
+                raise ValueError(f"*** Error *** > Column '{column}' of this batch ({df[column].dtype}) cannot be "
+                                 f"cast to the schema dtype '{dtype}'. Pass a wider dtype in 'schema'.") from e
+
+        return df
+
+    def flush(self):
+        """
+        Emits the buffered rows as a DataFrame and starts a new batch. The first batch fixes the schema
+        (unless one was given) and the later ones are cast to it.
+
+        Returns:
+        DataFrame: The buffered rows (empty if there are none).
+
+        Raises:
+        ValueError: If a column of the batch cannot be cast to its schema dtype.
+        """
+
+        df = pd.DataFrame({column: buffer.emit(self._is_categorical(column))
+                           for column, buffer in self._buffers.items()}, columns=self.columns)
+        self._size = 0
+        df = _apply_string_dtype(df, self.string_dtype)
+
+        if self.schema is None:
+            # Categories keep growing across batches, so a categorical column only fixes the 'category' kind
+            self.schema = {column: pd.CategoricalDtype() if isinstance(dtype, pd.CategoricalDtype) else dtype
+                           for column, dtype in df.dtypes.items()}
+            return df
+
+        return self._cast_to_schema(df)
 
 # Function to convert a list of records into a pandas DataFrame
-def load_dataset_from_list(data_list):
+def load_dataset_from_list(data_list, string_dtype=None, columnar=False, categorical=True, optimize=False):
     """
     Converts a list of dictionaries or tuples into a pandas DataFrame.
 
     Parameters:
     data_list (list): A list of dictionaries (preferred) or records to be converted.
+    string_dtype (str, optional): Dtype for text columns, e.g. 'string[pyarrow]'. If None, they stay object.
+    columnar (bool): If True, records are fed one by one into a RecordBatchBuilder (typed arrays,
+                     dictionary-encoded strings), so 'data_list' may be any iterable, e.g. a generator.
+    categorical (bool or list): In columnar mode, string columns emitted as category (see RecordBatchBuilder).
+    optimize (bool or dict): If True, compacts the dtypes with optimize_dtypes() (a dict is passed as its arguments)
+                             and displays the memory saved.
 
     Returns:
     DataFrame: A pandas DataFrame containing the provided data.
     """
     
+    if columnar:
+        builder = RecordBatchBuilder(batch_rows=None, categorical=categorical, string_dtype=string_dtype)
+        builder.extend(data_list)
+        return _finalize_loaded(builder.flush(), optimize=optimize)
+
     df = pd.DataFrame(data_list)
-    return df
+    return _finalize_loaded(df, string_dtype, optimize)
 
 # Function to convert a dictionary into a pandas DataFrame
-def load_dataset_from_dict(data_dict):
+def load_dataset_from_dict(data_dict, string_dtype=None, columnar=False, categorical=True, optimize=False):
     """
     Converts a dictionary into a pandas DataFrame.
 
     Parameters:
     data_dict (dict): A dictionary where keys represent column names and values are lists of column data.
+    string_dtype (str, optional): Dtype for text columns, e.g. 'string[pyarrow]'. If None, they stay object.
+    columnar (bool): If True, columns are typed and string columns dictionary encoded by a RecordBatchBuilder.
+    categorical (bool or list): In columnar mode, string columns emitted as category (see RecordBatchBuilder).
+    optimize (bool or dict): If True, compacts the dtypes with optimize_dtypes() (a dict is passed as its arguments)
+                             and displays the memory saved.
 
     Returns:
     DataFrame: A pandas DataFrame constructed from the dictionary.
     """
     
+    if columnar:
+        builder = RecordBatchBuilder(batch_rows=None, categorical=categorical, string_dtype=string_dtype)
+        builder.append_columns(data_dict)
+        return _finalize_loaded(builder.flush(), optimize=optimize)
+
     df = pd.DataFrame.from_dict(data_dict, orient='columns')
+    return _finalize_loaded(df, string_dtype, optimize)
+
+# Function to read one shard of a multi-file dataset (runs inside the worker pool)
+def _read_shard(file_path, categorical, source_column, kwargs):
+    """
+    Reads one CSV or Excel shard and dictionary-encodes its text columns.
+
+    Parameters:
+    file_path (str): Shard to read.
+    categorical (list or None): Columns to convert to category. If None, every text column is converted.
+    source_column (str or None): If given, name of a column tagging each row with the shard file name.
+    kwargs (dict): Additional arguments for pd.read_csv() or pd.read_excel().
+
+    Returns:
+    DataFrame: The shard.
+    """
+
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in ['.xls', '.xlsx']:
+        df = pd.read_excel(file_path, **kwargs)
+    else:
+        df = pd.read_csv(file_path, **kwargs)
+
+    if categorical is None:
+        categorical = [col for col in df.columns
+                       if df[col].dtype == 'object' or isinstance(df[col].dtype, pd.StringDtype)]
+
+    for column in categorical:
+        df[column] = df[column].astype('category')
+
+    if source_column is not None:
+        df[source_column] = pd.Categorical([os.path.basename(file_path)] * len(df))
+
     return df
+
+# Function to load and merge many CSV/Excel shards in parallel
+# load_dataset_from_shards(project_root / "data" / "raw" / "daily", pattern="music_*.csv", source_column="shard")
+def load_dataset_from_shards(path, pattern='*.csv', workers=None, use_processes=False, categorical=None,
+                             source_column=None, optimize=False, **kwargs):
+    """
+    Loads every shard matching a directory + pattern (or a glob) concurrently and merges them into one DataFrame.
+    Text columns are dictionary-encoded per shard and merged with union_categoricals-style category
+    unification, instead of concatenating Python object columns.
+
+    Parameters:
+    path (Path or str): Directory holding the shards, or a glob such as 'data/raw/daily/*.csv'.
+    pattern (str): File pattern used when 'path' is a directory (default: '*.csv').
+    workers (int, optional): Number of parallel readers. Defaults to the number of CPUs.
+    use_processes (bool): If True, parses in a process pool (best for many large CSVs); otherwise in a thread pool.
+    categorical (list, optional): Columns to merge as categoricals. If None, every text column is used.
+    source_column (str, optional): If given, adds a categorical column with the shard file name of each row.
+    optimize (bool or dict): If True, compacts the remaining dtypes with optimize_dtypes() (a dict is passed as its
+                             arguments) and displays the memory saved.
+    **kwargs: Additional keyword arguments passed to pd.read_csv() or pd.read_excel().
+
+    Returns:
+    DataFrame: All shards, in file-name order, with a fresh RangeIndex.
+
+    Raises:
+    FileNotFoundError: If no file matches.
+    ValueError: If a categorical column has categories of different dtypes across shards.
+
+    Warns:
+    UserWarning: If a column is categorical in some shards only and is concatenated as object instead.
+    """
+
+    path = os.fspath(path)
+    search = os.path.join(path, pattern) if os.path.isdir(path) else path
+    files = sorted(glob.glob(search))
+
+    if not files:
+        raise FileNotFoundError(f"*** Error ***\nNo files match: {search}\nCurrent working directory: {os.getcwd()}")
+
+    workers = min(workers or os.cpu_count() or 1, len(files))
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+
+    with executor_class(max_workers=workers) as executor:
+        frames = list(executor.map(_read_shard, files, [categorical] * len(files),
+                                   [source_column] * len(files), [kwargs] * len(files)))
+
+    # Merge categorical columns with union_categoricals (dictionary unification) and the rest with a plain concat
+    columns = list(dict.fromkeys(column for df in frames for column in df.columns))
+    merged = {}
+    for column in columns:
+        parts = [df[column] for df in frames if column in df.columns]
+        is_categorical = [isinstance(part.dtype, pd.CategoricalDtype) for part in parts]
+        if len(parts) == len(frames) and all(is_categorical):
+            try:
+                merged[column] = union_categoricals(parts, ignore_order=True)
+            except TypeError as e:
+                dtypes = sorted({str(part.cat.categories.dtype) for part in parts})
+                raise ValueError(f"*** Error *** > Column '{column}' has categories of different dtypes across "
+                                 f"shards ({', '.join(dtypes)}). Cast it to one dtype with read_csv(dtype=...).") from e
+        else:
+            if any(is_categorical):
+                warnings.warn(f"> Column '{column}' is not categorical in every shard; it is concatenated "
+                              f"as object instead of being dictionary-merged.", stacklevel=2)
+            merged[column] = pd.concat([df[column] if column in df.columns else pd.Series(index=df.index, dtype=object)
+                                        for df in frames], ignore_index=True)
+
+    df = pd.DataFrame({column: pd.Series(values).reset_index(drop=True) for column, values in merged.items()})
+
+    return _finalize_loaded(df, optimize=optimize)
@@ -1,10 +1,82 @@
 # Exploratory Data Analysis for Visualizations and summary statistics
 
-from IPython.display import display, HTML
+import os
+
 import pandas as pd
 import numpy as np
-import seaborn as sns
-from matplotlib import pyplot as plt
+
+from .memo import MemoCache, fingerprint
+from .utils import display, HTML, lazy_import, is_text_column
+
+# Plotting libraries are imported on first use
+sns = lazy_import('seaborn')
+plt = lazy_import('matplotlib.pyplot')
+
+# Memoized statistics of this module, keyed by a content fingerprint of their input
+# (SRC_EDA_CACHE_DIR enables the on-disk tier, so re-running a notebook reuses them across sessions)
+_EDA_CACHE = MemoCache(maxsize=256, disk_dir=os.environ.get('SRC_EDA_CACHE_DIR') or None)
+
+# Function to configure the memoization cache of the eda statistics
+# configure_eda_cache(maxsize=512, disk_dir=project_root / "data" / "interim" / "eda_cache")
+def configure_eda_cache(maxsize=256, disk_dir=None):
+    """
+    Replaces the cache used by outlier_limit_bounds, evaluate_central_trend, evaluate_correlation and the
+    plot statistics (means, medians, value counts). Entries are keyed by a fingerprint of the input
+    columns, so unchanged tables are not recomputed.
+
+    Parameters:
+    maxsize (int): Entries kept in memory (least recently used are evicted). 0 disables the memory tier.
+    disk_dir (Path or str, optional): Directory of the on-disk tier. None keeps the cache in memory only.
+    """
+
+    global _EDA_CACHE
+    _EDA_CACHE = MemoCache(maxsize=maxsize, disk_dir=None if disk_dir is None else os.fspath(disk_dir))
+
+# Function to empty the memoization cache of the eda statistics
+def clear_eda_cache(disk=False):
+    """
+    Empties the cache of eda statistics.
+
+    Parameters:
+    disk (bool): If True, also deletes the entries of the on-disk tier.
+    """
+
+    _EDA_CACHE.clear(disk=disk)
+
+# Function to get the statistics of the eda cache
+def eda_cache_info():
+    """
+    Returns the hits, disk hits, misses and size of the cache of eda statistics.
+
+    Returns:
+    dict: Cache statistics.
+    """
+
+    return _EDA_CACHE.info()
+
+# Function to compute a statistic through the eda cache
+def _memoized(name, data, compute, *params):
+    if _EDA_CACHE.maxsize <= 0 and _EDA_CACHE.disk_dir is None:
+        return compute(data, *params)
+
+    return _EDA_CACHE.get_or_compute((name, fingerprint(data)) + params, lambda: compute(data, *params))
+
+# Statistics computed through _memoized() by the functions below
+def _quartiles(ds):
+    return ds.quantile(0.25), ds.quantile(0.75)
+
+def _coefficient_of_variation(ds):
+    return (ds.std() / ds.mean()) * 100
+
+def _correlation_matrix(df):
+    return df.corr()
+
+def _mean_median(ds):
+    ds = ds.dropna()
+    return ds.mean(), ds.median()
+
+def _value_counts(ds):
+    return ds.value_counts()
 
 # Function to detect outlier boundaries with optional clamping of lower bound to zero
 def outlier_limit_bounds(df, column, bound='both', clamp_zero=False):
@@ -21,8 +93,7 @@ def outlier_limit_bounds(df, column, bound='both', clamp_zero=False):
     DataFrame(s): Rows identified as outliers, depending on the bound selected.
     """
 
-    q1 = df[column].quantile(0.25)
-    q3 = df[column].quantile(0.75)
+    q1, q3 = _memoized('quartiles', df[column], _quartiles)
     iqr = q3 - q1
 
     lower_bound = max(q1 - 1.5 * iqr, 0) if clamp_zero else q1 - 1.5 * iqr
@@ -76,7 +147,7 @@ def evaluate_central_trend(df, column):
     based on the level of variability.
     """
     
-    cv = (df[column].std() / df[column].mean()) * 100
+    cv = _memoized('coefficient_of_variation', df[column], _coefficient_of_variation)
     display(HTML(f"> Coefficient of variation for column <i>'{column}'</i>: <b>{cv:.2f} %</b>"))
 
     if 0 <= cv <= 10:
@@ -90,6 +161,45 @@ def evaluate_central_trend(df, column):
     
     print()
 
+# Function to summarize central tendency and outlier bounds of numerical columns as a table
+# summarize_distribution(df_music_activity_city_day, ['total_tracks', 'tracks', 'users'], clamp_zero=True)
+def summarize_distribution(df, columns=None, clamp_zero=False):
+    """
+    Returns the statistics shown by evaluate_central_trend and outlier_limit_bounds as one table, without
+    rendering notebook output (e.g. for the command-line pipeline). Statistics go through the eda cache.
+
+    Parameters:
+    df (DataFrame): The input DataFrame.
+    columns (list, optional): Numerical columns to summarize. If None, every numeric column (booleans,
+                              categories and datetimes are skipped).
+    clamp_zero (bool): If True, clamps the lower outlier bound to zero.
+
+    Returns:
+    DataFrame: One row per column with 'count', 'mean', 'median', 'cv' (%), 'central_measure',
+               'q1', 'q3', 'lower_bound', 'upper_bound', 'lower_outliers' and 'upper_outliers'.
+    """
+
+    if columns is None:
+        columns = [column for column in df.columns
+                   if pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column])]
+    rows = []
+
+    for column in columns:
+        mean, median = _memoized('mean_median', df[column], _mean_median)
+        cv = _memoized('coefficient_of_variation', df[column], _coefficient_of_variation)
+        q1, q3 = _memoized('quartiles', df[column], _quartiles)
+        iqr = q3 - q1
+        lower_bound = max(q1 - 1.5 * iqr, 0) if clamp_zero else q1 - 1.5 * iqr
+        upper_bound = q3 + 1.5 * iqr
+
+        rows.append({'column': column, 'count': int(df[column].count()), 'mean': mean, 'median': median,
+                     'cv': cv, 'central_measure': 'mean' if 0 <= cv <= 30 else 'median',
+                     'q1': q1, 'q3': q3, 'lower_bound': lower_bound, 'upper_bound': upper_bound,
+                     'lower_outliers': int((df[column] < lower_bound).sum()),
+                     'upper_outliers': int((df[column] > upper_bound).sum())})
+
+    return pd.DataFrame(rows)
+
 # Function to evaluate pairwise correlations among numerical columns
 def evaluate_correlation(df):
     """
@@ -106,22 +216,24 @@ def evaluate_correlation(df):
     - Negative correlations (inverted relationship)
     """
     
-    for column_x in df.columns:
-        if df[column_x].dtype != 'object':
-            for column_y in df.columns:
-                if df[column_y].dtype != 'object' and column_x != column_y:
-                    corr_value = df[column_x].corr(df[column_y])
-                    
-                    if 0.7 < corr_value <= 1.0:
-                        display(HTML(f"> Correlation (<i>{column_x}</i>, <i>{column_y}</i>): <b>{corr_value:.2f}</b><br><b>Strong positive correlation</b>"))
-                    elif 0.3 < corr_value <= 0.7:
-                        display(HTML(f"> Correlation (<i>{column_x}</i>, <i>{column_y}</i>): <b>{corr_value:.2f}</b><br><b>Moderate positive correlation</b>"))
-                    elif corr_value == 0:
-                        display(HTML(f"> Correlation (<i>{column_x}</i>, <i>{column_y}</i>): <b>{corr_value:.2f}</b><br><b>No linear relationship</b>"))
-                    elif -0.7 < corr_value <= -0.3:
-                        display(HTML(f"> Correlation (<i>{column_x}</i>, <i>{column_y}</i>): <b>{corr_value:.2f}</b><br><b>Moderate negative correlation</b>"))
-                    elif -1.0 <= corr_value <= -0.7:
-                        display(HTML(f"> Correlation (<i>{column_x}</i>, <i>{column_y}</i>): <b>{corr_value:.2f}</b><br><b>Strong negative correlation</b>"))
+    numeric_columns = [column for column in df.columns if not is_text_column(df[column])]
+    correlations = _memoized('correlation_matrix', df[numeric_columns], _correlation_matrix)
+
+    for column_x in numeric_columns:
+        for column_y in numeric_columns:
+            if column_x != column_y:
+                corr_value = correlations.loc[column_x, column_y]
+                
+                if 0.7 < corr_value <= 1.0:
+                    display(HTML(f"> Correlation (<i>{column_x}</i>, <i>{column_y}</i>): <b>{corr_value:.2f}</b><br><b>Strong positive correlation</b>"))
+                elif 0.3 < corr_value <= 0.7:
+                    display(HTML(f"> Correlation (<i>{column_x}</i>, <i>{column_y}</i>): <b>{corr_value:.2f}</b><br><b>Moderate positive correlation</b>"))
+                elif corr_value == 0:
+                    display(HTML(f"> Correlation (<i>{column_x}</i>, <i>{column_y}</i>): <b>{corr_value:.2f}</b><br><b>No linear relationship</b>"))
+                elif -0.7 < corr_value <= -0.3:
+                    display(HTML(f"> Correlation (<i>{column_x}</i>, <i>{column_y}</i>): <b>{corr_value:.2f}</b><br><b>Moderate negative correlation</b>"))
+                elif -1.0 <= corr_value <= -0.7:
+                    display(HTML(f"> Correlation (<i>{column_x}</i>, <i>{column_y}</i>): <b>{corr_value:.2f}</b><br><b>Strong negative correlation</b>"))
 
 # Function to visualize missing values within a DataFrame using a heatmap
 def missing_values_heatmap(df):
@@ -218,10 +330,8 @@ def plot_histogram(ds, bins=10, color='grey', title='', xlabel='', ylabel='Frequ
     Displays a histogram with vertical lines for mean and median.
     """
 
+    mean_val, median_val = _memoized('mean_median', ds, _mean_median)
     ds = ds.dropna()
-    
-    mean_val = ds.mean()
-    median_val = ds.median()
 
     plt.figure(figsize=(15, 7))
     sns.histplot(ds, bins=bins, edgecolor='black', color=color, kde=False)
@@ -315,16 +425,14 @@ def plot_dual_histogram(ds1, ds2, bins=10, color1='black', color2='grey',
     Displays overlapping histograms with mean and median lines for both datasets.
     """
 
+    # Compute statistics
+    mean1_val, median1_val = _memoized('mean_median', ds1, _mean_median)
+    mean2_val, median2_val = _memoized('mean_median', ds2, _mean_median)
+
     # Clean missing values
     ds1 = ds1.dropna()
     ds2 = ds2.dropna()
 
-    # Compute statistics
-    mean1_val = ds1.mean()
-    median1_val = ds1.median()
-    mean2_val = ds2.mean()
-    median2_val = ds2.median()
-
     plt.figure(figsize=(15, 7))
 
     sns.histplot(ds1, bins=bins, edgecolor='black', kde=False, color=color1, label=label1, alpha=0.6)
@@ -374,9 +482,8 @@ def plot_frequency_density(ds, bins=10, color='grey', title='', xlabel='', ylabe
     Displays a histogram normalized to show frequency density, with mean/median lines and optional KDE.
     """
 
+    mean_val, median_val = _memoized('mean_median', ds, _mean_median)
     ds = ds.dropna()
-    mean_val = ds.mean()
-    median_val = ds.median()
 
     plt.figure(figsize=(15, 7))
     sns.histplot(ds, bins=bins, stat='density', edgecolor='black', color=color, alpha=0.7)
@@ -446,8 +553,9 @@ def plot_grouped_barplot(ds, x_col, y_col, hue_col=None, palette=['black', 'grey
 # Function to plot a horizontal bar chart from categorical data
 # plot_horizontal_bar(ds=series_categorica, colors=['skyblue', 'salmon', 'lightgreen'], xlabel='Count', ylabel='Categories',
 #                     title='Distribution of Categorical Values', xticks_range=(0, 100, 10), rotation=0)
+# plot_horizontal_bar(ds=artist_counter.top('springfield'), precounted=True, title='Top Artists in Springfield')
 def plot_horizontal_bar(ds, colors=['black', 'grey'], xlabel='', ylabel='', title='',
-                        xticks_range=None, rotation=0):
+                        xticks_range=None, rotation=0, precounted=False):
     """
     Plots a horizontal bar chart for a categorical pandas Series.
 
@@ -459,13 +567,16 @@ def plot_horizontal_bar(ds, colors=['black', 'grey'], xlabel='', ylabel='', titl
     title (str): Title of the plot.
     xticks_range (tuple, optional): Tuple (min, max, step) for x-axis ticks.
     rotation (int): Rotation angle for x-axis tick labels.
+    precounted (bool): If True, 'ds' already holds counts indexed by category
+                       (e.g. TopKCounter.top()) and is plotted as is.
 
     Output:
     Displays a horizontal bar chart with optional hue differentiation.
     """
 
-    categories = ds.value_counts().index
-    values = ds.value_counts().values
+    counts = ds if precounted else _memoized('value_counts', ds, _value_counts)
+    categories = counts.index
+    values = counts.values
 
     plt.figure(figsize=(15, 7))
     sns.barplot(y=categories, x=values, hue=categories, dodge=False, palette=colors)
@@ -0,0 +1,687 @@
+# features.py for feature engineering over the music activity log
+
+import numpy as np
+import os
+import pandas as pd
+
+from .backends import resolve_backend, polars_music_activity
+from .utils import lazy_import
+
+sparse = lazy_import('scipy.sparse')
+
+
+# Function to convert a time-of-day column into seconds since midnight
+def _seconds_of_day(series):
+    """
+    Converts a time-of-day Series (datetime64, timedelta, datetime.time objects or 'HH:MM:SS' strings)
+    into seconds since midnight. Object columns are factorized so each distinct value is parsed once.
+
+    Parameters:
+    series (Series): The time-of-day values.
+
+    Returns:
+    ndarray: float64 array of seconds since midnight, NaN where the value is missing or unparseable.
+    """
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        seconds = series.dt.hour * 3600 + series.dt.minute * 60 + series.dt.second
+        return seconds.to_numpy(dtype='float64', na_value=np.nan)
+
+    if pd.api.types.is_timedelta64_dtype(series):
+        return series.dt.total_seconds().to_numpy(dtype='float64', na_value=np.nan)
+
+    codes, uniques = pd.factorize(series)
+    parsed = pd.to_timedelta(pd.Index([str(v) for v in uniques], dtype='object'), errors='coerce')
+    lookup = parsed.total_seconds().to_numpy(dtype='float64', na_value=np.nan)
+
+    seconds = np.full(len(codes), np.nan)
+    valid = codes >= 0
+    seconds[valid] = lookup[codes[valid]]
+
+    return seconds
+
+# Function to compute music activity (plays, distinct tracks, distinct users) per group
+# compute_music_activity(df_music, by=['city', 'day', 'hour'])
+def compute_music_activity(df, by, track_col='track', user_col='userid', backend=None):
+    """
+    Aggregates the event log into the music activity tables of data/processed/music_activity:
+    total plays ('total_tracks'), distinct tracks ('tracks') and distinct users ('users') per group.
+
+    Parameters:
+    df (DataFrame): The cleaned event log.
+    by (str or list): Grouping column(s), e.g. 'city' or ['city', 'day', 'hour'].
+    track_col (str): Track column.
+    user_col (str): User column.
+    backend (str, optional): Execution backend ('pandas' or 'polars'). If None, uses the default set with set_backend().
+
+    Returns:
+    DataFrame: Grouping columns plus 'total_tracks', 'tracks' and 'users'. When every grouping column is
+               categorical, all category combinations are included (as pivot_table(observed=False) does).
+    """
+
+    by = [by] if isinstance(by, str) else list(by)
+
+    if resolve_backend(backend) == 'polars':
+        activity = polars_music_activity(df, by, track_col=track_col, user_col=user_col)
+    else:
+        activity = (df.groupby(by, observed=True)
+                      .agg(total_tracks=(track_col, 'count'),
+                           tracks=(track_col, 'nunique'),
+                           users=(user_col, 'nunique'))
+                      .reset_index())
+
+    if all(isinstance(df[col].dtype, pd.CategoricalDtype) for col in by):
+        full_index = pd.MultiIndex.from_product([df[col].cat.categories for col in by], names=by)
+        if len(by) == 1:
+            full_index = full_index.get_level_values(0)
+        activity = (activity.set_index(by)
+                            .reindex(full_index, fill_value=0)
+                            .reset_index())
+        for col in by:
+            activity[col] = activity[col].astype(df[col].dtype)
+
+    return activity
+
+# Function to rebuild listening sessions from the event log with vectorized segment reductions
+# build_listening_sessions(df_music, gap_minutes=30)
+def build_listening_sessions(df, user_col='userid', day_col='day', time_col='time', city_col='city',
+                             genre_col='genre', gap_minutes=30):
+    """
+    Groups listening events into sessions: consecutive plays of the same user on the same day
+    separated by no more than 'gap_minutes' of inactivity.
+
+    Events are sorted once by (user, day, time of day); session boundaries come from vectorized
+    diffs and per-session aggregates from np.add.reduceat, so no per-user Python loop is involved.
+    Rows with a missing user, day or time are ignored.
+
+    Parameters:
+    df (DataFrame): The event log.
+    user_col (str): Column identifying the user.
+    day_col (str): Column with the day of the week.
+    time_col (str): Column with the time of day of each play.
+    city_col (str, optional): Column with the user's city, reported per session. None to skip.
+    genre_col (str, optional): Column with the track genre, used to count genre switches. None to skip.
+    gap_minutes (float): Maximum inactivity (in minutes) allowed inside a session.
+
+    Returns:
+    DataFrame: One row per session with the user, city, day, start/end (seconds of day),
+               duration in minutes, number of tracks and number of genre switches.
+    """
+
+    seconds = _seconds_of_day(df[time_col])
+    user_codes, users = pd.factorize(df[user_col])
+    day_codes, days = pd.factorize(df[day_col])
+
+    valid = ~np.isnan(seconds) & (user_codes >= 0) & (day_codes >= 0)
+    seconds, user_codes, day_codes = seconds[valid], user_codes[valid], day_codes[valid]
+
+    order = np.lexsort((seconds, day_codes, user_codes))
+    seconds, user_codes, day_codes = seconds[order], user_codes[order], day_codes[order]
+    n = len(order)
+
+    new_session = np.ones(n, dtype=bool)
+    new_session[1:] = ((user_codes[1:] != user_codes[:-1]) |
+                       (day_codes[1:] != day_codes[:-1]) |
+                       (np.diff(seconds) > gap_minutes * 60))
+
+    starts = np.flatnonzero(new_session)
+    ends = np.append(starts[1:], n) - 1 if n else starts
+
+    sessions = pd.DataFrame({
+        user_col: users.take(user_codes[starts]),
+        day_col: days.take(day_codes[starts]),
+        'session_start': seconds[starts],
+        'session_end': seconds[ends],
+        'duration_min': (seconds[ends] - seconds[starts]) / 60,
+        'tracks': np.diff(np.append(starts, n)),
+    })
+
+    if city_col is not None:
+        city_codes, cities = pd.factorize(df[city_col])
+        city_codes = city_codes[valid][order][starts]
+        sessions.insert(1, city_col, pd.Categorical.from_codes(city_codes, categories=pd.Index(cities)))
+
+    if genre_col is not None:
+        genre_codes = pd.factorize(df[genre_col])[0][valid][order]
+        switches = np.zeros(n, dtype=np.int64)
+        switches[1:] = (genre_codes[1:] != genre_codes[:-1]) & ~new_session[1:]
+        sessions['genre_switches'] = np.add.reduceat(switches, starts) if n else switches
+
+    return sessions
+
+# Function to summarize listening sessions per user
+# summarize_user_sessions(build_listening_sessions(df_music))
+def summarize_user_sessions(sessions, user_col='userid', city_col='city'):
+    """
+    Aggregates the output of build_listening_sessions() into per-user session features.
+
+    Parameters:
+    sessions (DataFrame): Sessions as returned by build_listening_sessions().
+    user_col (str): Column identifying the user.
+    city_col (str, optional): City column kept as a grouping key. None to group by user only.
+
+    Returns:
+    DataFrame: Per-user session count, mean session length (minutes), mean tracks per session
+               and genre switches (total and per session, when available).
+    """
+
+    keys = [user_col] if city_col is None else [user_col, city_col]
+
+    aggregations = {
+        'sessions': ('tracks', 'size'),
+        'mean_session_min': ('duration_min', 'mean'),
+        'mean_tracks_per_session': ('tracks', 'mean'),
+    }
+    if 'genre_switches' in sessions.columns:
+        aggregations['genre_switches'] = ('genre_switches', 'sum')
+        aggregations['mean_genre_switches'] = ('genre_switches', 'mean')
+
+    return sessions.groupby(keys, observed=True, sort=False).agg(**aggregations).reset_index()
+
+# Function to get integer codes and labels for a column, reusing categorical codes when available
+def _column_codes(series):
+    """
+    Returns integer codes (-1 for missing) and their labels for a Series, with the codes following the
+    order of the labels. Categorical columns reuse their existing codes, so their labels keep the category
+    order; other columns are factorized with sorted labels (in order of appearance if they cannot be sorted).
+
+    Parameters:
+    series (Series): The column to encode.
+
+    Returns:
+    tuple: (ndarray of codes, Index of labels).
+    """
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+
+    try:
+        codes, uniques = pd.factorize(series, sort=True)
+    except TypeError:
+        codes, uniques = pd.factorize(series)
+
+    return codes, pd.Index(uniques)
+
+# Function to bin the event log into a dense city x day x time-bucket activity array
+# counts, cities, days, buckets = build_activity_time_series(df_music, bucket_minutes=15)
+def build_activity_time_series(df, bucket_minutes=15, city_col='city', day_col='day', time_col='time'):
+    """
+    Counts plays per city, day and time-of-day bucket of any width in one linear pass: the city, day and
+    bucket codes are combined into a single integer key and counted with np.bincount.
+    With bucket_minutes=60 the counts equal 'total_tracks' of the hourly music activity tables.
+    Rows with a missing city, day or time are ignored.
+
+    Parameters:
+    df (DataFrame): The event log.
+    bucket_minutes (float): Bucket width in minutes (e.g. 5, 15, 60).
+    city_col (str): City column.
+    day_col (str): Day column.
+    time_col (str): Time-of-day column.
+
+    Returns:
+    tuple: (int64 ndarray of shape (cities, days, buckets), Index of cities, Index of days,
+            Index of bucket start times as 'HH:MM').
+
+    Raises:
+    ValueError: If 'bucket_minutes' is not positive.
+    """
+
+    if bucket_minutes <= 0:
+        raise ValueError("*** Error *** > 'bucket_minutes' must be positive.")
+
+    width = bucket_minutes * 60
+    n_buckets = int(np.ceil(86_400 / width))
+
+    city_codes, cities = _column_codes(df[city_col])
+    day_codes, days = _column_codes(df[day_col])
+    seconds = _seconds_of_day(df[time_col])
+
+    valid = (city_codes >= 0) & (day_codes >= 0) & ~np.isnan(seconds)
+    buckets = np.minimum((seconds[valid] // width).astype(np.int64), n_buckets - 1)
+    keys = (city_codes[valid].astype(np.int64) * len(days) + day_codes[valid]) * n_buckets + buckets
+
+    shape = (len(cities), len(days), n_buckets)
+    counts = np.bincount(keys, minlength=int(np.prod(shape))).reshape(shape)
+
+    starts = (np.arange(n_buckets) * width).astype(np.int64)
+    labels = pd.Index([f'{s // 3600:02d}:{s // 60 % 60:02d}' for s in starts], name='bucket_start')
+
+    return counts, cities, days, labels
+
+# Function to compute trailing rolling sums or means along the time axis of an activity array
+# hourly_load = rolling_activity(counts, window=4)    # 15-minute buckets -> 1-hour rolling sum
+def rolling_activity(counts, window, statistic='sum'):
+    """
+    Computes trailing rolling sums or means over the last axis (time buckets) of an activity array
+    through cumulative sums, so the cost is linear whatever the window length. The first window-1
+    buckets of each day use the buckets available so far (as pandas' rolling(min_periods=1)).
+
+    Parameters:
+    counts (ndarray): Activity array, e.g. from build_activity_time_series().
+    window (int): Window length in buckets.
+    statistic (str): 'sum' or 'mean'.
+
+    Returns:
+    ndarray: float64 array with the shape of 'counts'; element [..., i] covers buckets i-window+1..i.
+
+    Raises:
+    ValueError: If 'window' is not a positive integer or 'statistic' is unknown.
+    """
+
+    if int(window) != window or window < 1:
+        raise ValueError("*** Error *** > 'window' must be a positive integer.")
+    if statistic not in ('sum', 'mean'):
+        raise ValueError(f"*** Error *** > Invalid statistic '{statistic}'. Use 'sum' or 'mean'.")
+
+    counts = np.asarray(counts, dtype=np.float64)
+    window = int(window)
+    n = counts.shape[-1]
+
+    cumulative = np.zeros(counts.shape[:-1] + (n + 1,))
+    np.cumsum(counts, axis=-1, out=cumulative[..., 1:])
+
+    ends = np.arange(1, n + 1)
+    starts = np.maximum(ends - window, 0)
+    sums = cumulative[..., ends] - cumulative[..., starts]
+
+    return sums if statistic == 'sum' else sums / (ends - starts)
+
+# Function to find the busiest rolling window of every city and day
+# activity_peaks(counts, cities, days, buckets, window=4)
+def activity_peaks(counts, cities, days, buckets, window=1):
+    """
+    Finds, for every city and day, the trailing window of 'window' buckets with the most plays.
+
+    Parameters:
+    counts (ndarray): Array returned by build_activity_time_series().
+    cities (Index): City labels returned by build_activity_time_series().
+    days (Index): Day labels returned by build_activity_time_series().
+    buckets (Index): Bucket labels returned by build_activity_time_series().
+    window (int): Window length in buckets.
+
+    Returns:
+    DataFrame: One row per city and day with 'window_start', 'window_end' (start of the last bucket)
+               and 'plays' in the peak window.
+    """
+
+    sums = rolling_activity(counts, window)
+    peak = sums.argmax(axis=-1)
+    first = np.maximum(peak - window + 1, 0)
+
+    city_index, day_index = np.meshgrid(np.arange(len(cities)), np.arange(len(days)), indexing='ij')
+
+    return pd.DataFrame({
+        'city': cities.take(city_index.ravel()),
+        'day': days.take(day_index.ravel()),
+        'window_start': buckets.take(first.ravel()),
+        'window_end': buckets.take(peak.ravel()),
+        'plays': np.take_along_axis(sums, peak[..., None], axis=-1).ravel().astype(np.int64),
+    })
+
+# Function to build a sparse user x item play-count matrix (e.g. user x genre, user x artist)
+# matrix, users, genres = build_preference_matrix(df_music, item_col='genre', normalize='l1')
+def build_preference_matrix(df, item_col='genre', user_col='userid', normalize=None):
+    """
+    Builds a scipy.sparse CSR matrix of play counts with one row per user and one column per item,
+    directly from the integer codes of both columns (no dense pivot table is created).
+
+    Parameters:
+    df (DataFrame): The event log.
+    item_col (str): Column with the preference item (e.g. 'genre', 'artist').
+    user_col (str): Column identifying the user.
+    normalize (str, optional): None for raw counts, 'l1' for per-user shares, 'l2' for unit-length rows
+                               (cosine similarity becomes a dot product).
+
+    Returns:
+    tuple: (csr_matrix, Index of user labels for the rows, Index of item labels for the columns).
+
+    Raises:
+    ValueError: If 'normalize' is not None, 'l1' or 'l2'.
+    """
+
+    user_codes, users = _column_codes(df[user_col])
+    item_codes, items = _column_codes(df[item_col])
+
+    valid = (user_codes >= 0) & (item_codes >= 0)
+    counts = np.ones(int(valid.sum()), dtype=np.float64 if normalize else np.int64)
+
+    matrix = sparse.coo_matrix((counts, (user_codes[valid], item_codes[valid])),
+                               shape=(len(users), len(items))).tocsr()
+    matrix.sum_duplicates()
+
+    if normalize is not None:
+        matrix = normalize_preference_matrix(matrix, norm=normalize)
+
+    return matrix, users, items
+
+# Function to normalize the rows of a sparse preference matrix
+def normalize_preference_matrix(matrix, norm='l1'):
+    """
+    Scales each row of a sparse matrix to unit L1 or L2 norm. Empty rows are left as zeros.
+
+    Parameters:
+    matrix (sparse matrix): Play-count matrix (users x items).
+    norm (str): 'l1' or 'l2'.
+
+    Returns:
+    csr_matrix: Row-normalized float matrix.
+
+    Raises:
+    ValueError: If 'norm' is not 'l1' or 'l2'.
+    """
+
+    matrix = sparse.csr_matrix(matrix, dtype=np.float64)
+
+    if norm == 'l1':
+        row_norms = np.asarray(abs(matrix).sum(axis=1)).ravel()
+    elif norm == 'l2':
+        row_norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    else:
+        raise ValueError(f"*** Error *** > Invalid norm '{norm}'. Use 'l1' or 'l2'.")
+
+    scale = np.divide(1.0, row_norms, out=np.zeros_like(row_norms), where=row_norms > 0)
+
+    return sparse.diags(scale).dot(matrix).tocsr()
+
+# Function to split the rows of a preference matrix by the city of each user
+# by_city = split_preference_matrix_by_city(matrix, users, df_music)
+def split_preference_matrix_by_city(matrix, users, df, user_col='userid', city_col='city'):
+    """
+    Slices a user x item matrix into one sub-matrix per city, keeping the shared item columns.
+    Users active in more than one city appear in each of them.
+
+    Parameters:
+    matrix (sparse matrix): Matrix returned by build_preference_matrix().
+    users (Index): Row labels returned by build_preference_matrix().
+    df (DataFrame): Event log providing the user/city pairs.
+    user_col (str): Column identifying the user.
+    city_col (str): Column with the user's city.
+
+    Returns:
+    dict: {city: (csr_matrix, Index of user labels)}.
+    """
+
+    matrix = sparse.csr_matrix(matrix)
+    pairs = df[[user_col, city_col]].dropna().drop_duplicates()
+    rows = users.get_indexer(pairs[user_col])
+
+    result = {}
+    for city, city_rows in pd.Series(rows, index=pairs.index).groupby(pairs[city_col], observed=True):
+        city_rows = np.sort(city_rows.to_numpy()[city_rows.to_numpy() >= 0])
+        result[city] = (matrix[city_rows], users.take(city_rows))
+
+    return result
+
+# Function to save a preference matrix and its labels to a single .npz file
+def save_preference_matrix(path, matrix, users, items):
+    """
+    Saves a sparse preference matrix together with its row and column labels to one .npz file.
+
+    Parameters:
+    path (Path or str): Destination file (conventionally with the '.npz' extension).
+    matrix (sparse matrix): The preference matrix.
+    users (Index): Row labels.
+    items (Index): Column labels.
+    """
+
+    matrix = sparse.csr_matrix(matrix)
+
+    np.savez_compressed(path,
+                        data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+                        shape=np.array(matrix.shape),
+                        users=np.asarray(users, dtype=str), items=np.asarray(items, dtype=str))
+
+# Function to load a preference matrix saved with save_preference_matrix()
+def load_preference_matrix(path):
+    """
+    Loads a sparse preference matrix and its labels from a .npz file written by save_preference_matrix().
+
+    Parameters:
+    path (Path or str): The .npz file.
+
+    Returns:
+    tuple: (csr_matrix, Index of user labels, Index of item labels).
+
+    Raises:
+    FileNotFoundError: If the file does not exist.
+    """
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"*** Error ***\nFile not found: {path}\nCurrent working directory: {os.getcwd()}")
+
+    with np.load(path, allow_pickle=False) as stored:
+        matrix = sparse.csr_matrix((stored['data'], stored['indices'], stored['indptr']),
+                                   shape=tuple(stored['shape']))
+        users = pd.Index(stored['users'])
+        items = pd.Index(stored['items'])
+
+    return matrix, users, items
+
+# Roaring containers: ids sharing their high 16 bits are stored as a sorted uint16 array while there are at
+# most _ARRAY_LIMIT of them, and as a 65536-bit bitmap (1024 little-endian uint64 words) beyond that
+_ARRAY_LIMIT = 4096
+
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+# Function to count the set bits of a bitmap container
+def _popcount(words):
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(words).sum())
+
+    return int(_POPCOUNT_TABLE[words.view(np.uint8)].sum())
+
+# Function to convert an array container into a bitmap container
+def _to_bitmap(values):
+    bits = np.zeros(1 << 16, dtype=bool)
+    bits[values] = True
+
+    return np.packbits(bits, bitorder='little').view('<u8')
+
+# Function to convert a bitmap container into an array container
+def _to_array(words):
+    return np.flatnonzero(np.unpackbits(words.view(np.uint8), bitorder='little')).astype(np.uint16)
+
+# Function to store a container in its compact form (array while small enough, otherwise bitmap)
+def _compact(container):
+    if container.dtype == np.uint16:
+        return _to_bitmap(container) if len(container) > _ARRAY_LIMIT else container
+
+    return _to_array(container) if _popcount(container) <= _ARRAY_LIMIT else container
+
+# Function to test which values of an array container are set in a bitmap container
+def _contains(words, values):
+    values = values.astype(np.uint64)
+    return ((words[values >> np.uint64(6)] >> (values & np.uint64(63))) & np.uint64(1)).astype(bool)
+
+# Function to count the ids of a container
+def _container_cardinality(container):
+    return len(container) if container.dtype == np.uint16 else _popcount(container)
+
+# Function to intersect two containers
+def _container_and(a, b):
+    if a.dtype == np.uint16 and b.dtype == np.uint16:
+        return np.intersect1d(a, b, assume_unique=True)
+    if a.dtype == np.uint16:
+        return a[_contains(b, a)]
+    if b.dtype == np.uint16:
+        return b[_contains(a, b)]
+
+    return _compact(a & b)
+
+# Function to subtract container b from container a
+def _container_andnot(a, b):
+    if a.dtype == np.uint16:
+        return np.setdiff1d(a, b, assume_unique=True) if b.dtype == np.uint16 else a[~_contains(b, a)]
+
+    return _compact(a & ~(_to_bitmap(b) if b.dtype == np.uint16 else b))
+
+
+class UserBitmap:
+    """
+    Compressed set of dense user ids (roaring-style): ids are split by their high 16 bits into containers
+    holding a sorted uint16 array (sparse chunks) or a 65536-bit bitmap (dense chunks). Intersections,
+    unions, differences and cardinalities work container by container with NumPy set and bitwise
+    operations, so they cost microseconds even for sets of millions of users. Bitmaps are immutable.
+
+    Parameters:
+    containers (dict, optional): {high 16 bits: container}; use from_ids() to build a bitmap.
+
+    Example:
+    monday = UserBitmap.from_ids([3, 7, 70_000])
+    friday = UserBitmap.from_ids([7, 70_000, 80_000])
+    len(monday & friday)          # 2
+    monday.jaccard(friday)        # 0.5
+    """
+
+    __slots__ = ('_containers', '_cardinality')
+
+    def __init__(self, containers=None):
+        self._containers = {key: container for key, container in (containers or {}).items() if len(container)}
+        self._cardinality = sum(_container_cardinality(container) for container in self._containers.values())
+
+    @classmethod
+    def from_ids(cls, ids, assume_sorted=False):
+        """
+        Builds a bitmap from non-negative integer ids.
+
+        Parameters:
+        ids (array-like): User ids (below 2**32).
+        assume_sorted (bool): If True, 'ids' are already sorted and unique (skips np.unique).
+
+        Returns:
+        UserBitmap: The set of ids.
+        """
+
+        ids = np.asarray(ids, dtype=np.int64)
+        if not assume_sorted:
+            ids = np.unique(ids)
+        if len(ids) == 0:
+            return cls()
+
+        highs = ids >> 16
+        bounds = np.flatnonzero(np.diff(highs)) + 1
+        starts, stops = np.r_[0, bounds], np.r_[bounds, len(ids)]
+
+        return cls({int(highs[start]): _compact((ids[start:stop] & 0xFFFF).astype(np.uint16))
+                    for start, stop in zip(starts, stops)})
+
+    @classmethod
+    def union_all(cls, bitmaps):
+        """
+        Returns the union of several bitmaps, OR-ing every container key once.
+
+        Parameters:
+        bitmaps (iterable of UserBitmap): The sets to combine.
+
+        Returns:
+        UserBitmap: Their union.
+        """
+
+        grouped = {}
+        for bitmap in bitmaps:
+            for key, container in bitmap._containers.items():
+                grouped.setdefault(key, []).append(container)
+
+        containers = {}
+        for key, parts in grouped.items():
+            if len(parts) == 1:
+                containers[key] = parts[0]
+            elif all(part.dtype == np.uint16 for part in parts) and sum(map(len, parts)) <= _ARRAY_LIMIT:
+                containers[key] = np.unique(np.concatenate(parts))
+            else:
+                words = np.zeros(1024, dtype='<u8')
+                for part in parts:
+                    words |= _to_bitmap(part) if part.dtype == np.uint16 else part
+                containers[key] = _compact(words)
+
+        return cls(containers)
+
+    def __repr__(self):
+        return f"UserBitmap(cardinality={self._cardinality}, containers={len(self._containers)}, nbytes={self.nbytes})"
+
+    def __len__(self):
+        return self._cardinality
+
+    def __contains__(self, user_id):
+        container = self._containers.get(int(user_id) >> 16)
+        if container is None:
+            return False
+        low = np.array([int(user_id) & 0xFFFF], dtype=np.uint16)
+
+        return bool(np.isin(low, container).any() if container.dtype == np.uint16 else _contains(container, low)[0])
+
+    def __iter__(self):
+        return iter(self.to_array().tolist())
+
+    def __eq__(self, other):
+        return (isinstance(other, UserBitmap) and self._cardinality == other._cardinality and
+                np.array_equal(self.to_array(), other.to_array()))
+
+    def __and__(self, other):
+        return UserBitmap({key: _container_and(container, other._containers[key])
+                           for key, container in self._containers.items() if key in other._containers})
+
+    def __or__(self, other):
+        return UserBitmap.union_all([self, other])
+
+    def __sub__(self, other):
+        return UserBitmap({key: container if key not in other._containers
+                           else _container_andnot(container, other._containers[key])
+                           for key, container in self._containers.items()})
+
+    @property
+    def nbytes(self):
+        """Bytes used by the containers."""
+        return sum(container.nbytes for container in self._containers.values())
+
+    def intersection_cardinality(self, other):
+        """
+        Counts the ids of both bitmaps without building their intersection.
+
+        Parameters:
+        other (UserBitmap): The other set.
+
+        Returns:
+        int: |self & other|.
+        """
+
+        total = 0
+        for key, a in self._containers.items():
+            b = other._containers.get(key)
+            if b is None:
+                continue
+            if a.dtype == np.uint16 and b.dtype == np.uint16:
+                total += len(np.intersect1d(a, b, assume_unique=True))
+            elif a.dtype == np.uint16 or b.dtype == np.uint16:
+                array, words = (a, b) if a.dtype == np.uint16 else (b, a)
+                total += int(_contains(words, array).sum())
+            else:
+                total += _popcount(a & b)
+
+        return total
+
+    def jaccard(self, other):
+        """
+        Returns |self & other| / |self | other| (0 for two empty sets).
+        """
+
+        common = self.intersection_cardinality(other)
+        union = self._cardinality + other._cardinality - common
+
+        return common / union if union else 0.0
+
+    def to_array(self):
+        """
+        Returns the ids in increasing order.
+
+        Returns:
+        ndarray: int64 ids.
+        """
+
+        if not self._containers:
+            return np.zeros(0, dtype=np.int64)
+
+        return np.concatenate([(key << 16) + (container if container.dtype == np.uint16
+                                               else _to_array(container)).astype(np.int64)
+                               for key, container in sorted(self._containers.items())])
@@ -0,0 +1,400 @@
+# indexing.py for composite-key (city, day, hour) indexes over the music event log
+
+import numpy as np
+import pandas as pd
+
+from .features import UserBitmap, _column_codes, _seconds_of_day
+from .memo import MemoCache
+
+# Union bitmaps kept in memory per AudienceIndex (least recently used are evicted)
+_UNION_CACHE_SIZE = 256
+
+
+# Function to get the integer codes and labels of one key of a composite index (also used to stratify samples)
+def key_codes(df, key, time_col='time'):
+    """
+    Returns integer codes (-1 for missing) and labels for one key column, with codes ordered like the
+    labels so that label slices map to code ranges. Non-categorical keys get sorted labels; categorical
+    keys keep their category order (e.g. an ordered 'day' category runs monday..sunday). An 'hour' key
+    missing from 'df' is derived from 'time_col' (codes 0..23).
+
+    Parameters:
+    df (DataFrame): The event log.
+    key (str): Key column.
+    time_col (str): Time-of-day column used to derive 'hour'.
+
+    Returns:
+    tuple: (ndarray of codes, Index of labels).
+    """
+
+    if key == 'hour' and key not in df.columns:
+        seconds = _seconds_of_day(df[time_col])
+        codes = np.where(np.isnan(seconds), -1, seconds // 3600).astype(np.int64)
+        return codes, pd.Index(range(24), name='hour')
+
+    return _column_codes(df[key])
+
+# Function to combine several key columns into a single mixed-radix cell code
+def _cell_codes(df, keys, time_col='time'):
+    """
+    Encodes each row's combination of key values as one integer in [0, prod(len(labels))), so that
+    cells are ordered lexicographically by the keys. Rows with a missing key get -1.
+
+    Parameters:
+    df (DataFrame): The event log.
+    keys (list): Key columns, outermost first (e.g. ['city', 'day', 'hour']).
+    time_col (str): Time-of-day column used to derive 'hour' if needed.
+
+    Returns:
+    tuple: (ndarray of int64 cell codes, list of label Indexes, one per key).
+    """
+
+    cells = np.zeros(len(df), dtype=np.int64)
+    missing = np.zeros(len(df), dtype=bool)
+    labels = []
+
+    for key in keys:
+        codes, key_labels = key_codes(df, key, time_col)
+        cells = cells * len(key_labels) + codes
+        missing |= codes < 0
+        labels.append(key_labels)
+
+    cells[missing] = -1
+
+    return cells, labels
+
+
+# Function to convert the value given for one key (label, list, inclusive label slice or None) into codes
+def _lookup_codes(lookup, size, key, value):
+    """
+    Shared by ActivityIndex and AudienceIndex; slices include both ends, like .loc.
+
+    Parameters:
+    lookup (dict): Label -> code mapping of the key.
+    size (int): Number of labels of the key.
+    key (str): Key name, used in error messages.
+    value: A label, a list of labels, an inclusive label slice or None (all).
+
+    Returns:
+    ndarray: Sorted, distinct int64 codes.
+
+    Raises:
+    KeyError: If a label does not exist.
+    """
+
+    def code(label):
+        try:
+            return lookup[label]
+        except KeyError:
+            raise KeyError(f"*** Error *** > '{label}' is not a value of '{key}'.") from None
+
+    if value is None:
+        return np.arange(size, dtype=np.int64)
+
+    if isinstance(value, slice):
+        start = 0 if value.start is None else code(value.start)
+        stop = size - 1 if value.stop is None else code(value.stop)
+        return np.arange(start, stop + 1, dtype=np.int64)
+
+    if isinstance(value, (list, tuple, set, np.ndarray, pd.Index)):
+        return np.unique(np.array([code(label) for label in value], dtype=np.int64))
+
+    return np.array([code(value)], dtype=np.int64)
+
+
+class ActivityIndex:
+    """
+    Composite-key slice index over the event log: rows are sorted once by their (city, day, hour)
+    codes and an offset array records where each cell starts, so a lookup such as
+    ('springfield', 'monday', slice(8, 9)) is a couple of array reads instead of a full boolean scan.
+
+    Lookups whose cells are adjacent in the sort order (any set of values of the last key, or whole
+    trailing keys) return a zero-copy positional slice of the sorted frame; other lookups gather
+    several runs into a new DataFrame. Rows with a missing key are kept but belong to no cell.
+    Label slices follow the sorted labels of each key (the category order for categorical keys).
+
+    Parameters:
+    df (DataFrame): The event log.
+    keys (list or tuple): Key columns, outermost first. 'hour' is derived from 'time_col' if absent.
+    time_col (str): Time-of-day column used to derive 'hour'.
+
+    Example:
+    index = ActivityIndex(df_music)
+    morning = index[('springfield', 'monday', slice(8, 9))]     # 08:00-10:00, inclusive like .loc
+    index[('shelbyville', None, 20)]                            # every day at 20h
+    """
+
+    def __init__(self, df, keys=('city', 'day', 'hour'), time_col='time'):
+        self.keys = list(keys)
+        cells, self.labels = _cell_codes(df, self.keys, time_col)
+        self.shape = tuple(len(labels) for labels in self.labels)
+
+        # Missing-key rows (-1) are moved past the last cell
+        n_cells = int(np.prod(self.shape))
+        sort_codes = np.where(cells < 0, n_cells, cells)
+        self.order = np.argsort(sort_codes, kind='stable')
+        self.frame = df.take(self.order)
+
+        counts = np.bincount(sort_codes, minlength=n_cells + 1)[:n_cells]
+        self.offsets = np.zeros(n_cells + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.offsets[1:])
+
+        self._lookup = [{label: code for code, label in enumerate(labels)} for labels in self.labels]
+
+    def __repr__(self):
+        return f"ActivityIndex(keys={self.keys}, shape={self.shape}, rows={len(self.frame)})"
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __getitem__(self, values):
+        return self.get(*(values if isinstance(values, tuple) else (values,)))
+
+    def runs(self, *values):
+        """
+        Returns the contiguous row ranges (in the sorted frame) matching a lookup.
+
+        Parameters:
+        *values: One value per key, outermost first: a label, a list of labels, an inclusive label
+                 slice or None (all). Omitted trailing keys match everything.
+
+        Returns:
+        ndarray: (n_runs, 2) array of [start, stop) positions; adjacent cells are merged.
+
+        Raises:
+        ValueError: If more values than keys are given.
+        KeyError: If a label does not exist.
+        """
+
+        if len(values) > len(self.keys):
+            raise ValueError(f"*** Error *** > The index has {len(self.keys)} keys: {self.keys}.")
+
+        values = list(values) + [None] * (len(self.keys) - len(values))
+        cells = np.zeros(1, dtype=np.int64)
+        for level, value in enumerate(values):
+            codes = _lookup_codes(self._lookup[level], self.shape[level], self.keys[level], value)
+            cells = (cells[:, None] * self.shape[level] + codes[None, :]).ravel()
+
+        starts, stops = self.offsets[cells], self.offsets[cells + 1]
+        keep = stops > starts
+        starts, stops = starts[keep], stops[keep]
+
+        if len(starts) == 0:
+            return np.zeros((0, 2), dtype=np.int64)
+
+        # Merge runs whose cells are adjacent in the sort order
+        breaks = np.flatnonzero(starts[1:] != stops[:-1]) + 1
+        return np.column_stack([starts[np.r_[0, breaks]], stops[np.r_[breaks - 1, len(stops) - 1]]])
+
+    def get(self, *values):
+        """
+        Returns the rows matching a lookup (see runs()). A single run is a zero-copy positional slice.
+
+        Returns:
+        DataFrame: The matching rows, in (city, day, hour) order.
+        """
+
+        runs = self.runs(*values)
+
+        if len(runs) == 0:
+            return self.frame.iloc[0:0]
+        if len(runs) == 1:
+            return self.frame.iloc[runs[0, 0]:runs[0, 1]]
+
+        return self.frame.iloc[np.concatenate([np.arange(start, stop) for start, stop in runs])]
+
+    def positions(self, *values):
+        """
+        Returns the positions in the original DataFrame of the rows matching a lookup,
+        to slice arrays aligned with it.
+
+        Returns:
+        ndarray: int64 row positions.
+        """
+
+        return np.concatenate([self.order[start:stop] for start, stop in self.runs(*values)] or
+                              [np.zeros(0, dtype=np.int64)])
+
+    def counts(self):
+        """
+        Returns the number of rows of every cell.
+
+        Returns:
+        Series: Row counts indexed by every combination of the keys.
+        """
+
+        index = pd.MultiIndex.from_product(self.labels, names=self.keys)
+
+        return pd.Series(np.diff(self.offsets), index=index, name='rows')
+
+    def groups(self):
+        """
+        Iterates over the non-empty cells.
+
+        Yields:
+        tuple: (tuple of key labels, zero-copy DataFrame slice).
+        """
+
+        for cell in np.flatnonzero(np.diff(self.offsets)):
+            codes = np.unravel_index(cell, self.shape)
+            labels = tuple(self.labels[level][code] for level, code in enumerate(codes))
+            yield labels, self.frame.iloc[self.offsets[cell]:self.offsets[cell + 1]]
+
+
+class AudienceIndex:
+    """
+    Audience (distinct users) of every city/day/hour cell of the event log, kept as one UserBitmap per cell.
+    User labels are mapped to dense integer ids (their position in 'users'), so overlap and retention
+    questions such as "how many users listened on both Monday and Friday" or "how many users appear in
+    both cities" become bitmap unions and intersections instead of rescans with Python sets.
+
+    Parameters:
+    df (DataFrame): The event log.
+    keys (list or tuple): Cell keys, outermost first. 'hour' is derived from 'time_col' if absent.
+    user_col (str): User column.
+    time_col (str): Time-of-day column used to derive 'hour'.
+
+    Example:
+    audience = AudienceIndex(df_music)
+    audience.overlap((None, 'monday'), (None, 'friday'))           # users active on both days
+    audience.overlap(('springfield',), ('shelbyville',))          # users in both cities
+    audience.overlap_matrix('day', city='springfield', normalize=True)
+    """
+
+    def __init__(self, df, keys=('city', 'day', 'hour'), user_col='userid', time_col='time'):
+        self.keys = list(keys)
+        cells, self.labels = _cell_codes(df, self.keys, time_col)
+        user_codes, self.users = _column_codes(df[user_col])
+        self.shape = tuple(len(labels) for labels in self.labels)
+        self._lookup = [{label: code for code, label in enumerate(labels)} for labels in self.labels]
+        self._unions = MemoCache(maxsize=_UNION_CACHE_SIZE)
+
+        # Distinct (cell, user) pairs, sorted by cell and then by user id
+        valid = (cells >= 0) & (user_codes >= 0)
+        n_users = max(len(self.users), 1)
+        pairs = np.unique(cells[valid] * n_users + user_codes[valid])
+        pair_cells, pair_users = pairs // n_users, pairs % n_users
+        bounds = np.searchsorted(pair_cells, np.arange(int(np.prod(self.shape)) + 1))
+
+        self.bitmaps = {cell: UserBitmap.from_ids(pair_users[bounds[cell]:bounds[cell + 1]], assume_sorted=True)
+                        for cell in np.flatnonzero(np.diff(bounds)).tolist()}
+
+    def __repr__(self):
+        return (f"AudienceIndex(keys={self.keys}, shape={self.shape}, users={len(self.users)}, "
+                f"cells={len(self.bitmaps)}, nbytes={self.nbytes})")
+
+    @property
+    def nbytes(self):
+        """Bytes used by the cell bitmaps."""
+        return sum(bitmap.nbytes for bitmap in self.bitmaps.values())
+
+    def bitmap(self, *values):
+        """
+        Returns the users of every cell matching a lookup (union of the cell bitmaps; the most recently
+        used unions are cached).
+
+        Parameters:
+        *values: One value per key, outermost first: a label, a list of labels, an inclusive label
+                 slice or None (all). Omitted trailing keys match everything.
+
+        Returns:
+        UserBitmap: Dense ids of the matching users.
+
+        Raises:
+        ValueError: If more values than keys are given.
+        KeyError: If a label does not exist.
+        """
+
+        if len(values) > len(self.keys):
+            raise ValueError(f"*** Error *** > The index has {len(self.keys)} keys: {self.keys}.")
+
+        values = list(values) + [None] * (len(self.keys) - len(values))
+        cells = np.zeros(1, dtype=np.int64)
+        for level, value in enumerate(values):
+            codes = _lookup_codes(self._lookup[level], self.shape[level], self.keys[level], value)
+            cells = (cells[:, None] * self.shape[level] + codes[None, :]).ravel()
+
+        cells = tuple(cell for cell in cells.tolist() if cell in self.bitmaps)
+        if len(cells) == 1:
+            return self.bitmaps[cells[0]]
+
+        return self._unions.get_or_compute(cells, lambda: UserBitmap.union_all(self.bitmaps[cell] for cell in cells))
+
+    def audience(self, *values):
+        """
+        Returns the labels of the users matching a lookup (see bitmap()).
+
+        Returns:
+        Index: User labels.
+        """
+
+        return self.users.take(self.bitmap(*values).to_array())
+
+    def overlap(self, a, b):
+        """
+        Counts the users matching both lookups, e.g. overlap((None, 'monday'), (None, 'friday')).
+
+        Parameters:
+        a (tuple): Values of the first lookup (see bitmap()).
+        b (tuple): Values of the second lookup.
+
+        Returns:
+        int: Number of users in both audiences.
+        """
+
+        a, b = (value if isinstance(value, tuple) else (value,) for value in (a, b))
+
+        return self.bitmap(*a).intersection_cardinality(self.bitmap(*b))
+
+    def overlap_matrix(self, key, normalize=False, **filters):
+        """
+        Returns the number of users shared by every pair of values of one key, within the cells
+        selected by 'filters' (e.g. overlap_matrix('day', city='springfield')).
+
+        Parameters:
+        key (str): Key whose values are compared (e.g. 'day' or 'city').
+        normalize (bool): If True, divides each row by its diagonal: the share of the row's audience
+                          also active in the column (a retention rate).
+        **filters: Values of the other keys (see bitmap()).
+
+        Returns:
+        DataFrame: Square matrix of shared users (diagonal = audience size of each value).
+
+        Raises:
+        KeyError: If 'key' or a filter is not a key of the index.
+        """
+
+        unknown = [name for name in [key, *filters] if name not in self.keys]
+        if unknown:
+            raise KeyError(f"*** Error *** > {unknown} are not keys of the index {self.keys}.")
+
+        level = self.keys.index(key)
+        labels = self.labels[level]
+        bitmaps = []
+        for label in labels:
+            values = [filters.get(name) for name in self.keys]
+            values[level] = label
+            bitmaps.append(self.bitmap(*values))
+
+        matrix = np.array([[a.intersection_cardinality(b) for b in bitmaps] for a in bitmaps], dtype=np.float64)
+        if normalize:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                matrix = matrix / np.diag(matrix)[:, None]
+
+        df = pd.DataFrame(matrix, index=labels, columns=labels)
+
+        return df if normalize else df.astype(np.int64)
+
+    def counts(self):
+        """
+        Returns the number of distinct users of every cell (the 'users' column of the activity tables).
+
+        Returns:
+        Series: Distinct users indexed by every combination of the keys.
+        """
+
+        counts = np.zeros(int(np.prod(self.shape)), dtype=np.int64)
+        for cell, bitmap in self.bitmaps.items():
+            counts[cell] = len(bitmap)
+
+        return pd.Series(counts, index=pd.MultiIndex.from_product(self.labels, names=self.keys), name='users')
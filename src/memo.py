@@ -0,0 +1,179 @@
+# memo.py for memoizing computations on unchanged tables, keyed by a content fingerprint
+
+from collections import OrderedDict
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+
+# Function to feed one column into a running hash
+def _hash_values(h, values):
+    """
+    Hashes the raw buffer of NumPy-backed values; other values (strings, extension arrays) are hashed
+    element-wise with pd.util.hash_array. Categoricals hash their codes plus their categories.
+    """
+
+    if isinstance(values, pd.Series):
+        values = values.array
+
+    if isinstance(values, pd.Categorical):
+        h.update(b'categorical')
+        _hash_values(h, values.codes)
+        _hash_values(h, np.asarray(values.categories))
+        return
+
+    if not isinstance(values, np.ndarray):
+        values = np.asarray(values, dtype=object)
+
+    h.update(str(values.dtype).encode())
+    if values.dtype.kind in 'biufcmM':
+        h.update(np.ascontiguousarray(values).view(np.uint8))
+    else:
+        h.update(pd.util.hash_array(values.astype(object), categorize=True).view(np.uint8))
+
+# Function to compute a cheap content fingerprint of a table, column or array
+def fingerprint(data):
+    """
+    Returns a 128-bit content fingerprint of a DataFrame, Series, ndarray or scalar: equal contents
+    (values, dtypes, column names, shape) give equal fingerprints. The index is not included.
+
+    Parameters:
+    data (DataFrame, Series, ndarray or object): The input.
+
+    Returns:
+    str: Hex digest.
+    """
+
+    h = hashlib.blake2b(digest_size=16)
+
+    if isinstance(data, pd.DataFrame):
+        h.update(repr(('frame', [str(column) for column in data.columns], data.shape)).encode())
+        for position in range(data.shape[1]):
+            _hash_values(h, data.iloc[:, position])
+    elif isinstance(data, (pd.Series, np.ndarray, pd.api.extensions.ExtensionArray)):
+        h.update(repr(('array', getattr(data, 'name', None), data.shape)).encode())
+        _hash_values(h, data)
+    else:
+        h.update(repr(('object', data)).encode())
+
+    return h.hexdigest()
+
+
+class MemoCache:
+    """
+    Least-recently-used memoization cache with an optional on-disk tier.
+
+    Entries are keyed by a tuple (usually a name, input fingerprints and parameters). Memory holds at most
+    'maxsize' entries; with 'disk_dir', every computed value is also pickled there, so it survives
+    evictions and kernel restarts (e.g. when re-running a notebook on unchanged tables).
+
+    Parameters:
+    maxsize (int): Entries kept in memory. 0 disables the memory tier.
+    disk_dir (Path or str, optional): Directory of the on-disk tier. None disables it.
+
+    Example:
+    cache = MemoCache(maxsize=256, disk_dir=project_root / "data" / "interim" / "cache")
+    stats = cache.get_or_compute(('describe', fingerprint(df)), df.describe)
+    """
+
+    def __init__(self, maxsize=128, disk_dir=None):
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __repr__(self):
+        return (f"MemoCache(maxsize={self.maxsize}, disk_dir={self.disk_dir!r}, size={len(self._entries)}, "
+                f"hits={self.hits}, disk_hits={self.disk_hits}, misses={self.misses})")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _digest(self, key):
+        return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+    def _disk_path(self, digest):
+        return os.path.join(self.disk_dir, f"{digest}.pkl")
+
+    def _remember(self, digest, value):
+        if self.maxsize <= 0:
+            return
+        self._entries[digest] = value
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached value of 'key', computing (and storing) it with 'compute()' on a miss.
+
+        Parameters:
+        key (tuple): Hashable description of the computation; its repr() must be deterministic.
+        compute (callable): Function without arguments returning the value.
+
+        Returns:
+        object: The cached or computed value.
+        """
+
+        digest = self._digest(key)
+
+        if digest in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(digest)
+            return self._entries[digest]
+
+        if self.disk_dir is not None and os.path.exists(self._disk_path(digest)):
+            try:
+                with open(self._disk_path(digest), 'rb') as file:
+                    value = pickle.load(file)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                pass
+            else:
+                self.disk_hits += 1
+                self._remember(digest, value)
+                return value
+
+        self.misses += 1
+        value = compute()
+        self._remember(digest, value)
+
+        if self.disk_dir is not None:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            temp_path = f"{self._disk_path(digest)}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._disk_path(digest))
+
+        return value
+
+    def clear(self, disk=False):
+        """
+        Empties the memory tier and resets the statistics.
+
+        Parameters:
+        disk (bool): If True, also deletes the pickled entries of the disk tier.
+        """
+
+        self._entries.clear()
+        self.hits = self.disk_hits = self.misses = 0
+
+        if disk and self.disk_dir is not None and os.path.isdir(self.disk_dir):
+            for name in os.listdir(self.disk_dir):
+                if name.endswith('.pkl'):
+                    os.remove(os.path.join(self.disk_dir, name))
+
+    def info(self):
+        """
+        Returns the cache statistics.
+
+        Returns:
+        dict: 'hits', 'disk_hits', 'misses', 'size', 'maxsize' and 'disk_dir'.
+        """
+
+        return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                'size': len(self._entries), 'maxsize': self.maxsize, 'disk_dir': self.disk_dir}
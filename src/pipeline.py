@@ -0,0 +1,509 @@
+# pipeline.py for running the raw -> clean -> features -> eda flow headlessly, as a DAG of cached stages
+#
+#     python -m src --raw data/raw/music_project_en.csv --workers 2
+#
+# Every stage output is pickled in the cache directory under a key built from the stage's code, its parameters,
+# the content hash of the files it reads and the keys of its inputs, so a rerun only executes the stages whose
+# key changed. Stages whose inputs are ready run in parallel.
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+import hashlib
+import inspect
+import io
+import json
+import os
+from pathlib import Path
+import pickle
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from . import activity_store, backends, data_cleaning, data_loader, eda, features, memo, utils
+from .activity_store import save_activity_tables
+from .data_cleaning import (apply_canonical_mapping, normalize_columns_headers_format, normalize_datetime,
+                            normalize_string_format, replace_missing_values, standardize_gender_values)
+from .data_loader import load_dataset_from_csv
+from .eda import summarize_distribution
+from .features import _seconds_of_day, build_listening_sessions, compute_music_activity, summarize_user_sessions
+
+# Grouping keys of the music_activity_* tables of data/processed/music_activity
+ACTIVITY_TABLES = {'music_activity_city': ['city'],
+                   'music_activity_day': ['day'],
+                   'music_activity_city_day': ['city', 'day'],
+                   'music_activity_time_city': ['city', 'hour'],
+                   'music_activity_time_day': ['day', 'hour'],
+                   'music_activity_time_city_day': ['city', 'day', 'hour']}
+
+# Ambiguous genres resolved by artist, as in 01_cleaning: (genre whose artists are matched, resolved genre)
+_AMBIGUOUS_GENRES = {'hop': [('triphop', 'triphop')],
+                     'nu': [('disco', 'nudisco'), ('funk', 'nufunk'), ('numetal', 'numetal'), ('nujazz', 'nujazz')]}
+
+# Genre implicit duplicates replaced in 01_cleaning
+_GENRE_REPLACEMENTS = {'hip': 'hiphop', 'hop': 'hiphop', 'hip_hop': 'hiphop', 'argentinetango': 'tango',
+                       'latino': 'latin'}
+
+_ACTIVITY_METRICS = ['total_tracks', 'tracks', 'users']
+
+
+# Function to compute the content hash of a file, reusing the stored hash while its size and mtime are unchanged
+def _file_digest(path, digests):
+    """
+    Hashes a file by content (blake2b, 1 MB blocks). 'digests' maps absolute paths to
+    {'size', 'mtime_ns', 'digest'} and is updated in place, so unchanged files are not re-read.
+
+    Raises:
+    FileNotFoundError: If the file does not exist.
+    """
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"*** Error ***\nFile not found: {path}\nCurrent working directory: {os.getcwd()}")
+
+    key = os.path.abspath(path)
+    stat = os.stat(path)
+    known = digests.get(key)
+    if known is not None and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+        return known['digest']
+
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            h.update(block)
+
+    digests[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'digest': h.hexdigest()}
+
+    return digests[key]['digest']
+
+# Function to get the source code of a stage function or module (part of the stage key)
+def _source(obj):
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return getattr(obj, '__qualname__', getattr(obj, '__name__', repr(obj)))
+
+
+class PipelineStage:
+    """
+    One step of a Pipeline.
+
+    Parameters:
+    name (str): Stage name (letters, digits, '_' or '-'), used for the cache file.
+    func (callable): Called as func(*outputs of 'inputs', **params); its return value is the stage output.
+    inputs (list, optional): Names of the upstream stages whose outputs are passed positionally.
+    params (dict, optional): Keyword arguments of 'func'; their repr() is part of the cache key.
+    files (list, optional): Files read by the stage; their content hash is part of the cache key.
+    outputs (list, optional): Files written by the stage; it reruns if any of them is missing.
+    modules (list, optional): Modules whose source code is part of the cache key (the module of 'func'
+                              and every module it calls into, directly or through helpers), so editing
+                              them invalidates the stage.
+    """
+
+    def __init__(self, name, func, inputs=(), params=None, files=(), outputs=(), modules=()):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.params = dict(params or {})
+        self.files = [os.fspath(path) for path in files if path is not None]
+        self.outputs = [os.fspath(path) for path in outputs]
+        self.modules = list(modules)
+
+    def __repr__(self):
+        return f"PipelineStage(name={self.name!r}, inputs={self.inputs})"
+
+
+class Pipeline:
+    """
+    DAG of PipelineStage objects with on-disk caching of every stage output.
+
+    A stage key hashes its code (function and 'modules' source), parameters, input files and the keys of its
+    upstream stages, so it changes whenever anything that could change the output changes. A stage whose
+    cached output (and output files) exists for its current key is skipped, and its output is only unpickled
+    if a downstream stage has to run. Stale stages run on a thread pool as soon as their inputs are available.
+
+    Parameters:
+    stages (list): PipelineStage objects, in any order.
+    cache_dir (Path or str): Directory of the pickled stage outputs and the manifest.
+    workers (int, optional): Stages run at the same time. If None, min(4, number of CPUs).
+
+    Raises:
+    ValueError: If stage names are repeated, an input is unknown or the stages contain a cycle.
+
+    Example:
+    pipeline = build_music_pipeline(project_root / "data" / "raw" / "music_project_en.csv")
+    report = pipeline.run()                # second run: every stage 'cached'
+    activity = pipeline.output('activity')
+    """
+
+    def __init__(self, stages, cache_dir, workers=None):
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"*** Error *** > Stage '{stage.name}' is defined twice.")
+            self.stages[stage.name] = stage
+
+        for stage in self.stages.values():
+            unknown = [name for name in stage.inputs if name not in self.stages]
+            if unknown:
+                raise ValueError(f"*** Error *** > Stage '{stage.name}' depends on unknown stages {unknown}.")
+
+        self.cache_dir = os.fspath(cache_dir)
+        self.workers = workers if workers is not None else min(4, os.cpu_count() or 1)
+        self.order = self._topological_order()
+        self._outputs = {}
+        self._locks = {name: threading.Lock() for name in self.stages}
+
+    def __repr__(self):
+        return f"Pipeline(stages={self.order}, cache_dir={self.cache_dir!r}, workers={self.workers})"
+
+    def _topological_order(self):
+        """Returns the stage names ordered so that every stage comes after its inputs."""
+
+        order, state = [], {}
+
+        def visit(name, path):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"*** Error *** > The stages contain a cycle: {' -> '.join(path + [name])}.")
+            state[name] = 'visiting'
+            for upstream in self.stages[name].inputs:
+                visit(upstream, path + [name])
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+
+        return order
+
+    def _path(self, *names):
+        return os.path.join(self.cache_dir, *names)
+
+    def _read_json(self, name):
+        try:
+            with open(self._path(name), encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_json(self, name, data):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{self._path(name)}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, indent=2)
+        os.replace(temp_path, self._path(name))
+
+    def _cache_file(self, name, key):
+        return self._path(f"{name}-{key}.pkl")
+
+    def keys(self):
+        """
+        Computes the cache key of every stage (input files are hashed, or their stored hash reused).
+
+        Returns:
+        dict: {stage name: hex key}.
+        """
+
+        digests = self._read_json('file_digests.json')
+        keys = {}
+
+        for name in self.order:
+            stage = self.stages[name]
+            description = (name, _source(stage.func), [_source(module) for module in stage.modules],
+                           repr(sorted(stage.params.items())), [_file_digest(path, digests) for path in stage.files],
+                           stage.outputs, [keys[upstream] for upstream in stage.inputs])
+            keys[name] = hashlib.blake2b(repr(description).encode(), digest_size=16).hexdigest()
+
+        self._write_json('file_digests.json', digests)
+
+        return keys
+
+    def _is_fresh(self, name, key):
+        return (os.path.exists(self._cache_file(name, key)) and
+                all(os.path.exists(path) for path in self.stages[name].outputs))
+
+    def status(self, keys=None):
+        """
+        Reports which stages would be skipped by run(), without running anything.
+
+        Returns:
+        DataFrame: 'stage', 'inputs', 'key' and 'fresh'.
+        """
+
+        keys = self.keys() if keys is None else keys
+
+        return pd.DataFrame([{'stage': name, 'inputs': ', '.join(self.stages[name].inputs), 'key': keys[name],
+                              'fresh': self._is_fresh(name, keys[name])} for name in self.order])
+
+    def output(self, name, key=None):
+        """
+        Returns the output of a stage from this run or from the cache.
+
+        Parameters:
+        name (str): Stage name.
+        key (str, optional): Stage key. If None, the current one.
+
+        Returns:
+        object: The stage output.
+
+        Raises:
+        KeyError: If the stage is unknown.
+        FileNotFoundError: If the stage has not been run for its current key.
+        """
+
+        if name not in self.stages:
+            raise KeyError(f"*** Error *** > Unknown stage '{name}'.")
+
+        with self._locks[name]:
+            if name not in self._outputs:
+                path = self._cache_file(name, self.keys()[name] if key is None else key)
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"*** Error ***\nFile not found: {path}\n"
+                                            f"Current working directory: {os.getcwd()}")
+                with open(path, 'rb') as file:
+                    self._outputs[name] = pickle.load(file)
+
+            return self._outputs[name]
+
+    def _execute(self, name, keys):
+        """Runs one stage, pickles its output under its key and removes its outdated cache files."""
+
+        stage = self.stages[name]
+        start = time.perf_counter()
+        args = [self.output(upstream, keys[upstream]) for upstream in stage.inputs]
+        result = stage.func(*args, **stage.params)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_file(name, keys[name])
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as file:
+            pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.startswith(f"{name}-") and file_name.endswith('.pkl') and file_name != os.path.basename(path):
+                os.remove(self._path(file_name))
+
+        with self._locks[name]:
+            self._outputs[name] = result
+
+        return time.perf_counter() - start
+
+    def run(self, force=(), verbose=False):
+        """
+        Runs every stale stage, in parallel where the DAG allows it, and skips the fresh ones.
+
+        Parameters:
+        force (list or str): Stages to rerun even if fresh, or 'all'.
+        verbose (bool): If True, lets the stages print their notebook output; otherwise it is discarded.
+                        Progress lines are written to stderr either way.
+
+        Returns:
+        DataFrame: One row per stage with 'stage', 'status' ('ran' or 'cached'), 'seconds' and 'key'.
+
+        Raises:
+        ValueError: If a forced stage is unknown.
+        RuntimeError: If a stage fails (stages already running are completed first).
+        """
+
+        force = set(self.stages) if force == 'all' or 'all' in force else set(force)
+        unknown = force - set(self.stages)
+        if unknown:
+            raise ValueError(f"*** Error *** > Unknown stages {sorted(unknown)}.")
+
+        keys = self.keys()
+        self._outputs = {}
+        report = {name: {'stage': name, 'status': 'cached', 'seconds': 0.0, 'key': keys[name]} for name in self.order}
+        pending = [name for name in self.order if name in force or not self._is_fresh(name, keys[name])]
+
+        for name in self.order:
+            if name not in pending:
+                print(f"> [{name}] fresh, skipped", file=sys.stderr, flush=True)
+
+        manifest = self._read_json('manifest.json')
+        running, failure = {}, None
+
+        with redirect_stdout(sys.stdout if verbose else io.StringIO()), \
+                ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            while (pending or running) and failure is None:
+                for name in list(pending):
+                    if len(running) >= max(1, self.workers):
+                        break
+                    if not any(upstream in pending or upstream in running.values()
+                               for upstream in self.stages[name].inputs):
+                        pending.remove(name)
+                        running[executor.submit(self._execute, name, keys)] = name
+                        print(f"> [{name}] running ...", file=sys.stderr, flush=True)
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        seconds = future.result()
+                    except Exception as error:
+                        failure = failure or (name, error)
+                        continue
+                    report[name].update(status='ran', seconds=seconds)
+                    manifest[name] = {'key': keys[name], 'seconds': seconds,
+                                      'created': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+                    print(f"> [{name}] done in {seconds:.2f} s", file=sys.stderr, flush=True)
+
+            wait(running)
+
+        self._write_json('manifest.json', manifest)
+
+        if failure is not None:
+            name, error = failure
+            raise RuntimeError(f"*** Error *** > Stage '{name}' failed: {error!r}") from error
+
+        return pd.DataFrame(list(report.values()))
+
+
+# Function to resolve ambiguous genres by artist and replace genre implicit duplicates, as in 01_cleaning
+def _resolve_genre_variants(df, genre_col='genre', artist_col='artist'):
+    genre = df[genre_col].astype(object)
+
+    for ambiguous, candidates in _AMBIGUOUS_GENRES.items():
+        pending = (genre == ambiguous).to_numpy()
+        if not pending.any():
+            continue
+        artists = {source: df.loc[genre == source, artist_col].unique() for source, _ in candidates}
+        for source, resolved in candidates:
+            matched = pending & df[artist_col].isin(artists[source]).to_numpy()
+            genre = genre.mask(matched, resolved)
+            pending &= ~matched
+
+    return genre.replace(_GENRE_REPLACEMENTS)
+
+# Function to load the raw event log (stage 'load')
+def _load_stage(raw_path, sep=','):
+    raw_path = Path(raw_path)
+
+    return load_dataset_from_csv(raw_path.parent, raw_path.name, sep=sep, header='infer', keep_default_na=False)
+
+# Function to clean the raw event log as in 01_cleaning (stage 'clean')
+def _clean_stage(df, canonical_mapping=None):
+    df = normalize_columns_headers_format(df)
+    df = normalize_string_format(df, exclude=['userid', 'time'])
+    df = df.drop_duplicates().reset_index(drop=True)
+    df = replace_missing_values(df, exclude=['userid', 'city', 'time', 'day'])
+    df = df.loc[~(df['track'].isna() & df['artist'].isna())].fillna('unknown')
+
+    if 'gender' in df.columns:
+        df = standardize_gender_values(df, include=['gender'])
+
+    df['genre'] = _resolve_genre_variants(df)
+    if canonical_mapping is not None:
+        df = apply_canonical_mapping(df, canonical_mapping)
+
+    for column in ['genre', 'city', 'day']:
+        df[column] = df[column].astype('category')
+
+    df = normalize_datetime(df, include=['time'], frmt='%H:%M:%S', cache=True)
+
+    return df.reset_index(drop=True)
+
+# Function to build the six music_activity_* tables, as in 02_feature_engineering (stage 'activity')
+def _activity_stage(df, backend=None):
+    seconds = _seconds_of_day(df['time'])
+    events = df[['userid', 'track', 'city', 'day']].copy()
+    events['hour'] = pd.array(np.where(np.isnan(seconds), np.nan, seconds // 3600), dtype='Int64').astype('category')
+
+    return {name: compute_music_activity(events, by, backend=backend) for name, by in ACTIVITY_TABLES.items()}
+
+# Function to summarize listening sessions per user (stage 'sessions')
+def _sessions_stage(df, gap_minutes=30):
+    return summarize_user_sessions(build_listening_sessions(df, gap_minutes=gap_minutes))
+
+# Function to summarize the distribution and correlations of the activity metrics (stage 'eda')
+def _eda_stage(activity):
+    summary = pd.concat([summarize_distribution(table, _ACTIVITY_METRICS, clamp_zero=True).assign(table=name)
+                         for name, table in activity.items()], ignore_index=True)
+    correlation = activity['music_activity_time_city_day'][_ACTIVITY_METRICS].corr()
+
+    return {'summary': summary[['table'] + [c for c in summary.columns if c != 'table']], 'correlation': correlation}
+
+# Function to write the processed tables (stage 'export')
+def _export_stage(clean, activity, eda_tables, user_sessions, processed_dir):
+    activity_dir = os.path.join(processed_dir, 'music_activity')
+    os.makedirs(activity_dir, exist_ok=True)
+
+    written = [os.path.join(processed_dir, 'music_clean.csv')]
+    clean.to_csv(written[0], index=False)
+
+    for name, table in activity.items():
+        written.append(os.path.join(activity_dir, f"{name}.csv"))
+        table.to_csv(written[-1], index=False)
+
+    written.append(save_activity_tables(os.path.join(processed_dir, 'music_activity.sqlite'), activity))
+
+    for name, table in [('music_activity_summary', eda_tables['summary']),
+                        ('music_activity_correlation', eda_tables['correlation']),
+                        ('music_user_sessions', user_sessions)]:
+        written.append(os.path.join(processed_dir, f"{name}.csv"))
+        table.to_csv(written[-1], index=name == 'music_activity_correlation')
+
+    return written
+
+# Function to build the raw -> clean -> features -> eda pipeline of the music activity project
+# build_music_pipeline(project_root / "data" / "raw" / "music_project_en.csv", workers=2).run()
+def build_music_pipeline(raw_path, processed_dir=None, cache_dir=None, workers=None, sep=',',
+                         canonical_mapping=None, gap_minutes=30, backend=None):
+    """
+    Builds the Pipeline that reproduces the notebooks headlessly:
+
+        load -> clean -> activity -> eda -> export
+                     \\-> sessions --------/
+
+    'activity' (the six music_activity_* tables) and 'sessions' (per-user session features) only depend on
+    'clean', so they run in parallel; 'export' writes music_clean.csv, music_activity/*.csv, the indexed
+    music_activity.sqlite store, the eda summary/correlation tables and the user sessions.
+
+    Parameters:
+    raw_path (Path or str): Raw CSV (e.g. data/raw/music_project_en.csv).
+    processed_dir (Path or str, optional): Output directory. If None, data/processed next to the raw directory.
+    cache_dir (Path or str, optional): Stage cache. If None, data/interim/pipeline next to the raw directory.
+    workers (int, optional): Stages run at the same time.
+    sep (str): Field separator of the raw CSV.
+    canonical_mapping (Path or str, optional): JSON file from save_canonical_mapping() applied after cleaning
+                                               (its content is part of the 'clean' key).
+    gap_minutes (float): Inactivity gap that splits listening sessions.
+    backend (str, optional): Backend of compute_music_activity ('pandas' or 'polars').
+
+    Returns:
+    Pipeline: The pipeline, ready to run().
+    """
+
+    data_dir = os.path.dirname(os.path.dirname(os.path.abspath(raw_path)))
+    processed_dir = os.fspath(processed_dir) if processed_dir is not None else os.path.join(data_dir, 'processed')
+    cache_dir = cache_dir if cache_dir is not None else os.path.join(data_dir, 'interim', 'pipeline')
+    mapping = os.fspath(canonical_mapping) if canonical_mapping is not None else None
+
+    outputs = ([os.path.join(processed_dir, 'music_clean.csv'), os.path.join(processed_dir, 'music_activity.sqlite')] +
+               [os.path.join(processed_dir, 'music_activity', f"{name}.csv") for name in ACTIVITY_TABLES])
+
+    # Source of every src module a stage reaches: this module (stage functions, genre tables) plus the
+    # library modules and the helpers they import (utils, backends, memo)
+    pipeline = sys.modules[__name__]
+    cleaning_modules = [pipeline, data_cleaning, backends, utils]
+    feature_modules = [pipeline, features, backends, utils]
+
+    stages = [
+        PipelineStage('load', _load_stage, params={'raw_path': os.fspath(raw_path), 'sep': sep},
+                      files=[raw_path], modules=[data_loader] + cleaning_modules),
+        PipelineStage('clean', _clean_stage, inputs=['load'], params={'canonical_mapping': mapping},
+                      files=[mapping], modules=cleaning_modules),
+        PipelineStage('activity', _activity_stage, inputs=['clean'], params={'backend': backend},
+                      modules=feature_modules),
+        PipelineStage('sessions', _sessions_stage, inputs=['clean'], params={'gap_minutes': gap_minutes},
+                      modules=feature_modules),
+        PipelineStage('eda', _eda_stage, inputs=['activity'], modules=[pipeline, eda, memo, utils]),
+        PipelineStage('export', _export_stage, inputs=['clean', 'activity', 'eda', 'sessions'],
+                      params={'processed_dir': processed_dir}, outputs=outputs, modules=[pipeline, activity_store]),
+    ]
+
+    return Pipeline(stages, cache_dir, workers=workers)
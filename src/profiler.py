@@ -0,0 +1,258 @@
+# profiler.py for opt-in instrumentation of the public src functions
+#
+# Enable it for a whole process with the environment variable SRC_PROFILE=1, or for a block of code with:
+#     with profiling():
+#         df_music = normalize_string_format(df_music)
+#     profile_report()
+#
+# Peak memory (tracemalloc) is off by default because tracing every allocation inflates the wall times;
+# turn it on with SRC_PROFILE_MEMORY=1 or profiling(memory=True).
+
+from contextlib import contextmanager
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+
+class _ProfilerState(threading.local):
+    """Per-thread stack of the instrumented calls currently running."""
+
+    def __init__(self):
+        self.stack = []
+
+
+_ENABLED = os.environ.get('SRC_PROFILE', '').strip().lower() not in ('', '0', 'false', 'no')
+_TRACE_MEMORY = os.environ.get('SRC_PROFILE_MEMORY', '').strip().lower() not in ('', '0', 'false', 'no')
+_RECORDS = []
+_RECORDS_LOCK = threading.Lock()
+_STATE = _ProfilerState()
+_ORIGIN = time.perf_counter()
+
+
+# Function to count the input rows of an instrumented call
+def _input_rows(args, kwargs):
+    """
+    Returns the number of rows of the first DataFrame/Series-like argument, or None if there is none.
+    """
+
+    for value in list(args) + list(kwargs.values()):
+        shape = getattr(value, 'shape', None)
+        if isinstance(shape, tuple) and shape and not isinstance(value, type):
+            return shape[0]
+
+    return None
+
+# Function to run one instrumented call while profiling is enabled
+def _profiled_call(func, args, kwargs):
+    """
+    Runs 'func' and records its wall time, CPU time, peak traced memory (if memory tracing is on)
+    and input rows. Nested instrumented calls are recorded with their call stack.
+    """
+
+    trace_memory = _TRACE_MEMORY
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    stack = _STATE.stack
+    frame = {'name': f"{func.__module__}.{func.__qualname__}", 'child_peak': 0}
+    base_memory = 0
+    if trace_memory:
+        base_memory, current_peak = tracemalloc.get_traced_memory()
+        # reset_peak() is global: keep the peak reached so far by the enclosing call before clearing it
+        if stack:
+            stack[-1]['child_peak'] = max(stack[-1]['child_peak'], current_peak)
+        tracemalloc.reset_peak()
+    stack.append(frame)
+
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+        peak = max(tracemalloc.get_traced_memory()[1], frame['child_peak']) if trace_memory else None
+        stack.pop()
+        if stack and trace_memory:
+            stack[-1]['child_peak'] = max(stack[-1]['child_peak'], peak)
+
+        rows = _input_rows(args, kwargs)
+        record = {
+            'function': frame['name'],
+            'stack': ';'.join([f['name'] for f in stack] + [frame['name']]),
+            'depth': len(stack),
+            'thread': threading.get_ident(),
+            'start_s': start_wall - _ORIGIN,
+            'wall_s': wall,
+            'cpu_s': cpu,
+            'peak_mb': max(peak - base_memory, 0) / 2 ** 20 if trace_memory else None,
+            'rows': rows,
+            'rows_per_s': rows / wall if rows is not None and wall > 0 else None,
+        }
+        with _RECORDS_LOCK:
+            _RECORDS.append(record)
+
+# Decorator adding opt-in profiling to a function
+def instrument(func):
+    """
+    Wraps a function so that, while profiling is enabled, each call records wall time, CPU time,
+    peak memory (when memory tracing is on), input row count and rows/sec. When profiling is disabled the wrapper only checks a flag.
+
+    Parameters:
+    func (callable): The function to instrument.
+
+    Returns:
+    callable: The instrumented function.
+    """
+
+    if getattr(func, '__instrumented__', False):
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _ENABLED:
+            return func(*args, **kwargs)
+        return _profiled_call(func, args, kwargs)
+
+    wrapper.__instrumented__ = True
+
+    return wrapper
+
+# Function to check whether profiling is currently enabled
+def is_profiling_enabled():
+    """
+    Returns True if instrumented src functions are currently recording profiles.
+    """
+
+    return _ENABLED
+
+# Context manager to enable profiling for a block of code
+@contextmanager
+def profiling(reset=True, memory=None):
+    """
+    Enables profiling of the instrumented src functions inside a 'with' block.
+
+    Parameters:
+    reset (bool): If True, clears the records of previous profiling runs first.
+    memory (bool, optional): If True, also records the peak memory of each call with tracemalloc,
+                             which slows down allocation-heavy code and inflates the wall times.
+                             If None, follows the SRC_PROFILE_MEMORY environment variable.
+
+    Yields:
+    None
+    """
+
+    global _ENABLED, _TRACE_MEMORY
+
+    if reset:
+        reset_profile()
+
+    previous, previous_memory = _ENABLED, _TRACE_MEMORY
+    trace_memory = previous_memory if memory is None else bool(memory)
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _ENABLED, _TRACE_MEMORY = True, trace_memory
+
+    try:
+        yield
+    finally:
+        _ENABLED, _TRACE_MEMORY = previous, previous_memory
+        if started_tracing:
+            tracemalloc.stop()
+
+# Function to discard all recorded profiles
+def reset_profile():
+    """
+    Clears every profiling record collected so far.
+    """
+
+    with _RECORDS_LOCK:
+        _RECORDS.clear()
+
+# Function to return the recorded profiles as a DataFrame
+def profile_report(summary=False):
+    """
+    Returns the recorded profiles.
+
+    Parameters:
+    summary (bool): If True, aggregates the calls per function (calls, total/mean wall time,
+                    total CPU time, max peak memory, total rows and overall rows/sec).
+                    'peak_mb' is empty for the calls profiled without memory tracing.
+
+    Returns:
+    DataFrame: One row per call, or one row per function if 'summary' is True.
+    """
+
+    with _RECORDS_LOCK:
+        df = pd.DataFrame(list(_RECORDS), columns=['function', 'stack', 'depth', 'thread', 'start_s', 'wall_s',
+                                                   'cpu_s', 'peak_mb', 'rows', 'rows_per_s'])
+
+    if not summary:
+        return df
+
+    report = df.groupby('function').agg(calls=('wall_s', 'size'), wall_s=('wall_s', 'sum'),
+                                        mean_wall_s=('wall_s', 'mean'), cpu_s=('cpu_s', 'sum'),
+                                        peak_mb=('peak_mb', 'max'), rows=('rows', 'sum'))
+    report['rows_per_s'] = report['rows'] / report['wall_s'].where(report['wall_s'] > 0)
+
+    return report.sort_values('wall_s', ascending=False)
+
+# Function to export the recorded profiles as a JSON trace
+def export_profile_trace(file_path):
+    """
+    Writes the recorded profiles in the Chrome Trace Event format (JSON), viewable in
+    chrome://tracing, Perfetto or speedscope.
+
+    Parameters:
+    file_path (Path or str): Destination JSON file.
+
+    Returns:
+    Path or str: The written file path.
+    """
+
+    events = [{
+        'name': record['function'].rsplit('.', 1)[-1],
+        'cat': record['function'].rsplit('.', 1)[0],
+        'ph': 'X',
+        'ts': record['start_s'] * 1e6,
+        'dur': record['wall_s'] * 1e6,
+        'pid': os.getpid(),
+        'tid': record['thread'],
+        'args': {key: record[key] for key in ('cpu_s', 'peak_mb', 'rows', 'rows_per_s')},
+    } for record in profile_report().to_dict('records')]
+
+    with open(file_path, 'w') as file:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file, default=str)
+
+    return file_path
+
+# Function to export the recorded profiles as collapsed stacks for flame graphs
+def export_profile_flamegraph(file_path):
+    """
+    Writes the recorded profiles as collapsed stacks ('outer;inner <microseconds>'), the input format of
+    flamegraph.pl, speedscope and inferno. Each line carries the self time of the call.
+
+    Parameters:
+    file_path (Path or str): Destination text file.
+
+    Returns:
+    Path or str: The written file path.
+    """
+
+    df = profile_report()
+    self_time = df.set_index('stack')['wall_s'].groupby(level=0).sum()
+
+    # Subtract the time spent in direct children from each parent stack
+    parents = self_time.index.str.rsplit(';', n=1).str[0]
+    children = pd.Series(self_time.to_numpy(), index=parents)[self_time.index.str.contains(';')]
+    self_time = self_time.sub(children.groupby(level=0).sum(), fill_value=0).clip(lower=0)
+
+    with open(file_path, 'w') as file:
+        for stack, seconds in self_time.items():
+            file.write(f"{stack} {int(round(seconds * 1e6))}\n")
+
+    return file_path
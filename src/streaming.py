@@ -0,0 +1,727 @@
+# streaming.py for bounded-memory summaries computed over chunked logs
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .indexing import key_codes
+
+
+class TopKCounter:
+    """
+    Streaming top-K (heavy hitters) counter for one column of the music log, optionally keyed by
+    other columns such as city and/or day.
+
+    Each key keeps a mergeable Space-Saving summary of at most 'capacity' items, so memory stays
+    bounded no matter how many distinct tracks or artists flow through. Chunks are counted exactly
+    and folded into the summary; counters built on different partitions can be merged. Counts only
+    pick up an error once a summary has been trimmed (items entering a trimmed summary start from the
+    largest count it dropped), so a log whose distinct items fit in 'capacity' is counted exactly
+    however it is split into chunks; beyond that, a larger capacity keeps the errors small.
+    Reported counts are upper bounds and 'count - error' are lower bounds of the true frequencies.
+
+    Parameters:
+    column (str): Column whose values are counted (e.g. 'artist', 'track', 'genre').
+    k (int): Default number of items returned by top().
+    keys (list or tuple): Columns the counts are split by (e.g. ['city'] or ['city', 'day']). Empty for global counts.
+    capacity (int, optional): Items kept per key. Defaults to max(10 * k, 100); larger is more accurate.
+
+    Example:
+    counter = TopKCounter('artist', k=15, keys=['city'])
+    for chunk in pd.read_csv(path, chunksize=1_000_000):
+        counter.update(chunk)
+    plot_horizontal_bar(counter.top('springfield'), precounted=True)
+    """
+
+    def __init__(self, column, k=10, keys=('city',), capacity=None):
+        self.column = column
+        self.k = k
+        self.keys = list(keys)
+        self.capacity = capacity if capacity is not None else max(10 * k, 100)
+        self.rows = 0
+        self._counts = {}
+        self._errors = {}
+        self._floors = {}
+
+    def __repr__(self):
+        return (f"TopKCounter(column='{self.column}', k={self.k}, keys={self.keys}, "
+                f"capacity={self.capacity}, rows={self.rows})")
+
+    @property
+    def key_values(self):
+        """List of key values seen so far."""
+        return list(self._counts)
+
+    def _merge_key(self, key, counts, errors, floor=0):
+        """
+        Folds a (counts, errors) pair into the summary of one key and trims it to capacity.
+        'floor' is the largest count an item missing from 'counts' may have had: 0 for the exact counts
+        of a chunk, the floor of the summary for a summary of another counter.
+        """
+
+        if key in self._counts:
+            current, current_errors = self._counts[key], self._errors[key]
+            current_floor = self._floors[key]
+            union = current.index.union(counts.index)
+
+            counts = (current.reindex(union, fill_value=current_floor) +
+                      counts.reindex(union, fill_value=floor))
+            errors = (current_errors.reindex(union, fill_value=current_floor) +
+                      errors.reindex(union, fill_value=floor))
+            floor = current_floor + floor
+
+        # Items trimmed away may have had up to the largest dropped count
+        if len(counts) > self.capacity:
+            counts = counts.sort_values(ascending=False, kind='stable')
+            floor = max(floor, counts.iloc[self.capacity])
+            counts = counts.iloc[:self.capacity]
+
+        self._counts[key] = counts
+        self._errors[key] = errors.reindex(counts.index)
+        self._floors[key] = floor
+
+    def update(self, chunk):
+        """
+        Counts one chunk of the log and folds it into the per-key summaries.
+
+        Parameters:
+        chunk (DataFrame): Rows containing 'column' and every column in 'keys'.
+
+        Returns:
+        TopKCounter: self, to allow chaining.
+        """
+
+        self.rows += len(chunk)
+
+        if not self.keys:
+            counts = chunk[self.column].value_counts()
+            self._merge_key(None, counts, pd.Series(0, index=counts.index))
+            return self
+
+        grouped = chunk.groupby(self.keys + [self.column], observed=True, sort=False).size()
+        key_level = 0 if len(self.keys) == 1 else list(range(len(self.keys)))
+
+        for key, counts in grouped.groupby(level=key_level, observed=True, sort=False):
+            counts = counts.droplevel(list(range(len(self.keys))))
+            self._merge_key(key, counts, pd.Series(0, index=counts.index))
+
+        return self
+
+    def consume(self, chunks):
+        """
+        Updates the counter with every chunk of an iterable (e.g. pd.read_csv(..., chunksize=n)).
+
+        Parameters:
+        chunks (iterable of DataFrame): The chunks to count.
+
+        Returns:
+        TopKCounter: self.
+        """
+
+        for chunk in chunks:
+            self.update(chunk)
+
+        return self
+
+    def merge(self, other):
+        """
+        Merges the summaries of another counter built on a different partition of the log.
+
+        Parameters:
+        other (TopKCounter): Counter over the same column and keys.
+
+        Returns:
+        TopKCounter: self, holding the combined summary.
+
+        Raises:
+        ValueError: If the counters track different columns or keys.
+        """
+
+        if other.column != self.column or other.keys != self.keys:
+            raise ValueError("*** Error *** > Only counters with the same column and keys can be merged.")
+
+        self.rows += other.rows
+        for key, counts in other._counts.items():
+            self._merge_key(key, counts, other._errors[key], other._floors[key])
+
+        return self
+
+    def top(self, key=None, k=None, with_errors=False):
+        """
+        Returns the most frequent items of one key (or of all keys combined).
+
+        Parameters:
+        key (scalar or tuple, optional): Key value, e.g. 'springfield' or ('springfield', 'monday').
+                                         If None, the summaries of every key are merged.
+        k (int, optional): Number of items to return. Defaults to the counter's k.
+        with_errors (bool): If True, returns a DataFrame with 'count' and 'error' columns instead of a Series.
+
+        Returns:
+        Series or DataFrame: Item counts sorted in descending order, ready for plot_horizontal_bar(precounted=True).
+
+        Raises:
+        KeyError: If the key has not been seen.
+        """
+
+        k = self.k if k is None else k
+
+        if key is None and self.keys:
+            combined = TopKCounter(self.column, k=self.k, keys=(), capacity=self.capacity)
+            for key_value, counts in self._counts.items():
+                combined._merge_key(None, counts, self._errors[key_value], self._floors[key_value])
+            return combined.top(k=k, with_errors=with_errors)
+
+        if key not in self._counts:
+            raise KeyError(f"*** Error *** > Key {key!r} has not been seen by the counter.")
+
+        counts = self._counts[key].sort_values(ascending=False, kind='stable').head(k)
+        counts = counts.rename(self.column).rename_axis(self.column)
+
+        if with_errors:
+            return pd.DataFrame({'count': counts, 'error': self._errors[key].reindex(counts.index)})
+
+        return counts
+
+    def to_frame(self, k=None):
+        """
+        Returns the top items of every key in long format.
+
+        Parameters:
+        k (int, optional): Number of items per key. Defaults to the counter's k.
+
+        Returns:
+        DataFrame: Columns for the keys, the counted column, 'count' and 'error'.
+        """
+
+        frames = []
+        for key in self._counts:
+            frame = self.top(key, k=k, with_errors=True).reset_index()
+            values = key if isinstance(key, tuple) else (key,)
+            for name, value in zip(self.keys, values):
+                frame.insert(len(frame.columns) - 3, name, value)
+            frames.append(frame)
+
+        columns = self.keys + [self.column, 'count', 'error']
+
+        return pd.concat(frames, ignore_index=True)[columns] if frames else pd.DataFrame(columns=columns)
+
+
+# 16-character keys of the two independent row hashes combined into 128-bit keys
+_HASH_KEYS = ('music_activity_1', 'music_activity_2')
+
+# Seed and multiplier of the column combination of the second 64-bit word (splitmix64 constants)
+_HIGH_SEED, _HIGH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15), np.uint64(0xBF58476D1CE4E5B9)
+
+
+# Function to hash every row of a DataFrame to a fixed-width key
+def hash_rows(df, subset=None, bits=128):
+    """
+    Computes a vectorized 64- or 128-bit hash per row, usable as a compact row identity for deduplication.
+
+    The second 64-bit word is not a rehash of the first: pandas ignores 'hash_key' for numeric, boolean
+    and datetime columns, so it combines the per-column hashes in reverse order with its own mixer.
+    Rows that collide in one word therefore do not collide in the other, except for columns hashed by a
+    bijection (numbers, dates), which cannot collide on their own anyway.
+
+    Parameters:
+    df (DataFrame): Rows to hash.
+    subset (list, optional): Columns included in the hash. If None, all columns are used.
+    bits (int): 64 (uint64 keys) or 128 (16-byte keys; collisions are practically impossible).
+
+    Returns:
+    ndarray: One key per row (dtype uint64 for 64 bits, void16 for 128 bits).
+
+    Raises:
+    ValueError: If 'bits' is not 64 or 128.
+    """
+
+    if bits not in (64, 128):
+        raise ValueError("*** Error *** > 'bits' must be 64 or 128.")
+
+    data = df if subset is None else df[subset]
+    low = pd.util.hash_pandas_object(data, index=False, hash_key=_HASH_KEYS[0]).to_numpy()
+
+    if bits == 64:
+        return low
+
+    high = np.full(len(data), _HIGH_SEED, dtype=np.uint64)
+    for position in reversed(range(data.shape[1])):
+        column = pd.util.hash_pandas_object(data.iloc[:, position], index=False, hash_key=_HASH_KEYS[1]).to_numpy()
+        high = (high ^ column) * _HIGH_MULTIPLIER
+        high ^= high >> np.uint64(31)
+
+    return np.ascontiguousarray(np.column_stack([low, high])).view('V16').ravel()
+
+
+class StreamingDeduplicator:
+    """
+    Removes explicit duplicate rows across a streamed or sharded log, keeping the first occurrence.
+
+    Each row is reduced to a fixed-width 64/128-bit hash (hash_rows), and only those keys are remembered,
+    split by hash into partitions of sorted runs, so memory grows with the number of unique rows times
+    8/16 bytes rather than with the rows themselves. When the in-memory keys exceed 'max_memory_mb',
+    the partitions are spilled to disk as sorted .npy files and memory-mapped for lookups.
+
+    Parameters:
+    subset (list, optional): Columns that define a duplicate. If None, all columns are used.
+    bits (int): Hash width, 64 or 128.
+    partitions (int): Number of hash partitions.
+    max_memory_mb (float): Budget for in-memory keys before spilling to disk.
+    spill_dir (Path or str, optional): Directory for spilled partitions. A temporary one is created if None.
+
+    Example:
+    with StreamingDeduplicator() as dedup:
+        for chunk in pd.read_csv(path, chunksize=1_000_000):
+            chunk = dedup.filter(chunk)
+    """
+
+    _MAX_RUNS = 8
+
+    def __init__(self, subset=None, bits=128, partitions=64, max_memory_mb=256, spill_dir=None):
+        if bits not in (64, 128):
+            raise ValueError("*** Error *** > 'bits' must be 64 or 128.")
+
+        self.subset = subset
+        self.bits = bits
+        self.partitions = partitions
+        self.max_memory_mb = max_memory_mb
+        self.spill_dir = spill_dir
+        self.rows_in = 0
+        self.rows_out = 0
+        self._runs = [[] for _ in range(partitions)]
+        self._temp_dir = None
+
+    def __repr__(self):
+        return (f"StreamingDeduplicator(bits={self.bits}, partitions={self.partitions}, "
+                f"rows_in={self.rows_in}, rows_out={self.rows_out}, spilled={self.spilled})")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def unique_rows(self):
+        """Number of distinct rows seen so far."""
+        return self.rows_out
+
+    @property
+    def spilled(self):
+        """True once partitions have been written to disk."""
+        return any(isinstance(run, np.memmap) for runs in self._runs for run in runs)
+
+    def _memory_bytes(self):
+        """Bytes held by in-memory (not memory-mapped) runs."""
+        return sum(run.nbytes for runs in self._runs for run in runs if not isinstance(run, np.memmap))
+
+    def _partition_of(self, keys):
+        """Partition index of each key, taken from its first 64 bits."""
+        first = keys if self.bits == 64 else keys.view(np.uint64)[::2]
+        return (first % np.uint64(self.partitions)).astype(np.int64)
+
+    def _contains(self, partition, keys):
+        """Boolean mask of the keys already stored in a partition."""
+
+        found = np.zeros(len(keys), dtype=bool)
+        for run in self._runs[partition]:
+            if len(run):
+                positions = np.searchsorted(run, keys).clip(max=len(run) - 1)
+                found |= run[positions] == keys
+
+        return found
+
+    def _spill_path(self, partition):
+        """File holding the spilled keys of a partition."""
+
+        if self.spill_dir is None:
+            self._temp_dir = self._temp_dir or tempfile.mkdtemp(prefix='music_dedup_')
+            directory = self._temp_dir
+        else:
+            directory = self.spill_dir
+            os.makedirs(directory, exist_ok=True)
+
+        return os.path.join(directory, f"dedup_part_{partition:05d}.npy")
+
+    def _compact(self, partition, to_disk=False):
+        """Merges the runs of a partition into one sorted run, on disk if it was or must be spilled."""
+
+        runs = self._runs[partition]
+        on_disk = to_disk or any(isinstance(run, np.memmap) for run in runs)
+        merged = np.sort(np.concatenate([np.asarray(run) for run in runs]))
+
+        if not on_disk:
+            self._runs[partition] = [merged]
+            return
+
+        # Release the memory maps of the old runs first: a mapped file cannot be replaced on Windows
+        self._runs[partition] = []
+        del runs
+        path = self._spill_path(partition)
+        np.save(path + '.tmp.npy', merged)
+        os.replace(path + '.tmp.npy', path)
+        self._runs[partition] = [np.load(path, mmap_mode='r')]
+
+    def filter(self, chunk):
+        """
+        Returns the rows of 'chunk' not seen before (in this chunk or any previous one) and remembers them.
+
+        Parameters:
+        chunk (DataFrame): Next piece of the log.
+
+        Returns:
+        DataFrame: The chunk without explicit duplicates, in its original order.
+        """
+
+        self.rows_in += len(chunk)
+        if chunk.empty:
+            return chunk
+
+        keys, first_rows = np.unique(hash_rows(chunk, subset=self.subset, bits=self.bits), return_index=True)
+        partitions = self._partition_of(keys)
+        keep = np.zeros(len(keys), dtype=bool)
+
+        for partition in np.unique(partitions):
+            in_partition = np.flatnonzero(partitions == partition)
+            new = ~self._contains(partition, keys[in_partition])
+            keep[in_partition[new]] = True
+
+            if new.any():
+                self._runs[partition].append(keys[in_partition[new]])
+                if len(self._runs[partition]) > self._MAX_RUNS:
+                    self._compact(partition)
+
+        if self._memory_bytes() > self.max_memory_mb * 2 ** 20:
+            for partition in range(self.partitions):
+                if self._runs[partition]:
+                    self._compact(partition, to_disk=True)
+
+        kept_rows = np.sort(first_rows[keep])
+        self.rows_out += len(kept_rows)
+
+        return chunk.iloc[kept_rows]
+
+    def close(self):
+        """Releases the memory-mapped partitions and removes the temporary spill directory, if any."""
+
+        self._runs = [[] for _ in range(self.partitions)]
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
+
+
+# Function to drop explicit duplicates across a stream of chunks
+# for chunk in drop_duplicates_streaming(pd.read_csv(path, chunksize=1_000_000)): ...
+def drop_duplicates_streaming(chunks, subset=None, bits=128, max_memory_mb=256, spill_dir=None):
+    """
+    Yields each chunk of a streamed or sharded log without rows already seen in it or in previous chunks.
+
+    Parameters:
+    chunks (iterable of DataFrame): The log, chunk by chunk (e.g. pd.read_csv(..., chunksize=n) or shard files).
+    subset (list, optional): Columns that define a duplicate. If None, all columns are used.
+    bits (int): Hash width, 64 or 128.
+    max_memory_mb (float): Budget for in-memory keys before spilling to disk.
+    spill_dir (Path or str, optional): Directory for spilled partitions.
+
+    Yields:
+    DataFrame: Deduplicated chunks.
+    """
+
+    with StreamingDeduplicator(subset=subset, bits=bits, max_memory_mb=max_memory_mb, spill_dir=spill_dir) as dedup:
+        for chunk in chunks:
+            yield dedup.filter(chunk)
+
+
+# Function to split a row budget as evenly as possible among strata, each capped at a limit
+def _fill_evenly(limits, budget, ranks):
+    """
+    Returns integer quotas with quotas <= limits and sum(quotas) <= budget, raising every stratum in turn
+    (water-filling). When fewer rows than open strata are left, the strata with the smallest 'ranks' get
+    one more row, so the same strata keep the remainder from one call to the next.
+    """
+
+    quotas = np.zeros(len(limits), dtype=np.int64)
+
+    while budget > 0:
+        open_strata = np.flatnonzero(quotas < limits)
+        if not len(open_strata):
+            break
+
+        step = budget // len(open_strata)
+        if step == 0:
+            chosen = open_strata[np.argsort(ranks[open_strata], kind='stable')[:budget]]
+            quotas[chosen] += 1
+            break
+
+        added = np.minimum(limits[open_strata] - quotas[open_strata], step)
+        quotas[open_strata] += added
+        budget -= int(added.sum())
+
+    return quotas
+
+
+class StratifiedReservoirSampler:
+    """
+    Streaming stratified sample of the music log under a fixed row budget, for fast previews
+    (describe(), plots, outlier checks) of logs too large to hold in memory.
+
+    Every row gets a uniform random priority and each stratum (by default a city/day/hour cell) keeps
+    the rows with the smallest priorities (a bottom-k reservoir), so each stratum's sample is a uniform
+    sample of its rows whatever the chunking. The budget is re-split among strata as their sizes are
+    counted: 'proportional' gives each stratum at least 'min_per_stratum' rows and the rest in proportion
+    to its size (small strata are never dropped), 'equal' splits it evenly. The sample never exceeds
+    'capacity' rows: with more strata than the budget can cover, the guaranteed rows shrink to an even
+    split (a fixed random subset of strata taking the remainder). Only rows that can enter a reservoir are copied
+    out of a chunk.
+
+    Each sampled row carries 'weight' = stratum rows / stratum sampled rows, the number of log rows it
+    stands for: weighted sums estimate totals and weighted means estimate means over the full log.
+
+    Parameters:
+    capacity (int): Rows kept across all strata.
+    keys (list or tuple): Stratification columns. 'hour' is derived from 'time_col' if absent.
+    time_col (str): Time-of-day column used to derive 'hour'.
+    allocation (str): 'proportional' or 'equal'.
+    min_per_stratum (int): Rows guaranteed to every stratum with 'proportional' allocation
+                           (as long as 'capacity' allows it; otherwise capacity is split evenly).
+    seed (int, optional): Random seed. Samplers merged together must use different seeds.
+
+    Raises:
+    ValueError: If 'allocation' is unknown.
+
+    Example:
+    sampler = StratifiedReservoirSampler(capacity=200_000)
+    sampler.consume(pd.read_csv(path, chunksize=1_000_000))
+    df_preview = sampler.sample()
+    np.average(df_preview['duration'], weights=df_preview['weight'])     # estimate of the log mean
+    """
+
+    def __init__(self, capacity=100_000, keys=('city', 'day', 'hour'), time_col='time', allocation='proportional',
+                 min_per_stratum=10, seed=0):
+        if allocation not in ('proportional', 'equal'):
+            raise ValueError(f"*** Error *** > Invalid allocation '{allocation}'. Use 'proportional' or 'equal'.")
+
+        self.capacity = capacity
+        self.keys = list(keys)
+        self.time_col = time_col
+        self.allocation = allocation
+        self.min_per_stratum = min_per_stratum
+        self.rows = 0
+        self._rng = np.random.default_rng(seed)
+        self._labels = [[] for _ in self.keys]
+        self._lookup = [{} for _ in self.keys]
+        self._strata = {}
+        self._stratum_labels = []
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._thresholds = np.zeros(0)
+        self._ranks = np.zeros(0)
+        self._sample = None
+        self._sample_strata = np.zeros(0, dtype=np.int64)
+        self._priorities = np.zeros(0)
+
+    def __repr__(self):
+        return (f"StratifiedReservoirSampler(capacity={self.capacity}, keys={self.keys}, "
+                f"strata={len(self._stratum_labels)}, sampled={len(self._priorities)}, rows={self.rows})")
+
+    def __len__(self):
+        return len(self._priorities)
+
+    def _register(self, level, label):
+        """Returns the code of a label of one key, adding it if new (missing values are one label)."""
+
+        label = None if pd.isna(label) else label
+        code = self._lookup[level].get(label)
+        if code is None:
+            code = self._lookup[level][label] = len(self._labels[level])
+            self._labels[level].append(label)
+
+        return code
+
+    def _stratum_ids(self, chunk):
+        """Maps every row of a chunk to a stratum id, registering new strata."""
+
+        if not self.keys:
+            if not self._stratum_labels:
+                self._add_strata([()])
+            return np.zeros(len(chunk), dtype=np.int64)
+
+        level_codes = []
+        for level, key in enumerate(self.keys):
+            codes, labels = key_codes(chunk, key, self.time_col)
+            mapping = np.array([self._register(level, label) for label in labels] + [self._register(level, None)],
+                               dtype=np.int64)
+            level_codes.append(mapping[codes])
+
+        radixes = [len(labels) for labels in self._labels]
+        cells = np.zeros(len(chunk), dtype=np.int64)
+        for codes, radix in zip(level_codes, radixes):
+            cells = cells * radix + codes
+
+        unique_cells, inverse = np.unique(cells, return_inverse=True)
+        combos = zip(*[codes.tolist() for codes in np.unravel_index(unique_cells, radixes)])
+        labels = [tuple(self._labels[level][code] for level, code in enumerate(combo)) for combo in combos]
+        self._add_strata([label for label in labels if label not in self._strata])
+
+        return np.array([self._strata[label] for label in labels], dtype=np.int64)[inverse.ravel()]
+
+    def _add_strata(self, labels):
+        for label in labels:
+            self._strata[label] = len(self._stratum_labels)
+            self._stratum_labels.append(label)
+        self._counts = np.pad(self._counts, (0, len(labels)))
+        self._thresholds = np.pad(self._thresholds, (0, len(labels)), constant_values=1.0)
+        # Random order in which strata receive the rows left over by an even split
+        self._ranks = np.concatenate([self._ranks, self._rng.random(len(labels))])
+
+    def _quotas(self):
+        """Splits 'capacity' among the strata seen so far (never more rows than a stratum has, nor in total)."""
+
+        counts = self._counts
+
+        if self.allocation == 'proportional':
+            base = _fill_evenly(np.minimum(counts, self.min_per_stratum), self.capacity, self._ranks)
+            extra = counts - base
+            remaining = self.capacity - int(base.sum())
+            share = np.floor(remaining * extra / extra.sum()).astype(np.int64) if remaining and extra.sum() else 0
+            return base + np.minimum(share, extra)
+
+        return _fill_evenly(counts, self.capacity, self._ranks)
+
+    def _fold(self, rows, strata, priorities):
+        """Adds candidate rows to the reservoirs, keeping the smallest priorities of every stratum."""
+
+        n_old = len(self._priorities)
+        all_strata = np.concatenate([self._sample_strata, strata])
+        all_priorities = np.concatenate([self._priorities, priorities])
+        quotas = self._quotas()
+
+        order = np.lexsort((all_priorities, all_strata))
+        sorted_strata = all_strata[order]
+        starts = np.searchsorted(sorted_strata, sorted_strata, side='left')
+        kept = (np.arange(len(order)) - starts) < quotas[sorted_strata]
+        keep, dropped = np.sort(order[kept]), order[~kept]
+        if len(keep) > self.capacity:
+            raise RuntimeError(f"*** Error *** > The sample would hold {len(keep)} rows, "
+                               f"over its capacity of {self.capacity}.")
+
+        # A stratum's reservoir holds exactly its rows below the smallest priority it ever dropped,
+        # which keeps it uniform when its quota later grows or shrinks
+        np.minimum.at(self._thresholds, all_strata[dropped], all_priorities[dropped])
+
+        old_keep, new_keep = keep[keep < n_old], keep[keep >= n_old] - n_old
+        parts = ([] if self._sample is None else [self._sample.iloc[old_keep]]) + [rows.iloc[new_keep]]
+        self._sample = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0].reset_index(drop=True)
+        self._sample_strata, self._priorities = all_strata[keep], all_priorities[keep]
+
+    def update(self, chunk):
+        """
+        Samples one chunk of the log.
+
+        Parameters:
+        chunk (DataFrame): Rows containing every key column (or 'time_col' for a derived 'hour').
+
+        Returns:
+        StratifiedReservoirSampler: self, to allow chaining.
+        """
+
+        strata = self._stratum_ids(chunk)
+        priorities = self._rng.random(len(chunk))
+        self._counts += np.bincount(strata, minlength=len(self._counts))
+        self.rows += len(chunk)
+
+        candidates = np.flatnonzero(priorities < self._thresholds[strata])
+        self._fold(chunk.iloc[candidates], strata[candidates], priorities[candidates])
+
+        return self
+
+    def consume(self, chunks):
+        """
+        Updates the sampler with every chunk of an iterable (e.g. pd.read_csv(..., chunksize=n)).
+
+        Parameters:
+        chunks (iterable of DataFrame): The chunks to sample.
+
+        Returns:
+        StratifiedReservoirSampler: self.
+        """
+
+        for chunk in chunks:
+            self.update(chunk)
+
+        return self
+
+    def merge(self, other):
+        """
+        Merges a sampler built on another partition of the log (with a different seed).
+
+        Parameters:
+        other (StratifiedReservoirSampler): Sampler over the same keys.
+
+        Returns:
+        StratifiedReservoirSampler: self, sampling the union of both partitions.
+
+        Raises:
+        ValueError: If the samplers use different keys.
+        """
+
+        if other.keys != self.keys:
+            raise ValueError("*** Error *** > Only samplers with the same keys can be merged.")
+
+        self._add_strata([label for label in other._stratum_labels if label not in self._strata])
+        mapping = np.array([self._strata[label] for label in other._stratum_labels], dtype=np.int64)
+        self._counts[mapping] += other._counts
+        self.rows += other.rows
+
+        if other._sample is None:
+            return self
+
+        # Rows of either side above the other side's threshold could not have been kept by a single sampler
+        thresholds = self._thresholds.copy()
+        np.minimum.at(thresholds, mapping, other._thresholds)
+        own = self._priorities < thresholds[self._sample_strata]
+        strata = mapping[other._sample_strata]
+        candidates = np.flatnonzero(other._priorities < thresholds[strata])
+
+        if self._sample is not None:
+            self._sample = self._sample.iloc[np.flatnonzero(own)].reset_index(drop=True)
+            self._sample_strata, self._priorities = self._sample_strata[own], self._priorities[own]
+        self._thresholds = thresholds
+        self._fold(other._sample.iloc[candidates], strata[candidates], other._priorities[candidates])
+
+        return self
+
+    def strata(self):
+        """
+        Returns the size, sample size and weight of every stratum.
+
+        Returns:
+        DataFrame: The key columns, 'rows' (rows seen), 'sampled' and 'weight' (rows / sampled).
+        """
+
+        sampled = np.bincount(self._sample_strata, minlength=len(self._counts))
+        df = pd.DataFrame(self._stratum_labels, columns=self.keys) if self.keys else pd.DataFrame(index=[0])
+        df['rows'] = self._counts
+        df['sampled'] = sampled
+        df['weight'] = np.where(sampled > 0, self._counts / np.maximum(sampled, 1), np.nan)
+
+        return df.sort_values(self.keys, kind='stable').reset_index(drop=True) if self.keys else df
+
+    def sample(self):
+        """
+        Returns the sampled rows with their weights.
+
+        Returns:
+        DataFrame: The sampled rows (original columns, in arrival order within each chunk) plus 'weight',
+                   the number of log rows each one represents (weights sum to the rows seen in sampled strata).
+        """
+
+        if self._sample is None:
+            return pd.DataFrame(columns=['weight'])
+
+        sampled = np.bincount(self._sample_strata, minlength=len(self._counts))
+        weights = self._counts / np.maximum(sampled, 1)
+
+        return self._sample.assign(weight=weights[self._sample_strata])
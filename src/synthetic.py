@@ -0,0 +1,198 @@
+# synthetic.py for generating deterministic, realistically dirty music activity logs
+
+import numpy as np
+import os
+import pandas as pd
+
+
+# Raw headers of music_project_en.csv, including its inconsistent case and padding
+RAW_COLUMNS = ['  userID', 'Track', 'artist', 'genre', '  City  ', 'time', 'Day']
+
+_CITIES = ['Springfield', 'Shelbyville']
+_CITY_WEIGHTS = [0.7, 0.3]
+_DAYS = ['Monday', 'Wednesday', 'Friday']
+_GENRES = ['pop', 'dance', 'rock', 'electronic', 'hiphop', 'alternative', 'classical', 'rusrap', 'ruspop',
+           'world', 'metal', 'jazz', 'soundtrack', 'rnb', 'folk', 'latin', 'reggae', 'triphop', 'numetal', 'tango']
+_GENRE_VARIANTS = {'hiphop': ['hip', 'hop', 'hip_hop'], 'latin': ['latino'], 'tango': ['argentinetango']}
+_MISSING_TOKENS = ['', 'N/A', 'none', 'None', 'null', 'NULL', 'nan', 'NaN']
+_GENDERS = ['m', 'f', 'male', 'female', 'M', 'F']
+
+
+# Function to draw Zipf-like category codes (a few very popular items, a long tail)
+def _zipf_codes(rng, size, n_items, exponent=1.1):
+    """
+    Draws integer codes in [0, n_items) following a truncated Zipf distribution.
+
+    Parameters:
+    rng (Generator): NumPy random generator.
+    size (int): Number of codes to draw.
+    n_items (int): Vocabulary size.
+    exponent (float): Zipf exponent; larger values concentrate plays on fewer items.
+
+    Returns:
+    ndarray: int64 codes.
+    """
+
+    weights = 1.0 / np.arange(1, n_items + 1) ** exponent
+    cdf = np.cumsum(weights / weights.sum())
+
+    return np.minimum(np.searchsorted(cdf, rng.random(size)), n_items - 1)
+
+# Function to build the vocabularies shared by every chunk of a synthetic log
+def _build_vocabularies(n_rows, seed):
+    """
+    Builds the user, track and artist vocabularies of a synthetic log, sized after the number of rows.
+
+    Parameters:
+    n_rows (int): Total number of rows of the log.
+    seed (int): Random seed.
+
+    Returns:
+    dict: Arrays of labels for 'users', 'tracks', 'artists' and every second of the day ('times'),
+          plus the mappings user -> city, track -> artist and artist -> genre.
+    """
+
+    rng = np.random.default_rng([seed, 0])
+    n_users = max(100, n_rows // 15)
+    n_artists = max(50, min(n_rows // 20, 500_000))
+    n_tracks = max(100, min(n_rows // 5, 2_000_000))
+
+    users = np.char.upper(np.char.mod('%08x', rng.choice(2 ** 32, n_users, replace=False)))
+
+    return {
+        'users': users.astype(object),
+        'user_city': rng.choice(len(_CITIES), n_users, p=_CITY_WEIGHTS),
+        'artists': np.char.add('Artist ', np.arange(n_artists).astype(str)).astype(object),
+        'tracks': np.char.add('Track ', np.arange(n_tracks).astype(str)).astype(object),
+        'track_artist': rng.integers(0, n_artists, n_tracks),
+        'artist_genre': _zipf_codes(rng, n_artists, len(_GENRES), exponent=0.9),
+        'times': np.array([f'{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}' for s in range(86_400)], dtype=object),
+    }
+
+# Function to generate one chunk of a synthetic music log
+def _generate_chunk(vocab, n_rows, rng, missing_rate, duplicate_rate, gender):
+    """
+    Generates one chunk of raw, dirty log rows from shared vocabularies.
+
+    Parameters:
+    vocab (dict): Output of _build_vocabularies().
+    n_rows (int): Rows to generate.
+    rng (Generator): NumPy random generator for this chunk.
+    missing_rate (float): Fraction of cells in 'Track', 'artist' and 'genre' replaced by missing tokens.
+    duplicate_rate (float): Fraction of rows that are exact copies of another row of the chunk.
+    gender (bool): If True, adds a 'Gender' column with mixed m/f/male/female codes.
+
+    Returns:
+    DataFrame: Raw rows with the headers of music_project_en.csv.
+    """
+
+    user_codes = rng.integers(0, len(vocab['users']), n_rows)
+    track_codes = _zipf_codes(rng, n_rows, len(vocab['tracks']))
+    artist_codes = vocab['track_artist'][track_codes]
+    genre_codes = vocab['artist_genre'][artist_codes]
+
+    genres = np.asarray(_GENRES, dtype=object)[genre_codes]
+    for genre, variants in _GENRE_VARIANTS.items():
+        mask = (genres == genre) & (rng.random(n_rows) < 0.5)
+        genres[mask] = rng.choice(variants, int(mask.sum()))
+
+    # Activity peaks in the morning (08-09h) and in the evening (20-22h)
+    peak = rng.random(n_rows) < 0.5
+    seconds = np.where(peak, rng.integers(8 * 3600, 10 * 3600, n_rows), rng.integers(20 * 3600, 23 * 3600, n_rows))
+
+    chunk = pd.DataFrame({
+        RAW_COLUMNS[0]: vocab['users'][user_codes],
+        RAW_COLUMNS[1]: vocab['tracks'][track_codes],
+        RAW_COLUMNS[2]: vocab['artists'][artist_codes],
+        RAW_COLUMNS[3]: genres,
+        RAW_COLUMNS[4]: np.asarray(_CITIES, dtype=object)[vocab['user_city'][user_codes]],
+        RAW_COLUMNS[5]: vocab['times'][seconds],
+        RAW_COLUMNS[6]: np.asarray(_DAYS, dtype=object)[rng.integers(0, len(_DAYS), n_rows)],
+    })
+
+    if gender:
+        chunk['Gender'] = np.asarray(_GENDERS, dtype=object)[rng.integers(0, len(_GENDERS), n_rows)]
+
+    for column in RAW_COLUMNS[1:4]:
+        mask = rng.random(n_rows) < missing_rate
+        chunk.loc[mask, column] = rng.choice(_MISSING_TOKENS, int(mask.sum()))
+
+    n_duplicates = int(n_rows * duplicate_rate)
+    if n_duplicates:
+        targets = rng.choice(n_rows, n_duplicates, replace=False)
+        sources = rng.integers(0, n_rows, n_duplicates)
+        chunk.iloc[targets] = chunk.iloc[sources].to_numpy()
+
+    return chunk
+
+# Function to generate a synthetic music log with the shape of music_project_en.csv
+# generate_music_log(1_000_000, seed=42)
+def generate_music_log(n_rows, seed=0, chunk_size=1_000_000, missing_rate=0.02, duplicate_rate=0.01, gender=True):
+    """
+    Generates a deterministic synthetic music log shaped like music_project_en.csv, with realistic dirt:
+    mixed-case/padded headers, sentinel missing tokens, 'hip'/'hop'/'hip_hop' genre variants,
+    explicit duplicates and m/f gender codes.
+
+    The same (n_rows, seed, chunk_size) always produces the same rows.
+
+    Parameters:
+    n_rows (int): Number of rows.
+    seed (int): Random seed.
+    chunk_size (int): Rows generated per internal chunk (controls peak memory, part of the determinism key).
+    missing_rate (float): Fraction of 'Track'/'artist'/'genre' cells replaced by missing tokens.
+    duplicate_rate (float): Fraction of explicit duplicate rows.
+    gender (bool): If True, adds a 'Gender' column.
+
+    Returns:
+    DataFrame: The synthetic raw log.
+    """
+
+    chunks = list(iter_music_log_chunks(n_rows, seed=seed, chunk_size=chunk_size, missing_rate=missing_rate,
+                                        duplicate_rate=duplicate_rate, gender=gender))
+
+    if not chunks:
+        return pd.DataFrame(columns=RAW_COLUMNS + (['Gender'] if gender else []))
+
+    return pd.concat(chunks, ignore_index=True)
+
+# Function to lazily generate a synthetic music log chunk by chunk
+def iter_music_log_chunks(n_rows, seed=0, chunk_size=1_000_000, missing_rate=0.02, duplicate_rate=0.01, gender=True):
+    """
+    Yields a synthetic music log in chunks, so logs of 100M+ rows can be produced with bounded memory.
+    Parameters are the same as generate_music_log().
+
+    Yields:
+    DataFrame: Consecutive chunks of at most 'chunk_size' rows.
+    """
+
+    vocab = _build_vocabularies(n_rows, seed)
+
+    for index, start in enumerate(range(0, n_rows, chunk_size)):
+        rng = np.random.default_rng([seed, index + 1])
+        yield _generate_chunk(vocab, min(chunk_size, n_rows - start), rng, missing_rate, duplicate_rate, gender)
+
+# Function to write a synthetic music log to CSV without holding it in memory
+# write_music_log_csv(project_root / "data" / "raw" / "music_synthetic_10m.csv", 10_000_000)
+def write_music_log_csv(file_path, n_rows, seed=0, chunk_size=1_000_000, **kwargs):
+    """
+    Writes a synthetic music log to a CSV file chunk by chunk.
+
+    Parameters:
+    file_path (Path or str): Destination CSV file.
+    n_rows (int): Number of rows.
+    seed (int): Random seed.
+    chunk_size (int): Rows generated and written per chunk.
+    **kwargs: Additional arguments passed to iter_music_log_chunks() (missing_rate, duplicate_rate, gender).
+
+    Returns:
+    Path or str: The written file path.
+    """
+
+    directory = os.path.dirname(os.fspath(file_path))
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    for index, chunk in enumerate(iter_music_log_chunks(n_rows, seed=seed, chunk_size=chunk_size, **kwargs)):
+        chunk.to_csv(file_path, mode='w' if index == 0 else 'a', header=index == 0, index=False)
+
+    return file_path
@@ -1,5 +1,8 @@
 # utils.py for useful functions
 
+import importlib
+import types
+
 import pandas as pd
 
 # Function to set preferred display formatting options for pandas in Jupyter Notebooks
@@ -12,3 +15,88 @@ def format_notebook():
     pd.set_option('display.max_columns', 25)      # Show up to 25 columns
     pd.set_option('display.max_colwidth', 50)     # Limit each cell content to 50 characters
     pd.set_option('display.width', 150)           # Set total output width to 150 characters
+
+
+# Function to check whether a dtype is a pd.ArrowDtype holding Arrow strings
+def _is_arrow_dtype_string(dtype):
+    """
+    Returns True for pd.ArrowDtype(pa.string()) and pd.ArrowDtype(pa.large_string()) (e.g. 'string[pyarrow]'
+    from read_csv(dtype_backend='pyarrow')), without importing pyarrow.
+    """
+
+    return isinstance(dtype, pd.ArrowDtype) and str(dtype.pyarrow_dtype) in ('string', 'large_string')
+
+# Function to check whether a column holds text (object or pandas string dtype)
+def is_text_column(series):
+    """
+    Returns True for object columns, pandas string columns (e.g. 'string[pyarrow]') and
+    pd.ArrowDtype string/large_string columns.
+
+    Parameters:
+    series (Series): The column to check.
+
+    Returns:
+    bool: Whether the column holds text values.
+    """
+
+    return (series.dtype == 'object' or isinstance(series.dtype, pd.StringDtype)
+            or _is_arrow_dtype_string(series.dtype))
+
+# Function to check whether a column holds Arrow-backed strings
+def is_arrow_string_column(series):
+    """
+    Returns True for 'string[pyarrow]' columns and pd.ArrowDtype string/large_string columns,
+    whose .str kernels run in Arrow (RE2 regular expressions).
+
+    Parameters:
+    series (Series): The column to check.
+
+    Returns:
+    bool: Whether the column holds Arrow-backed strings.
+    """
+
+    return ((isinstance(series.dtype, pd.StringDtype) and series.dtype.storage.startswith('pyarrow'))
+            or _is_arrow_dtype_string(series.dtype))
+
+
+class _LazyModule(types.ModuleType):
+    """Module placeholder that imports the real module on first attribute access."""
+
+    def __getattr__(self, attribute):
+        return getattr(importlib.import_module(self.__name__), attribute)
+
+
+# Function to defer the import of a heavy module until it is first used
+# sns = lazy_import('seaborn')
+def lazy_import(module_name):
+    """
+    Returns a placeholder for a module that is only imported when one of its attributes is accessed.
+
+    Parameters:
+    module_name (str): Fully qualified module name (e.g. 'matplotlib.pyplot').
+
+    Returns:
+    ModuleType: Lazy module placeholder.
+    """
+
+    return _LazyModule(module_name)
+
+# Function to render objects in notebooks, importing IPython only on first use
+def display(*objs, **kwargs):
+    """
+    Lazy wrapper of IPython.display.display.
+    """
+
+    from IPython.display import display as ipython_display
+
+    return ipython_display(*objs, **kwargs)
+
+# Function to build an HTML object for notebooks, importing IPython only on first use
+def HTML(data=None, **kwargs):
+    """
+    Lazy wrapper of IPython.display.HTML.
+    """
+
+    from IPython.display import HTML as IPythonHTML
+
+    return IPythonHTML(data, **kwargs)